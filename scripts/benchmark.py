@@ -0,0 +1,254 @@
+"""パーサーとNotionブロック作成のオフラインベンチマーク
+
+benchmarks/corpus の保存済みページを使い、ネットワークに一切アクセスせずに
+以下の1回あたりの処理時間を計測して、保存済みのベースラインと比較する。
+
+- HTMLの木の構築 (make_soup)
+- _parse_jra_entry_page / _parse_jradb_page
+- レースページ初期ブロックの作成 (_build_race_initial_blocks)
+- 出走履歴ブロックの作成 (_build_race_history_blocks)
+
+処理時間はマシンの速さで大きく変わるため、比較は絶対値ではなく比率で行う。
+各回の計測の直前に同じプロセスで純Pythonの較正ループ（文字列・辞書・リスト操作）を実行し、
+処理時間を較正ループの処理時間で割った「較正比」の中央値をベースラインの較正比と比べる。
+ベースラインには較正比と µs の両方を保存するが、閾値の判定に使うのは較正比だけ（µs は参考値）。
+
+使い方:
+    python scripts/benchmark.py                    # ベースラインと比較（閾値を超えて遅くなったら終了コード1）
+    python scripts/benchmark.py --save-baseline    # 現在の結果をベースラインとして保存
+    python scripts/benchmark.py --add-from-cache 20  # HTMLキャッシュのレースページをコーパスに追加
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.config import Config
+from src.html_cache import HtmlCache
+from src.html_parser import make_soup, available_backends
+from src.notion_client import NotionClient
+from src.scraper import Scraper
+from src.usecases.retrospective import RetrospectiveUseCase
+
+BENCHMARK_DIR = project_root / "benchmarks"
+CORPUS_DIR = BENCHMARK_DIR / "corpus"
+CORPUS_INDEX = CORPUS_DIR / "index.json"
+BASELINE_PATH = BENCHMARK_DIR / "baseline.json"
+
+
+def load_corpus() -> List[dict]:
+    """コーパスのページ一覧（HTML付き）を読み込む"""
+    with open(CORPUS_INDEX, encoding="utf-8") as f:
+        entries = json.load(f)
+    for entry in entries:
+        with open(CORPUS_DIR / entry["file"], encoding="utf-8") as f:
+            entry["html"] = f.read()
+    return entries
+
+
+def add_from_cache(count: int) -> int:
+    """HTMLキャッシュに保存したレースページをコーパスに追加"""
+    cache = HtmlCache(Config.HTML_CACHE_DIR)
+    with open(CORPUS_INDEX, encoding="utf-8") as f:
+        entries = json.load(f)
+    known_urls = {entry["url"] for entry in entries}
+
+    added = 0
+    for url, content_hash in cache.list_pages(kind="race"):
+        if added >= count:
+            break
+        if url in known_urls:
+            continue
+        html = cache.load_blob(content_hash)
+        if not html:
+            continue
+        kind = "result" if "accessS" in url else "entry"
+        name = f"cache_{content_hash[:12]}.html"
+        with open(CORPUS_DIR / name, "w", encoding="utf-8") as f:
+            f.write(html)
+        entries.append({"file": name, "kind": kind, "url": url, "source": "html_cache"})
+        added += 1
+
+    with open(CORPUS_INDEX, "w", encoding="utf-8") as f:
+        json.dump(entries, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    print(f"{added}ページをコーパスに追加しました（合計 {len(entries)}ページ）")
+    return 0
+
+
+def _calibration_workload() -> None:
+    """マシンの速さを測るための純Pythonの処理（パースやブロック作成に近い文字列・辞書・リスト操作）"""
+    rows = []
+    for i in range(2000):
+        text = f"{i:05d} 馬名{i % 97} {i * 7 % 1000}.{i % 10}"
+        fields = text.split()
+        rows.append({"number": int(fields[0]), "name": fields[1].strip(), "time": float(fields[2])})
+    rows.sort(key=lambda row: (row["time"], row["name"]))
+    "".join(row["name"] for row in rows)
+
+
+def _elapsed(func: Callable[[], None]) -> float:
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def time_case(func: Callable[[], None], repeat: int, ops: int) -> Tuple[float, float]:
+    """
+    funcをrepeat回実行し、1回あたりの処理時間の中央値（マイクロ秒）と較正比の中央値を返す
+
+    較正比は、各回の直前に計測した較正ループの処理時間で1回あたりの処理時間を割った値。
+    計測のたびに較正ループと交互に実行するので、計測中の負荷の変化も打ち消される。
+
+    Args:
+        func: 計測する処理（1回の呼び出しでops件を処理する）
+        repeat: 計測回数
+        ops: 1回の呼び出しで処理する件数
+    """
+    samples = []
+    ratios = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        func()  # ウォームアップ
+        _calibration_workload()
+        for _ in range(repeat):
+            calibration = _elapsed(_calibration_workload)
+            elapsed = _elapsed(func) / ops
+            samples.append(elapsed)
+            ratios.append(elapsed / calibration)
+    return statistics.median(samples) * 1_000_000, statistics.median(ratios)
+
+
+def run_benchmarks(pages: List[dict], repeat: int) -> Dict[str, Tuple[float, float]]:
+    """全ケースを計測する（ケース名 → (処理時間µs, 較正比)）"""
+    scraper = Scraper(use_http=False)
+    # ブロック作成は接続情報を使わないので、初期化（HTTPセッション・キャッシュの用意）を省く
+    notion = NotionClient.__new__(NotionClient)
+    usecase = RetrospectiveUseCase(notion_client=None, scraper=None)
+    today = date.today()
+
+    results: Dict[str, Tuple[float, float]] = {}
+    for backend in available_backends():
+        soups = [(make_soup(p["html"], backend), p) for p in pages]
+        results[f"tree_build[{backend}]"] = time_case(
+            lambda: [make_soup(p["html"], backend) for p in pages], repeat, len(pages)
+        )
+        results[f"parse_jra_entry_page[{backend}]"] = time_case(
+            lambda: [scraper._parse_jra_entry_page(soup, today, p["url"]) for soup, p in soups], repeat, len(pages)
+        )
+        results[f"parse_jradb_page[{backend}]"] = time_case(
+            lambda: [scraper._parse_jradb_page(soup, today, p["url"]) for soup, p in soups], repeat, len(pages)
+        )
+        results[f"parse_race_html[{backend}]"] = time_case(
+            lambda: [scraper._parse_race_html(p["html"], p["url"], backend=backend) for p in pages], repeat, len(pages)
+        )
+
+    # ブロック作成はパース結果を入力にする
+    with contextlib.redirect_stdout(io.StringIO()):
+        races = [race for p in pages for race in scraper._parse_race_html(p["html"], p["url"])]
+    for i, race in enumerate(races):
+        race.notion_page_id = f"race-page-{i}"
+        for j, horse in enumerate(race.horses):
+            horse.notion_page_id = f"horse-page-{i}-{j}" if j % 2 == 0 else None
+    race_results = [usecase._build_race_result(race, horse) for race in races for horse in race.horses]
+
+    results["build_race_initial_blocks"] = time_case(
+        lambda: [notion._build_race_initial_blocks(race) for race in races], repeat * 10, len(races)
+    )
+    results["build_race_history_blocks"] = time_case(
+        lambda: [notion._build_race_history_blocks(result) for result in race_results], repeat * 10, len(race_results)
+    )
+    return results
+
+
+def environment() -> dict:
+    """計測環境の情報"""
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "backends": available_backends(),
+    }
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="パーサーとNotionブロック作成のオフラインベンチマーク")
+    parser.add_argument("--repeat", type=int, default=20, help="計測回数（中央値を採用）")
+    parser.add_argument("--threshold", type=float, default=0.2, help="ベースラインからの許容悪化率（0.2 = 20%%）")
+    parser.add_argument("--save-baseline", action="store_true", help="結果をベースラインとして保存する")
+    parser.add_argument("--add-from-cache", type=int, metavar="N", help="HTMLキャッシュのレースページをN件コーパスに追加する")
+    args = parser.parse_args()
+
+    if args.add_from_cache:
+        return add_from_cache(args.add_from_cache)
+
+    pages = load_corpus()
+    print(f"=== ベンチマーク: コーパス {len(pages)}ページ, 計測 {args.repeat}回 ===")
+    results = run_benchmarks(pages, args.repeat)
+
+    baseline = None
+    if BASELINE_PATH.exists():
+        with open(BASELINE_PATH, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("environment") != environment():
+            print(f"⚠ ベースラインの計測環境が異なります: {baseline.get('environment')}")
+        if baseline.get("corpus_pages") != len(pages):
+            print(f"⚠ ベースライン計測時とコーパスのページ数が異なります: {baseline.get('corpus_pages')} → {len(pages)}")
+        if not baseline.get("ratios"):
+            print("⚠ ベースラインに較正比がないため比較しません（--save-baseline で取り直してください）")
+            baseline = None
+
+    regressions = []
+    width = max(len(name) for name in results)
+    for name, (value, ratio) in results.items():
+        line = f"  {name:<{width}}  {value:10.1f}µs  較正比 {ratio:8.4f}"
+        base_ratio = (baseline or {}).get("ratios", {}).get(name)
+        if base_ratio:
+            # µsではなく較正比で比べる（マシンの速さの差を打ち消す）
+            change = ratio / base_ratio - 1
+            line += f"  (ベースライン {base_ratio:.4f}, {change:+.1%})"
+            if change > args.threshold:
+                line += "  ✗ 悪化"
+                regressions.append(name)
+        print(line)
+
+    if args.save_baseline:
+        BENCHMARK_DIR.mkdir(exist_ok=True)
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "environment": environment(),
+                    "corpus_pages": len(pages),
+                    "ratios": {name: ratio for name, (_, ratio) in results.items()},
+                    "results": {name: value for name, (value, _) in results.items()},
+                },
+                f, ensure_ascii=False, indent=2
+            )
+            f.write("\n")
+        print(f"\nベースラインを保存しました: {BASELINE_PATH.relative_to(project_root)}")
+        return 0
+
+    if baseline is None:
+        print("\nベースラインがありません（--save-baseline で保存してください）")
+        return 0
+    if regressions:
+        print(f"\n✗ {len(regressions)}件がベースラインより較正比で{args.threshold:.0%}以上遅くなりました: {', '.join(regressions)}")
+        return 1
+    print(f"\n✓ 全{len(results)}件がベースラインの許容範囲内です（閾値 {args.threshold:.0%}）")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
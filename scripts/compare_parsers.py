@@ -0,0 +1,170 @@
+"""HTMLパーサーバックエンドの比較スクリプト
+
+HTMLキャッシュに保存したレースページ（--corpus の場合はベンチマーク用コーパス）を
+各バックエンドでパースし、抽出結果（Race/Horse）が一致するかと1ページあたりのパース時間を比較する。
+
+参考として、BeautifulSoupを通さない lxml.html での木の構築だけの時間も表示する。
+バックエンドを替えて短くなるのは木の構築だけで、抽出（BeautifulSoupの走査）の時間は変わらないため、
+この値との差が「抽出をlxmlのAPIで書き直した場合に見込める上限」の目安になる。
+
+使い方:
+    python scripts/compare_parsers.py [--repeat 3] [--limit 100] [--corpus]
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.config import Config
+from src.html_cache import HtmlCache
+from src.html_parser import available_backends, make_soup
+from src.models import race_to_dict
+from src.scraper import Scraper
+
+
+def parse_page(scraper: Scraper, html: str, url: str, backend: str):
+    """パーサーのログ出力を抑えて1ページをパースし、(結果, 秒数)を返す"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        races = scraper._parse_race_html(html, url, backend=backend)
+        elapsed = time.perf_counter() - started
+    return [race_to_dict(r) for r in races], elapsed
+
+
+def time_call(func, repeat: int) -> float:
+    """funcをrepeat回実行した秒数の中央値"""
+    samples = []
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def load_corpus_pages() -> list:
+    """ベンチマーク用コーパスのページ一覧 [(URL, HTML)]"""
+    corpus_dir = project_root / "benchmarks" / "corpus"
+    with open(corpus_dir / "index.json", encoding="utf-8") as f:
+        entries = json.load(f)
+    return [(entry["url"], (corpus_dir / entry["file"]).read_text(encoding="utf-8")) for entry in entries]
+
+
+def diff_fields(expected: list, actual: list) -> list:
+    """一致しない項目の一覧（最初の数件のみ）"""
+    if len(expected) != len(actual):
+        return [f"レース数: {len(expected)} != {len(actual)}"]
+    diffs = []
+    for i, (a, b) in enumerate(zip(expected, actual)):
+        for key in a:
+            if key == "horses":
+                continue
+            if a[key] != b.get(key):
+                diffs.append(f"races[{i}].{key}: {a[key]!r} != {b.get(key)!r}")
+        horses_a, horses_b = a.get("horses", []), b.get("horses", [])
+        if len(horses_a) != len(horses_b):
+            diffs.append(f"races[{i}].horses: {len(horses_a)}頭 != {len(horses_b)}頭")
+            continue
+        for j, (ha, hb) in enumerate(zip(horses_a, horses_b)):
+            for key in ha:
+                if ha[key] != hb.get(key):
+                    diffs.append(f"races[{i}].horses[{j}].{key}: {ha[key]!r} != {hb.get(key)!r}")
+    return diffs[:5]
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="HTMLパーサーバックエンドの一致確認と速度比較")
+    parser.add_argument("--repeat", type=int, default=3, help="1ページあたりの計測回数（中央値を採用）")
+    parser.add_argument("--limit", type=int, default=0, help="比較するページ数の上限（0は全件）")
+    parser.add_argument("--corpus", action="store_true", help="HTMLキャッシュではなくベンチマーク用コーパスを使う")
+    args = parser.parse_args()
+
+    backends = available_backends()
+    reference = "html.parser"
+    if len(backends) < 2:
+        print(f"比較できるバックエンドがありません（利用可能: {', '.join(backends)}）")
+        print("lxml をインストールしてください: pip install lxml")
+        return 1
+
+    cache = HtmlCache(Config.HTML_CACHE_DIR)
+    if args.corpus:
+        pages = load_corpus_pages()
+    else:
+        pages = [(url, cache.load_blob(content_hash)) for url, content_hash in cache.list_pages(kind="race")]
+    if args.limit:
+        pages = pages[:args.limit]
+    if not pages:
+        print(f"{Config.HTML_CACHE_DIR} に保存済みのレースページがありません（先に通常モードで実行するか --corpus を指定してください）")
+        return 1
+
+    scraper = Scraper(html_cache=cache, replay=True)
+    print(f"=== パーサー比較: {len(pages)}ページ, バックエンド: {', '.join(backends)} ===")
+
+    timings = {backend: [] for backend in backends}
+    tree_timings = {backend: [] for backend in backends}
+    raw_lxml = importlib.util.find_spec("lxml") is not None
+    if raw_lxml:
+        import lxml.html
+        tree_timings["lxml.html（BeautifulSoupなし）"] = []
+    mismatches = 0
+    for url, html in pages:
+        if not html:
+            continue
+
+        results = {}
+        for backend in backends:
+            samples = []
+            for _ in range(max(1, args.repeat)):
+                result, elapsed = parse_page(scraper, html, url, backend)
+                samples.append(elapsed)
+            results[backend] = result
+            timings[backend].append(statistics.median(samples))
+            tree_timings[backend].append(time_call(lambda: make_soup(html, backend), args.repeat))
+        if raw_lxml:
+            tree_timings["lxml.html（BeautifulSoupなし）"].append(time_call(lambda: lxml.html.fromstring(html), args.repeat))
+
+        for backend in backends:
+            if backend == reference:
+                continue
+            diffs = diff_fields(results[reference], results[backend])
+            if diffs:
+                mismatches += 1
+                print(f"✗ 不一致 ({backend}): {url}")
+                for d in diffs:
+                    print(f"    {d}")
+
+    print("\n=== 1ページあたりのパース時間（木の構築＋抽出） ===")
+    reference_mean = statistics.mean(timings[reference])
+    for backend in backends:
+        mean = statistics.mean(timings[backend])
+        print(
+            f"  {backend}: 平均 {mean * 1000:.1f}ms, 中央値 {statistics.median(timings[backend]) * 1000:.1f}ms, "
+            f"{reference}比 {reference_mean / mean:.2f}倍"
+        )
+
+    print("\n=== うち木の構築のみ ===")
+    for name, samples in tree_timings.items():
+        mean = statistics.mean(samples)
+        print(f"  {name}: 平均 {mean * 1000:.1f}ms")
+    extract_mean = statistics.mean(timings[backends[0]]) - statistics.mean(tree_timings[backends[0]])
+    print(f"  抽出（BeautifulSoupの走査、バックエンドによらず共通）: 平均 約{max(extract_mean, 0) * 1000:.1f}ms ({backends[0]})")
+
+    if mismatches:
+        print(f"\n✗ {mismatches}ページで抽出結果が一致しませんでした")
+        return 1
+    print(f"\n✓ 全{len(pages)}ページで抽出結果が一致しました")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
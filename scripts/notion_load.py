@@ -0,0 +1,117 @@
+"""代替Notionサーバーを使った負荷計測スクリプト
+
+ローカルの代替Notionサーバー（src/fake_notion.py）を起動し、ベンチマーク用コーパスの
+レースを回顧モードと同じ流れで書き込んで、スループットとリトライの様子を計測する。
+ネットワークにも実際のNotionワークスペースにもアクセスしない。
+
+使い方:
+    python scripts/notion_load.py --concurrency 4 --latency 0.15 --rate-limit 3
+    python scripts/notion_load.py --throttle-rate 0.1 --repeat 3
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.config import Config
+from src.fake_notion import FakeNotionServer
+
+
+class CorpusScraper:
+    """ベンチマーク用コーパスのページをパースしてレースを返すスクレイパーの代わり"""
+
+    def __init__(self, repeat: int):
+        from src.scraper import Scraper
+
+        corpus_dir = project_root / "benchmarks" / "corpus"
+        with open(corpus_dir / "index.json", encoding="utf-8") as f:
+            entries = json.load(f)
+        scraper = Scraper(use_http=False)
+        self.races = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for week in range(repeat):
+                for entry in entries:
+                    html = (corpus_dir / entry["file"]).read_text(encoding="utf-8")
+                    for race in scraper._parse_race_html(html, entry["url"]):
+                        # 繰り返し分は別の開催日のレースとして扱う
+                        race.date += timedelta(weeks=week)
+                        self.races.append(race)
+
+    def get_active_races(self, mode: str = 'retrospective', target_date=None):
+        return self.races
+
+    def iter_active_races(self, mode: str = 'retrospective', target_date=None):
+        return iter(self.races)
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="代替Notionサーバーを使った負荷計測")
+    parser.add_argument("--concurrency", type=int, default=1, help="Notion API呼び出しの同時実行数")
+    parser.add_argument("--repeat", type=int, default=1, help="コーパスを何週分として書き込むか")
+    parser.add_argument("--latency", type=float, default=0.1, help="代替サーバーの応答遅延（秒）")
+    parser.add_argument("--jitter", type=float, default=0.05, help="応答遅延の揺らぎの最大値（秒）")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="各リクエストが429になる確率")
+    parser.add_argument("--rate-limit", type=float, default=None, help="代替サーバーの1秒あたりのリクエスト上限")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="429に付けるRetry-Afterの秒数")
+    parser.add_argument("--client-rate", type=float, default=None, help="クライアント側のレート制限（省略時は設定値）")
+    args = parser.parse_args()
+
+    server = FakeNotionServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        throttle_rate=args.throttle_rate,
+        rate_limit=args.rate_limit,
+        retry_after=args.retry_after
+    ).start()
+
+    # 設定を代替サーバーに向け、ページIDのキャッシュ・台帳は一時ディレクトリに置く
+    work_dir = tempfile.mkdtemp(prefix="notion_load_")
+    Config.NOTION_BASE_URL = server.base_url
+    Config.NOTION_API_KEY = "fake-notion-key"
+    Config.NOTION_HORSE_DB_ID = "fake-horse-db"
+    Config.NOTION_RACE_DB_ID = "fake-race-db"
+    Config.PAGE_CACHE_PATH = os.path.join(work_dir, "notion_pages.sqlite3")
+    if args.client_rate:
+        Config.NOTION_RATE_LIMIT = args.client_rate
+
+    from src.notion_client import NotionClient
+    from src.async_notion_client import AsyncNotionClient
+    from src.usecases.retrospective import RetrospectiveUseCase
+
+    scraper = CorpusScraper(args.repeat)
+    horse_count = sum(len(race.horses) for race in scraper.races)
+    if args.concurrency > 1:
+        notion_client = AsyncNotionClient(concurrency=args.concurrency)
+    else:
+        notion_client = NotionClient()
+    usecase = RetrospectiveUseCase(notion_client, scraper)
+
+    print(f"=== 負荷計測: {len(scraper.races)}レース / {horse_count}頭, 同時実行数 {args.concurrency} ===")
+    print(f"  代替サーバー: 遅延 {args.latency}秒(+{args.jitter}), 429確率 {args.throttle_rate}, 上限 {args.rate_limit or '-'}回/秒")
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        usecase.execute(None)
+    elapsed = time.perf_counter() - started
+
+    calls = notion_client.transport.stats["calls"]
+    print(f"\n経過時間: {elapsed:.1f}秒, {calls / elapsed:.1f}回/秒, 1頭あたり {elapsed / max(horse_count, 1) * 1000:.0f}ms")
+    print(notion_client.transport.summary())
+    print(server.summary())
+    server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
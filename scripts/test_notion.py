@@ -1,7 +1,12 @@
-"""Notion API動作確認スクリプト"""
+"""Notion API動作確認スクリプト
 
+--fake を付けると実際のNotionではなくローカルの代替サーバー（src/fake_notion.py）に対して実行する
+"""
+
+import argparse
 import sys
 import os
+import tempfile
 from datetime import date
 from pathlib import Path
 
@@ -101,7 +106,7 @@ def test_race_page_operations(client: NotionClient):
     
     # 1. レースページの検索（存在しない場合）
     print(f"\n1. レースページの検索: {test_race.name}")
-    page_id = client.find_race_page(test_race.name, test_race.date)
+    page_id = client.find_race_page(test_race.name, test_race.date, test_race.venue, test_race.race_number)
     if page_id:
         print(f"  ✓ 既存のページが見つかりました: {page_id}")
     else:
@@ -120,7 +125,7 @@ def test_race_page_operations(client: NotionClient):
     
     # 3. 再度検索（今度は見つかるはず）
     print(f"\n3. 作成したページの検索: {test_race.name}")
-    found_id = client.find_race_page(test_race.name, test_race.date)
+    found_id = client.find_race_page(test_race.name, test_race.date, test_race.venue, test_race.race_number)
     if found_id == page_id:
         print(f"  ✓ 作成したページが見つかりました")
     else:
@@ -159,8 +164,28 @@ def test_link_operations(client: NotionClient, race: Race):
     return True
 
 
+def use_fake_notion():
+    """代替Notionサーバーを起動し、設定をそのサーバーに向ける"""
+    from src.fake_notion import FakeNotionServer
+
+    server = FakeNotionServer().start()
+    Config.NOTION_BASE_URL = server.base_url
+    Config.NOTION_API_KEY = Config.NOTION_API_KEY or "fake-notion-key"
+    Config.NOTION_HORSE_DB_ID = Config.NOTION_HORSE_DB_ID or "fake-horse-db"
+    Config.NOTION_RACE_DB_ID = Config.NOTION_RACE_DB_ID or "fake-race-db"
+    # 本物のページIDのキャッシュを汚さないよう、キャッシュは一時ファイルにする
+    Config.PAGE_CACHE_PATH = os.path.join(tempfile.mkdtemp(prefix="fake_notion_"), "notion_pages.sqlite3")
+    print(f"代替Notionサーバーに対して実行します: {server.base_url}\n")
+    return server
+
+
 def main():
     """メイン処理"""
+    parser = argparse.ArgumentParser(description="Notion API動作確認")
+    parser.add_argument("--fake", action="store_true", help="ローカルの代替Notionサーバーに対して実行する")
+    args = parser.parse_args()
+    
+    server = use_fake_notion() if args.fake else None
     print("Notion API動作確認を開始します\n")
     
     # 1. 設定確認
@@ -191,6 +216,11 @@ def main():
     print("\n" + "="*50)
     print("✓ すべてのテストが完了しました！")
     print("="*50)
+    if server:
+        print(f"\n{client.transport.summary()}")
+        print(server.summary())
+        server.stop()
+        return 0
     print("\nNotionで以下のページを確認してください：")
     print(f"- 馬データベース: テスト馬")
     print(f"- レースデータベース: テストレース")
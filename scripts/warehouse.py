@@ -0,0 +1,100 @@
+"""ローカルに保存したレース結果（Parquet）の参照スクリプト
+
+src/main.py の実行時に保存したレース結果を、Notionを読まずに検索・集計する。
+
+使い方:
+    python scripts/warehouse.py --horse イクイノックス          # 馬の出走履歴
+    python scripts/warehouse.py --from 2024-01-01 --venue 中山  # 期間・競馬場で絞り込み
+    python scripts/warehouse.py --import-cache                   # HTMLキャッシュの結果ページを取り込む
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.config import Config
+from src.warehouse import RaceWarehouse, is_available
+
+COLUMNS = [
+    "race_date", "venue", "race_number", "race_name", "distance", "track_type", "track_condition",
+    "horse_name", "position_text", "jockey", "finish_time_text", "last_3f", "passing_order", "horse_weight",
+]
+
+
+def import_cache(warehouse: RaceWarehouse) -> int:
+    """HTMLキャッシュに保存した結果ページをパースして保存"""
+    from src.html_cache import HtmlCache
+    from src.scraper import Scraper
+
+    cache = HtmlCache(Config.HTML_CACHE_DIR)
+    scraper = Scraper(use_http=False)
+    pages = 0
+    for url, content_hash in cache.list_pages(kind="race"):
+        if "accessS" not in url:
+            continue
+        html = cache.load_blob(content_hash)
+        if not html:
+            continue
+        with contextlib.redirect_stdout(io.StringIO()):
+            races = scraper._parse_race_html(html, url)
+        for race in races:
+            warehouse.add(race, "retrospective")
+        pages += 1
+    warehouse.flush()
+    print(f"{pages}ページから {warehouse.written_rows}行を保存しました（{warehouse.directory}）")
+    return 0
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="ローカルに保存したレース結果の参照")
+    parser.add_argument("--horse", type=str, help="馬名")
+    parser.add_argument("--from", dest="date_from", type=str, help="開催日の下限（YYYY-MM-DD）")
+    parser.add_argument("--to", dest="date_to", type=str, help="開催日の上限（YYYY-MM-DD）")
+    parser.add_argument("--venue", type=str, help="競馬場")
+    parser.add_argument("--limit", type=int, default=50, help="表示する行数の上限")
+    parser.add_argument("--import-cache", action="store_true", help="HTMLキャッシュの結果ページを保存する")
+    args = parser.parse_args()
+
+    if not is_available():
+        print("エラー: pyarrow がインストールされていません（pip install pyarrow）")
+        return 1
+
+    warehouse = RaceWarehouse(Config.WAREHOUSE_DIR)
+    if args.import_cache:
+        return import_cache(warehouse)
+
+    started = time.perf_counter()
+    table = warehouse.read(
+        start=date.fromisoformat(args.date_from) if args.date_from else None,
+        end=date.fromisoformat(args.date_to) if args.date_to else None,
+        venue=args.venue,
+        horse_name=args.horse,
+        columns=COLUMNS
+    )
+    elapsed = time.perf_counter() - started
+
+    for row in table.slice(0, args.limit).to_pylist():
+        last_3f = f"{row['last_3f']:.1f}" if row["last_3f"] is not None else "-"
+        print(
+            f"{row['race_date']} {row['venue']}{row['race_number']}R {row['race_name']} "
+            f"{row['track_type'] or ''}{row['distance'] or ''}m {row['track_condition'] or ''} | "
+            f"{row['horse_name']} {row['position_text'] or '-'}着 {row['jockey'] or ''} "
+            f"{row['finish_time_text'] or '-'} 上がり{last_3f} 通過{row['passing_order'] or '-'} {row['horse_weight'] or '-'}kg"
+        )
+    if table.num_rows > args.limit:
+        print(f"... 他 {table.num_rows - args.limit}行")
+    print(f"{table.num_rows}行 ({elapsed * 1000:.1f}ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
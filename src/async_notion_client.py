@@ -0,0 +1,105 @@
+"""Notion API非同期操作モジュール"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Optional, Dict, Any, AsyncIterator, Callable, Hashable, List, Tuple
+
+from src.models import Race, Horse, RaceResult
+from src.notion_client import NotionClient
+
+
+class AsyncNotionClient:
+    """
+    NotionClientをasyncioから並行に呼び出すためのクライアント
+
+    各メソッドは同時実行数を制限したスレッドプール上でNotionClientを呼び出す。
+    HTTPコネクションとレート制限は内部のNotionClient（NotionTransport）で共有される。
+    同じ馬・同じレースのページ作成、同じページへの追記は直列化される。
+    """
+
+    def __init__(self, concurrency: int = 4, notion_client: Optional[NotionClient] = None):
+        """
+        初期化
+
+        Args:
+            concurrency: 同時に実行するAPI呼び出しの上限
+            notion_client: 内部で使うNotionClient（省略時は作成）
+        """
+        self.concurrency = max(1, concurrency)
+        self.client = notion_client or NotionClient(pool_size=self.concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="notion")
+        # キー → (ロック, ロックを保持・待機中の呼び出し数)
+        self._locks: Dict[Hashable, Tuple[asyncio.Lock, int]] = {}
+
+    @property
+    def transport(self):
+        """内部NotionClientの通信レイヤー"""
+        return self.client.transport
+
+    @property
+    def page_cache(self):
+        """内部NotionClientのページIDキャッシュ"""
+        return self.client.page_cache
+
+    @property
+    def planner(self):
+        """内部NotionClientの書き込み計画"""
+        return self.client.planner
+
+    @asynccontextmanager
+    async def _locked(self, key: Hashable) -> AsyncIterator[None]:
+        """
+        キーごとのロックを保持する（asyncio.Lockは待機順に取得されるので追記順序が保たれる）
+
+        ロックを保持・待機している呼び出しがなくなったらキーを削除し、
+        長い巡回でもロックの辞書が増え続けないようにする
+        """
+        lock, users = self._locks.get(key) or (asyncio.Lock(), 0)
+        self._locks[key] = (lock, users + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, users = self._locks[key]
+            if users == 1:
+                del self._locks[key]
+            else:
+                self._locks[key] = (lock, users - 1)
+
+    async def _run(self, func: Callable, *args: Any) -> Any:
+        """スレッドプールでNotionClientのメソッドを実行"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def find_horse_page(self, horse_name: str, horse_id: Optional[str] = None) -> Optional[str]:
+        """馬名で馬ページを検索"""
+        return await self._run(self.client.find_horse_page, horse_name, horse_id)
+
+    async def resolve_horse_pages(self, horses: List[Horse]) -> None:
+        """複数の馬の馬ページをまとめて検索（horse.notion_page_idに設定する）"""
+        await self._run(self.client.resolve_horse_pages, horses)
+
+    async def find_or_create_horse_page(self, horse_name: str, horse_id: Optional[str] = None) -> Optional[str]:
+        """馬ページを検索、なければ作成（同名の馬は重複作成しない）"""
+        async with self._locked(("horse", horse_name)):
+            return await self._run(self.client.find_or_create_horse_page, horse_name, horse_id)
+
+    async def find_race_page(self, race_name: str, race_date: date, venue: str, race_number: Optional[int]) -> Optional[str]:
+        """レースページを検索"""
+        return await self._run(self.client.find_race_page, race_name, race_date, venue, race_number)
+
+    async def find_or_create_race_page(self, race: Race) -> Optional[str]:
+        """レースページを検索、なければ作成（同じレースは重複作成しない）"""
+        async with self._locked(("race", race.date, race.venue, race.race_number)):
+            return await self._run(self.client.find_or_create_race_page, race)
+
+    async def add_race_history_to_horse_page(self, horse_page_id: str, race_result: RaceResult) -> bool:
+        """馬ページに出走履歴を追加（同じページへの追記は呼び出し順に直列化）"""
+        async with self._locked(("page", horse_page_id)):
+            return await self._run(self.client.add_race_history_to_horse_page, horse_page_id, race_result)
+
+    def close(self) -> None:
+        """スレッドプールを終了"""
+        self._executor.shutdown(wait=True)
@@ -11,6 +11,35 @@ class Config:
     NOTION_API_KEY: str = os.getenv("NOTION_API_KEY", "")
     NOTION_HORSE_DB_ID: str = os.getenv("NOTION_HORSE_DB_ID", "")
     NOTION_RACE_DB_ID: str = os.getenv("NOTION_RACE_DB_ID", "")
+    NOTION_BASE_URL: str = os.getenv("NOTION_BASE_URL", "https://api.notion.com/v1")
+    NOTION_VERSION: str = os.getenv("NOTION_VERSION", "2022-06-28")
+    NOTION_RATE_LIMIT: float = float(os.getenv("NOTION_RATE_LIMIT", "3"))  # 1秒あたりの平均リクエスト数
+    NOTION_MAX_RETRIES: int = int(os.getenv("NOTION_MAX_RETRIES", "5"))
+    NOTION_FILTER_BATCH: int = int(os.getenv("NOTION_FILTER_BATCH", "100"))  # 1回の検索のorフィルターにまとめる馬名の上限
+    
+    # スクレイピング設定
+    SCRAPER_MAX_PER_HOST: int = int(os.getenv("SCRAPER_MAX_PER_HOST", "4"))  # 同じホストへの同時リクエスト数
+    SCRAPER_REQUEST_DELAY: float = float(os.getenv("SCRAPER_REQUEST_DELAY", "0.2"))  # リクエスト開始間隔（秒）
+    SCRAPER_WAIT_TIMEOUT: float = float(os.getenv("SCRAPER_WAIT_TIMEOUT", "10"))  # ブラウザ操作ごとの待機上限（秒）
+    SCRAPER_PARSER: str = os.getenv("SCRAPER_PARSER", "auto")  # HTMLパーサー（auto / lxml / html.parser）
+    RACE_QUEUE_SIZE: int = int(os.getenv("RACE_QUEUE_SIZE", "24"))  # スクレイピング済みでNotion未処理のレースの上限
+    
+    # 過去のレース結果の一括取得（--from/--to）設定
+    JRADB_ARCHIVE_URL: str = os.getenv("JRADB_ARCHIVE_URL", "https://www.jra.go.jp/JRADB/accessS.html")
+    JRADB_ARCHIVE_CNAME: str = os.getenv("JRADB_ARCHIVE_CNAME", "pw01skl00999999/B3")  # 過去のレース結果（月選択）ページ
+    BACKFILL_MEETING_CONCURRENCY: int = int(os.getenv("BACKFILL_MEETING_CONCURRENCY", "3"))  # 並行に巡回する開催数
+    BACKFILL_REQUEST_DELAY: float = float(os.getenv("BACKFILL_REQUEST_DELAY", "1.0"))  # 一括取得時のリクエスト開始間隔（秒）
+    
+    # ローカルキャッシュ設定
+    CACHE_DIR: str = os.getenv("CACHE_DIR", ".cache")
+    PAGE_CACHE_PATH: str = os.getenv("PAGE_CACHE_PATH", os.path.join(CACHE_DIR, "notion_pages.sqlite3"))
+    PAGE_CACHE_TTL_DAYS: float = float(os.getenv("PAGE_CACHE_TTL_DAYS", "30"))
+    LEDGER_PATH: str = os.getenv("LEDGER_PATH", os.path.join(CACHE_DIR, "retrospective_ledger.sqlite3"))
+    HTML_CACHE_DIR: str = os.getenv("HTML_CACHE_DIR", os.path.join(CACHE_DIR, "html"))  # 取得したHTMLの保存先
+    CHROMEDRIVER_PATH: str = os.getenv("CHROMEDRIVER_PATH", "")  # 指定時はこのchromedriverを常に使う
+    CHROMEDRIVER_CACHE_PATH: str = os.getenv("CHROMEDRIVER_CACHE_PATH", os.path.join(CACHE_DIR, "chromedriver.json"))
+    SCRAPER_DAEMON_SOCKET: str = os.getenv("SCRAPER_DAEMON_SOCKET", os.path.join(CACHE_DIR, "scraper.sock"))  # スクレイパーデーモンの待ち受け先
+    WAREHOUSE_DIR: str = os.getenv("WAREHOUSE_DIR", os.path.join(CACHE_DIR, "warehouse"))  # レース結果のParquetの保存先
     
     @classmethod
     def validate(cls) -> None:
@@ -0,0 +1,177 @@
+"""スクレイピングのチェックポイント記録モジュール"""
+
+import json
+import os
+import threading
+from datetime import date
+from typing import Optional, List, Dict, Set
+
+from src.models import Race, race_to_dict, race_from_dict
+
+
+class CrawlJournal:
+    """
+    巡回済みの開催・レースURLとパース結果を逐次記録するジャーナル
+
+    1行1レコードのJSON Linesファイルに追記していき、途中で失敗しても
+    それまでの結果を失わない。resume=Trueで開くと記録済みの開催・レースは再取得しない。
+
+    対象日を指定しない巡回（今週の開催）は週ごとに別の条件として扱い、さらに
+    match_targetsでメニューから取得した開催の一覧が記録と異なる場合は記録を破棄する。
+    """
+
+    def __init__(self, path: str, mode: str, target_date: Optional[date] = None, resume: bool = False):
+        """
+        初期化
+
+        Args:
+            path: ジャーナルファイルのパス
+            mode: スクレイピングのモード（'prediction' / 'retrospective'）
+            target_date: 対象日（指定がある場合）
+            resume: 既存のジャーナルから再開するかどうか
+        """
+        self.path = path
+        self.session = {"mode": mode, "target_date": target_date.isoformat() if target_date else None}
+        if target_date is None:
+            # 対象日がない巡回は先週の記録から再開しないよう、巡回した週（ISO週）も条件にする
+            year, week, _ = date.today().isocalendar()
+            self.session["week"] = f"{year}-W{week:02d}"
+        self._targets: Optional[List[str]] = None
+        self._race_pages: Dict[str, List[Race]] = {}
+        self._meeting_races: Dict[str, List[str]] = {}
+        self._done_meetings: Set[str] = set()
+        # 複数の開催を並行に巡回する場合（バックフィル）に記録が混ざらないようにする
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if resume and self._load():
+            print(f"チェックポイントから再開します: 開催 {len(self._done_meetings)}件, レース {len(self._race_pages)}件取得済み")
+        else:
+            if resume:
+                print("再開できるチェックポイントがないため、最初から取得します")
+            self._start()
+
+    def _start(self) -> None:
+        """記録を空にしてセッションの見出しを書き込む"""
+        self._targets = None
+        self._race_pages.clear()
+        self._meeting_races.clear()
+        self._done_meetings.clear()
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"type": "session", **self.session}, ensure_ascii=False) + "\n")
+
+    def _load(self) -> bool:
+        """
+        既存のジャーナルを読み込む
+
+        Returns:
+            同じ条件のジャーナルを読み込めた場合True
+        """
+        if not os.path.exists(self.path):
+            return False
+
+        with open(self.path, encoding="utf-8") as f:
+            lines = f.readlines()
+        if not lines:
+            return False
+
+        try:
+            header = json.loads(lines[0])
+        except json.JSONDecodeError:
+            return False
+        if header.get("type") != "session" or any(header.get(k) != v for k, v in self.session.items()):
+            print(f"チェックポイントの条件が異なります（モード: {header.get('mode')}, 対象日: {header.get('target_date')}, 週: {header.get('week')}）")
+            return False
+
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 書き込み途中で中断した最終行は無視する
+                continue
+            if record.get("type") == "race":
+                url = record["url"]
+                self._race_pages[url] = [race_from_dict(r) for r in record.get("races", [])]
+                self._meeting_races.setdefault(record.get("meeting", ""), []).append(url)
+            elif record.get("type") == "meeting":
+                self._done_meetings.add(record["meeting"])
+            elif record.get("type") == "targets":
+                self._targets = record["targets"]
+        return True
+
+    def _append(self, record: dict) -> None:
+        """1レコード追記してディスクに書き出す"""
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def match_targets(self, targets: List[str]) -> None:
+        """
+        巡回する開催の一覧を記録と照合する
+
+        再開した記録の開催一覧が今回メニューから取得した一覧と異なる場合（別の週・別の開催）は
+        記録を破棄して最初から取得し直す
+
+        Args:
+            targets: 開催の識別子（リンクテキストと遷移先）のリスト
+        """
+        with self._lock:
+            if self._targets is not None and self._targets != targets:
+                print("チェックポイントの開催一覧が今回の開催と異なるため、記録を破棄して最初から取得します")
+                self._start()
+            if self._targets is None:
+                self._targets = list(targets)
+                self._append({"type": "targets", "targets": self._targets})
+
+    def is_meeting_done(self, meeting: str) -> bool:
+        """開催の巡回が完了しているか"""
+        return meeting in self._done_meetings
+
+    def has_race(self, url: str) -> bool:
+        """レースページを取得済みか"""
+        return url in self._race_pages
+
+    def races_for(self, url: str) -> List[Race]:
+        """取得済みのレースページのパース結果"""
+        return list(self._race_pages.get(url, []))
+
+    def race_urls_for_meeting(self, meeting: str) -> List[str]:
+        """開催内で取得済みのレースURL"""
+        return list(self._meeting_races.get(meeting, []))
+
+    def races_for_meeting(self, meeting: str) -> List[Race]:
+        """開催内で取得済みの全レース"""
+        races = []
+        for url in self._meeting_races.get(meeting, []):
+            races.extend(self._race_pages.get(url, []))
+        return races
+
+    def record_race(self, meeting: str, url: str, races: List[Race]) -> None:
+        """
+        レースページの取得結果を記録
+
+        Args:
+            meeting: 開催の識別名（リンクテキスト）
+            url: レースページのURL
+            races: パース結果
+        """
+        with self._lock:
+            if url not in self._race_pages:
+                self._meeting_races.setdefault(meeting, []).append(url)
+            self._race_pages[url] = list(races)
+            self._append({"type": "race", "meeting": meeting, "url": url, "races": [race_to_dict(r) for r in races]})
+
+    def record_meeting(self, meeting: str) -> None:
+        """
+        開催の巡回完了を記録
+
+        Args:
+            meeting: 開催の識別名（リンクテキスト）
+        """
+        with self._lock:
+            self._done_meetings.add(meeting)
+            self._append({"type": "meeting", "meeting": meeting})
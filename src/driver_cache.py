@@ -0,0 +1,95 @@
+"""chromedriverのパス固定モジュール"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+from typing import Optional
+
+
+# Chrome本体の候補（--version で "Google Chrome 120.0.6099.109" のように出力するもの）
+CHROME_BINARIES = {
+    "darwin": [
+        "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+        "/Applications/Chromium.app/Contents/MacOS/Chromium",
+    ],
+    "linux": ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser"],
+}
+
+VERSION_PATTERN = re.compile(r'(\d+\.\d+\.\d+(?:\.\d+)?)')
+
+
+def detect_chrome_version() -> Optional[str]:
+    """
+    インストール済みのChromeのバージョンをローカルのコマンドだけで取得
+
+    Returns:
+        バージョン文字列（見つからない場合はNone）
+    """
+    platform = "darwin" if sys.platform == "darwin" else "linux"
+    for binary in CHROME_BINARIES[platform]:
+        try:
+            output = subprocess.run(
+                [binary, "--version"], capture_output=True, text=True, timeout=5
+            ).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        match = VERSION_PATTERN.search(output)
+        if match:
+            return match.group(1)
+    return None
+
+
+class ChromeDriverCache:
+    """
+    解決済みのchromedriverのパスをChromeのバージョンと組にして保存する
+
+    Chromeのバージョンが変わらない限りwebdriver_managerを呼ばず（ネットワークにもアクセスせず）、
+    保存したパスをそのまま使う。バージョンが変わった場合とドライバーが消えた場合だけ再解決する。
+    """
+
+    def __init__(self, path: str):
+        """
+        初期化
+
+        Args:
+            path: 保存先のJSONファイルのパス
+        """
+        self.path = path
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, chrome_version: Optional[str], driver_path: str) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"chrome_version": chrome_version, "driver_path": driver_path}, f, ensure_ascii=False)
+
+    def resolve(self) -> str:
+        """
+        使用するchromedriverのパスを取得
+
+        Returns:
+            chromedriverのパス
+        """
+        chrome_version = detect_chrome_version()
+        cached = self._load()
+        driver_path = cached.get("driver_path")
+        if driver_path and os.path.exists(driver_path):
+            # バージョンが取得できない場合（オフラインでChromeの場所が特殊など）も保存済みのパスを使う
+            if chrome_version is None or cached.get("chrome_version") == chrome_version:
+                return driver_path
+            print(f"Chromeのバージョンが変わったためchromedriverを再取得します: {cached.get('chrome_version')} → {chrome_version}")
+
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        driver_path = ChromeDriverManager().install()
+        self._save(chrome_version, driver_path)
+        return driver_path
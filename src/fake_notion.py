@@ -0,0 +1,553 @@
+"""ローカルで動くNotion APIの代替サーバー
+
+NotionClientが使うエンドポイントだけを実装したインメモリのHTTPサーバー。
+Config.NOTION_BASE_URL（環境変数 NOTION_BASE_URL）をこのサーバーに向けると、
+実際のワークスペースやAPIの利用枠を使わずに動作確認・負荷計測ができる。
+
+対応しているエンドポイント:
+    POST  /v1/databases/{id}/query   （title/rich_text/date/select/multi_select/number フィルターと and/or）
+    POST  /v1/pages
+    GET   /v1/pages/{id}
+    PATCH /v1/pages/{id}
+    GET   /v1/blocks/{id}/children    （start_cursor/page_size によるページネーション）
+    PATCH /v1/blocks/{id}/children    （after 指定の挿入を含む）
+
+単体で起動する場合:
+    python -m src.fake_notion --port 8787 --latency 0.1 --throttle-rate 0.05
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, List, Dict, Any, Tuple
+from urllib.parse import urlparse, parse_qs
+
+
+class FakeNotionError(Exception):
+    """Notion APIのエラーレスポンスに変換される例外"""
+
+    def __init__(self, status: int, code: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _rich_text(items: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """リクエストのリッチテキストをレスポンスの形式（plain_text付き）にする"""
+    result = []
+    for item in items or []:
+        item = dict(item)
+        item.setdefault("type", "text")
+        if item["type"] == "text":
+            text = dict(item.get("text", {}))
+            text.setdefault("link", None)
+            item["text"] = text
+            item["plain_text"] = text.get("content", "")
+        elif item["type"] == "mention":
+            item["plain_text"] = item.get("plain_text", "Untitled")
+        item.setdefault("annotations", {})
+        result.append(item)
+    return result
+
+
+def _plain_text(items: List[Dict[str, Any]]) -> str:
+    return "".join(item.get("plain_text", "") for item in items)
+
+
+class FakeNotionStore:
+    """ページ・ブロックをメモリ上に保持し、APIの各操作を実装する"""
+
+    MAX_PAGE_SIZE = 100
+    MAX_APPEND_CHILDREN = 100
+
+    def __init__(self):
+        """初期化"""
+        self._lock = threading.RLock()
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        self.blocks: Dict[str, Dict[str, Any]] = {}
+        # ブロック（ページを含む）ID → 子ブロックIDのリスト
+        self.children: Dict[str, List[str]] = {}
+
+    # --- プロパティ ---
+
+    def _normalize_property(self, value: Dict[str, Any]) -> Dict[str, Any]:
+        """リクエストのプロパティ値をレスポンスの形式にする"""
+        if "title" in value:
+            return {"type": "title", "title": _rich_text(value["title"])}
+        if "rich_text" in value:
+            return {"type": "rich_text", "rich_text": _rich_text(value["rich_text"])}
+        if "date" in value:
+            date_value = value["date"]
+            return {"type": "date", "date": None if date_value is None else {"start": date_value.get("start"), "end": date_value.get("end")}}
+        if "select" in value:
+            select = value["select"]
+            return {"type": "select", "select": None if select is None else {"name": select.get("name")}}
+        if "multi_select" in value:
+            return {"type": "multi_select", "multi_select": [{"name": v.get("name")} for v in value["multi_select"]]}
+        if "number" in value:
+            return {"type": "number", "number": value["number"]}
+        return dict(value)
+
+    # --- フィルター ---
+
+    def _matches(self, page: Dict[str, Any], condition: Dict[str, Any]) -> bool:
+        """ページがフィルター条件に一致するか"""
+        if "and" in condition:
+            return all(self._matches(page, c) for c in condition["and"])
+        if "or" in condition:
+            return any(self._matches(page, c) for c in condition["or"])
+
+        name = condition.get("property")
+        prop = page["properties"].get(name)
+        for kind in ("title", "rich_text", "date", "select", "multi_select", "number"):
+            if kind in condition:
+                rule = condition[kind]
+                break
+        else:
+            raise FakeNotionError(400, "validation_error", f"Unsupported filter: {condition}")
+
+        if kind in ("title", "rich_text"):
+            value = _plain_text(prop.get(prop["type"], [])) if prop else ""
+            return self._match_text(value, rule)
+        if kind == "date":
+            value = ((prop or {}).get("date") or {}).get("start")
+            return self._match_ordered(value[:10] if value else None, rule)
+        if kind == "select":
+            value = ((prop or {}).get("select") or {}).get("name")
+            return self._match_text(value or "", rule)
+        if kind == "multi_select":
+            names = [v.get("name") for v in (prop or {}).get("multi_select", [])]
+            if "contains" in rule:
+                return rule["contains"] in names
+            if "does_not_contain" in rule:
+                return rule["does_not_contain"] not in names
+            if "is_empty" in rule:
+                return not names
+            if "is_not_empty" in rule:
+                return bool(names)
+        if kind == "number":
+            value = (prop or {}).get("number")
+            return self._match_ordered(value, rule)
+        raise FakeNotionError(400, "validation_error", f"Unsupported filter: {condition}")
+
+    def _match_text(self, value: str, rule: Dict[str, Any]) -> bool:
+        if "equals" in rule:
+            return value == rule["equals"]
+        if "does_not_equal" in rule:
+            return value != rule["does_not_equal"]
+        if "contains" in rule:
+            return rule["contains"] in value
+        if "does_not_contain" in rule:
+            return rule["does_not_contain"] not in value
+        if "starts_with" in rule:
+            return value.startswith(rule["starts_with"])
+        if "ends_with" in rule:
+            return value.endswith(rule["ends_with"])
+        if "is_empty" in rule:
+            return not value
+        if "is_not_empty" in rule:
+            return bool(value)
+        raise FakeNotionError(400, "validation_error", f"Unsupported text filter: {rule}")
+
+    def _match_ordered(self, value: Any, rule: Dict[str, Any]) -> bool:
+        if "is_empty" in rule:
+            return value is None
+        if "is_not_empty" in rule:
+            return value is not None
+        if value is None:
+            return False
+        if "equals" in rule:
+            return value == rule["equals"]
+        if "does_not_equal" in rule:
+            return value != rule["does_not_equal"]
+        for op, test in (
+            ("greater_than", lambda a, b: a > b), ("after", lambda a, b: a > b),
+            ("less_than", lambda a, b: a < b), ("before", lambda a, b: a < b),
+            ("greater_than_or_equal_to", lambda a, b: a >= b), ("on_or_after", lambda a, b: a >= b),
+            ("less_than_or_equal_to", lambda a, b: a <= b), ("on_or_before", lambda a, b: a <= b),
+        ):
+            if op in rule:
+                return test(value, rule[op])
+        raise FakeNotionError(400, "validation_error", f"Unsupported filter: {rule}")
+
+    # --- ページネーション ---
+
+    def _paginate(self, items: List[Dict[str, Any]], start_cursor: Optional[str], page_size: Optional[int]) -> Dict[str, Any]:
+        page_size = min(int(page_size or self.MAX_PAGE_SIZE), self.MAX_PAGE_SIZE)
+        start = 0
+        if start_cursor:
+            ids = [item["id"] for item in items]
+            if start_cursor not in ids:
+                raise FakeNotionError(400, "validation_error", f"start_cursor {start_cursor} is invalid")
+            start = ids.index(start_cursor)
+        chunk = items[start:start + page_size]
+        has_more = start + page_size < len(items)
+        return {
+            "object": "list",
+            "results": chunk,
+            "has_more": has_more,
+            "next_cursor": items[start + page_size]["id"] if has_more else None,
+        }
+
+    # --- 操作 ---
+
+    def query_database(self, database_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """POST /databases/{id}/query"""
+        with self._lock:
+            candidates = [
+                page for page in self.pages.values()
+                if page["parent"].get("database_id") == database_id and not page["archived"]
+            ]
+            condition = body.get("filter")
+            if condition:
+                candidates = [page for page in candidates if self._matches(page, condition)]
+            return self._paginate(candidates, body.get("start_cursor"), body.get("page_size"))
+
+    def create_page(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """POST /pages"""
+        parent = body.get("parent") or {}
+        if not parent.get("database_id") and not parent.get("page_id"):
+            raise FakeNotionError(400, "validation_error", "body.parent should be defined")
+        children = body.get("children") or []
+        if len(children) > self.MAX_APPEND_CHILDREN:
+            raise FakeNotionError(400, "validation_error", f"body.children.length should be ≤ {self.MAX_APPEND_CHILDREN}")
+
+        with self._lock:
+            page_id = str(uuid.uuid4())
+            now = _now()
+            page = {
+                "object": "page",
+                "id": page_id,
+                "created_time": now,
+                "last_edited_time": now,
+                "archived": False,
+                "parent": {"type": "database_id" if parent.get("database_id") else "page_id", **parent},
+                "properties": {name: self._normalize_property(value) for name, value in (body.get("properties") or {}).items()},
+                "url": f"https://www.notion.so/{page_id.replace('-', '')}",
+            }
+            self.pages[page_id] = page
+            self.children[page_id] = []
+            self._insert_blocks(page_id, children, after=None)
+            return page
+
+    def retrieve_page(self, page_id: str) -> Dict[str, Any]:
+        """GET /pages/{id}"""
+        with self._lock:
+            page = self.pages.get(page_id)
+            if page is None:
+                raise FakeNotionError(404, "object_not_found", f"Could not find page with ID: {page_id}.")
+            return page
+
+    def update_page(self, page_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """PATCH /pages/{id}"""
+        with self._lock:
+            page = self.retrieve_page(page_id)
+            if page["archived"] and body.get("archived") is not False:
+                raise FakeNotionError(400, "validation_error", "Can't edit block that is archived. You must unarchive the block before editing.")
+            for name, value in (body.get("properties") or {}).items():
+                page["properties"][name] = self._normalize_property(value)
+            if "archived" in body:
+                page["archived"] = bool(body["archived"])
+            page["last_edited_time"] = _now()
+            return page
+
+    def _parent_of(self, block_id: str) -> Dict[str, Any]:
+        """ページまたはブロックを取得（存在しない・アーカイブ済みの場合はエラー）"""
+        target = self.pages.get(block_id) or self.blocks.get(block_id)
+        if target is None:
+            raise FakeNotionError(404, "object_not_found", f"Could not find block with ID: {block_id}.")
+        return target
+
+    def list_block_children(self, block_id: str, start_cursor: Optional[str], page_size: Optional[int]) -> Dict[str, Any]:
+        """GET /blocks/{id}/children"""
+        with self._lock:
+            self._parent_of(block_id)
+            items = [self.blocks[child_id] for child_id in self.children.get(block_id, [])]
+            return {**self._paginate(items, start_cursor, page_size), "type": "block", "block": {}}
+
+    def append_block_children(self, block_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """PATCH /blocks/{id}/children"""
+        children = body.get("children") or []
+        if len(children) > self.MAX_APPEND_CHILDREN:
+            raise FakeNotionError(400, "validation_error", f"body.children.length should be ≤ {self.MAX_APPEND_CHILDREN}")
+        with self._lock:
+            target = self._parent_of(block_id)
+            if target.get("archived"):
+                raise FakeNotionError(400, "validation_error", "Can't edit block that is archived. You must unarchive the block before editing.")
+            created = self._insert_blocks(block_id, children, after=body.get("after"))
+            return {"object": "list", "results": created, "has_more": False, "next_cursor": None}
+
+    def _insert_blocks(self, parent_id: str, children: List[Dict[str, Any]], after: Optional[str]) -> List[Dict[str, Any]]:
+        """子ブロックを作成して親の子リストに挿入（after指定時はその直後）"""
+        siblings = self.children.setdefault(parent_id, [])
+        if after:
+            if after not in siblings:
+                raise FakeNotionError(400, "validation_error", f"Block {after} is not a child of {parent_id}.")
+            position = siblings.index(after) + 1
+        else:
+            position = len(siblings)
+
+        created = []
+        for child in children:
+            block_type = child.get("type")
+            if not block_type or block_type not in child:
+                raise FakeNotionError(400, "validation_error", f"Invalid block: {child}")
+            content = dict(child[block_type])
+            nested = content.pop("children", None) or []
+            if "rich_text" in content:
+                content["rich_text"] = _rich_text(content["rich_text"])
+            if block_type == "table_row":
+                content["cells"] = [_rich_text(cell) for cell in content.get("cells", [])]
+
+            block_id = str(uuid.uuid4())
+            now = _now()
+            block = {
+                "object": "block",
+                "id": block_id,
+                "parent": {"type": "page_id" if parent_id in self.pages else "block_id",
+                           ("page_id" if parent_id in self.pages else "block_id"): parent_id},
+                "created_time": now,
+                "last_edited_time": now,
+                "has_children": bool(nested),
+                "archived": False,
+                "type": block_type,
+                block_type: content,
+            }
+            self.blocks[block_id] = block
+            self.children[block_id] = []
+            if nested:
+                self._insert_blocks(block_id, nested, after=None)
+            siblings.insert(position, block_id)
+            position += 1
+            created.append(block)
+        return created
+
+    def archive_page(self, page_id: str) -> None:
+        """ページをアーカイブ（キャッシュ無効化の動作確認用）"""
+        with self._lock:
+            self.retrieve_page(page_id)["archived"] = True
+
+
+class FakeNotionServer:
+    """
+    FakeNotionStoreをHTTPで公開するサーバー
+
+    latencyで1リクエストごとの応答遅延を、throttle_rate（確率）とrate_limit（1秒あたりの上限）で
+    429 rate_limited の発生を指定できる。429にはRetry-Afterヘッダーを付ける。
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        throttle_rate: float = 0.0,
+        rate_limit: Optional[float] = None,
+        retry_after: float = 1.0,
+        store: Optional[FakeNotionStore] = None
+    ):
+        """
+        初期化
+
+        Args:
+            host: 待ち受けるホスト
+            port: 待ち受けるポート（0の場合は空いているポート）
+            latency: 応答までの遅延（秒）
+            jitter: 遅延に加えるランダムな揺らぎの最大値（秒）
+            throttle_rate: 各リクエストが429になる確率（0〜1）
+            rate_limit: 1秒あたりのリクエスト上限（超えた分は429、Noneは無制限）
+            retry_after: 429に付けるRetry-Afterの秒数
+            store: データの保存先（省略時は空のストア）
+        """
+        self.store = store or FakeNotionStore()
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+
+        self._lock = threading.Lock()
+        self._tokens = rate_limit or 0.0
+        self._last_refill = time.monotonic()
+        self.stats: Dict[str, int] = {}
+
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """NOTION_BASE_URLに設定するURL"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeNotionServer":
+        """バックグラウンドのスレッドで起動"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-notion", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """停止"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeNotionServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def _should_throttle(self) -> bool:
+        """このリクエストを429にするか"""
+        if self.throttle_rate and random.random() < self.throttle_rate:
+            return True
+        if not self.rate_limit:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate_limit, self._tokens + (now - self._last_refill) * self.rate_limit)
+            self._last_refill = now
+            if self._tokens < 1:
+                return True
+            self._tokens -= 1
+            return False
+
+    def dispatch(self, method: str, path: str, query: Dict[str, List[str]], body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """
+        リクエストを処理してレスポンスを返す
+
+        Returns:
+            (ステータスコード, レスポンスJSON)
+        """
+        store = self.store
+        routes = (
+            ("POST", r"^/v1/databases/([^/]+)/query$", "query_database", lambda m: store.query_database(m.group(1), body)),
+            ("POST", r"^/v1/pages$", "create_page", lambda m: store.create_page(body)),
+            ("GET", r"^/v1/pages/([^/]+)$", "retrieve_page", lambda m: store.retrieve_page(m.group(1))),
+            ("PATCH", r"^/v1/pages/([^/]+)$", "update_page", lambda m: store.update_page(m.group(1), body)),
+            ("GET", r"^/v1/blocks/([^/]+)/children$", "list_block_children", lambda m: store.list_block_children(
+                m.group(1), query.get("start_cursor", [None])[0], query.get("page_size", [None])[0])),
+            ("PATCH", r"^/v1/blocks/([^/]+)/children$", "append_block_children", lambda m: store.append_block_children(m.group(1), body)),
+        )
+        for route_method, pattern, name, handler in routes:
+            match = re.match(pattern, path)
+            if match and method == route_method:
+                self._count(name)
+                try:
+                    return 200, handler(match)
+                except FakeNotionError as e:
+                    return e.status, {"object": "error", "status": e.status, "code": e.code, "message": e.message}
+        return 400, {"object": "error", "status": 400, "code": "invalid_request_url", "message": f"Invalid request URL: {method} {path}"}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                server._count("requests")
+
+                delay = server.latency + (random.uniform(0, server.jitter) if server.jitter else 0)
+                if delay > 0:
+                    time.sleep(delay)
+
+                headers = {}
+                if not self.headers.get("Authorization"):
+                    status, payload = 401, {"object": "error", "status": 401, "code": "unauthorized", "message": "API token is invalid."}
+                elif server._should_throttle():
+                    server._count("throttled")
+                    status = 429
+                    payload = {"object": "error", "status": 429, "code": "rate_limited", "message": "You have been rate limited. Please try again in a few minutes."}
+                    headers["Retry-After"] = f"{server.retry_after:g}"
+                else:
+                    try:
+                        body = json.loads(raw) if raw else {}
+                    except json.JSONDecodeError:
+                        body = None
+                    if body is None:
+                        status, payload = 400, {"object": "error", "status": 400, "code": "invalid_json", "message": "Error parsing JSON body."}
+                    else:
+                        parsed = urlparse(self.path)
+                        status, payload = server.dispatch(self.command, parsed.path, parse_qs(parsed.query), body)
+
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = _handle
+            do_POST = _handle
+            do_PATCH = _handle
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def summary(self) -> str:
+        """受けたリクエストの集計"""
+        with self._lock:
+            stats = dict(self.stats)
+        endpoints = ", ".join(f"{k} {v}回" for k, v in sorted(stats.items()) if k not in ("requests", "throttled"))
+        return f"代替Notionサーバー: 受信 {stats.get('requests', 0)}回 (429 {stats.get('throttled', 0)}回) [{endpoints}]"
+
+
+def main():
+    """単体で起動"""
+    parser = argparse.ArgumentParser(description="ローカルで動くNotion APIの代替サーバー")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency", type=float, default=0.0, help="応答までの遅延（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="遅延に加えるランダムな揺らぎの最大値（秒）")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="各リクエストが429になる確率（0〜1）")
+    parser.add_argument("--rate-limit", type=float, default=None, help="1秒あたりのリクエスト上限（超えた分は429）")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="429に付けるRetry-Afterの秒数")
+    args = parser.parse_args()
+
+    server = FakeNotionServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        throttle_rate=args.throttle_rate,
+        rate_limit=args.rate_limit,
+        retry_after=args.retry_after
+    )
+    print(f"代替Notionサーバーを起動しました: {server.base_url}")
+    print(f"  NOTION_BASE_URL={server.base_url} を設定するとこのサーバーを使います")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(server.summary())
+        server._server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
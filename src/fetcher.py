@@ -0,0 +1,157 @@
+"""JRAページのHTTP取得モジュール"""
+
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict
+from urllib.parse import urlparse, parse_qs
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class HttpFetcher:
+    """
+    JRAのページをブラウザを使わずHTTPで直接取得する
+
+    JRADB（accessD.htmlなど）のページは静的HTMLなので、CNAMEパラメータを付けた
+    リクエストで取得できる。JRAのページはShift_JISなので明示的にデコードする。
+    """
+
+    # Shift_JISの拡張文字（①や髙など）も扱えるようにcp932でデコードする
+    DEFAULT_ENCODING = "cp932"
+
+    CHARSET_PATTERN = re.compile(rb'charset=["\']?([\w-]+)', re.I)
+
+    def __init__(self, session: requests.Session, timeout: float = 10, max_per_host: int = 4, delay: float = 0.2):
+        """
+        初期化
+
+        Args:
+            session: ヘッダー設定済みのHTTPセッション
+            timeout: 1リクエストのタイムアウト秒数
+            max_per_host: 同じホストへの同時リクエスト数の上限
+            delay: 同じホストへのリクエスト開始間隔（秒）
+        """
+        self.session = session
+        self.timeout = timeout
+        self.max_per_host = max(1, max_per_host)
+        self.delay = delay
+        adapter = HTTPAdapter(pool_connections=self.max_per_host, pool_maxsize=self.max_per_host)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._host_slots: Dict[str, threading.Semaphore] = {}
+        self._host_next_start: Dict[str, float] = {}
+
+    def _wait_for_host(self, host: str) -> threading.Semaphore:
+        """
+        ホストごとの同時実行枠を確保し、前回のリクエスト開始からdelay秒空ける
+
+        Returns:
+            確保した枠（呼び出し側で解放する）
+        """
+        with self._lock:
+            slot = self._host_slots.setdefault(host, threading.Semaphore(self.max_per_host))
+        slot.acquire()
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._host_next_start.get(host, now))
+            self._host_next_start[host] = start + self.delay
+        if start > now:
+            time.sleep(start - now)
+        return slot
+
+    def _decode(self, response: requests.Response) -> str:
+        """レスポンスをヘッダーまたはmetaタグの文字コードでデコード"""
+        content = response.content
+        encoding = None
+
+        content_type = response.headers.get("Content-Type", "")
+        match = self.CHARSET_PATTERN.search(content_type.encode("ascii", "ignore"))
+        if not match:
+            match = self.CHARSET_PATTERN.search(content[:2048])
+        if match:
+            encoding = match.group(1).decode("ascii").lower()
+
+        if not encoding or encoding in ("shift_jis", "shift-jis", "sjis", "x-sjis", "windows-31j"):
+            encoding = self.DEFAULT_ENCODING
+        try:
+            return content.decode(encoding, errors="replace")
+        except LookupError:
+            return content.decode(self.DEFAULT_ENCODING, errors="replace")
+
+    def fetch(self, url: str) -> Optional[str]:
+        """
+        URLのHTMLを取得
+
+        JRADBのURL（?CNAME=...）はCNAMEをフォームパラメータとしてPOSTする。
+
+        Args:
+            url: 取得するURL
+
+        Returns:
+            デコード済みのHTML（失敗時はNone）
+        """
+        parsed = urlparse(url)
+        cname = parse_qs(parsed.query).get("CNAME", [None])[0]
+        if "/JRADB/" in parsed.path and cname:
+            return self.fetch_cname(f"{parsed.scheme}://{parsed.netloc}{parsed.path}", cname)
+
+        slot = self._wait_for_host(parsed.netloc)
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            return self._decode(response)
+        except Exception as e:
+            print(f"      HTTP取得エラー ({url}): {e}")
+            return None
+        finally:
+            slot.release()
+
+    def fetch_all(self, urls: List[str]) -> Dict[str, Optional[str]]:
+        """
+        複数のURLを並行に取得
+
+        ホストごとの同時実行数上限とリクエスト間隔を守りながら取得する
+
+        Args:
+            urls: 取得するURLのリスト
+
+        Returns:
+            URL→HTML（失敗したURLはNone）
+        """
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return {}
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.max_per_host, thread_name_prefix="fetch") as executor:
+            pages = dict(zip(urls, executor.map(self.fetch, urls)))
+        ok = sum(1 for html in pages.values() if html)
+        print(f"  {len(urls)}件のページを取得しました (成功 {ok}件, {time.monotonic() - started:.1f}秒)")
+        return pages
+
+    def fetch_cname(self, action_url: str, cname: str) -> Optional[str]:
+        """
+        JRADBのページをCNAMEで取得（JRAサイトのdoAction相当）
+
+        Args:
+            action_url: accessD.htmlなどのURL
+            cname: CNAMEパラメータ
+
+        Returns:
+            デコード済みのHTML（失敗時はNone）
+        """
+        slot = self._wait_for_host(urlparse(action_url).netloc)
+        try:
+            response = self.session.post(action_url, data={"cname": cname}, timeout=self.timeout)
+            response.raise_for_status()
+            return self._decode(response)
+        except Exception as e:
+            print(f"      HTTP取得エラー ({action_url} CNAME={cname}): {e}")
+            return None
+        finally:
+            slot.release()
@@ -0,0 +1,94 @@
+"""馬ページインデックスモジュール"""
+
+import threading
+from typing import Optional, Dict, Any, Iterable
+
+
+class HorseIndex:
+    """
+    馬データベース全体を一括で読み込んだ、馬名→ページIDのインメモリ索引
+
+    並行実行時は複数のスレッドから参照・更新されるため、索引の操作はロックで保護する
+    """
+
+    def __init__(self, title_property: str = "馬名"):
+        """
+        初期化
+
+        Args:
+            title_property: 馬データベースのタイトルプロパティ名
+        """
+        self.title_property = title_property
+        self._pages: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pages)
+
+    def __contains__(self, horse_name: str) -> bool:
+        with self._lock:
+            return horse_name in self._pages
+
+    def load(self, pages: Iterable[Dict[str, Any]]) -> int:
+        """
+        データベースクエリ結果のページ一覧から索引を構築
+
+        Args:
+            pages: Notionのページオブジェクト（全ページ分）
+
+        Returns:
+            索引に登録した馬の数
+        """
+        loaded: Dict[str, str] = {}
+        for page in pages:
+            name = self.extract_title(page)
+            # 同名ページが複数ある場合は従来の検索結果（先頭）に合わせて最初のものを優先
+            if name and name not in loaded:
+                loaded[name] = page["id"]
+        with self._lock:
+            self._pages = loaded
+            self.loaded = True
+        return len(loaded)
+
+    def get(self, horse_name: str) -> Optional[str]:
+        """
+        馬名からページIDを取得
+
+        Args:
+            horse_name: 馬名
+
+        Returns:
+            ページID（索引にない場合はNone）
+        """
+        with self._lock:
+            return self._pages.get(horse_name)
+
+    def add(self, horse_name: str, page_id: str) -> None:
+        """
+        実行中に作成したページを索引に追加
+
+        Args:
+            horse_name: 馬名
+            page_id: ページID
+        """
+        if horse_name and page_id:
+            with self._lock:
+                self._pages[horse_name] = page_id
+
+    def remove_page(self, page_id: str) -> None:
+        """
+        アーカイブ・削除されたページを索引から取り除く
+
+        Args:
+            page_id: ページID
+        """
+        with self._lock:
+            for name in [n for n, pid in self._pages.items() if pid == page_id]:
+                del self._pages[name]
+
+    def extract_title(self, page: Dict[str, Any]) -> str:
+        """ページオブジェクトからタイトル（馬名）を取り出す"""
+        prop = page.get("properties", {}).get(self.title_property, {})
+        return "".join(t.get("plain_text", "") for t in prop.get("title", [])).strip()
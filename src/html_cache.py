@@ -0,0 +1,238 @@
+"""取得したHTMLのローカル保存モジュール"""
+
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+from typing import Optional, List, Tuple
+from urllib.parse import urlparse, parse_qs
+
+
+class HtmlCache:
+    """
+    スクレイパーが取得したページをコンテンツハッシュ単位で圧縮保存するキャッシュ
+
+    本文は blobs/<ハッシュ先頭2文字>/<ハッシュ>.html.gz に保存し、URL（JRADBはCNAME）・
+    取得日時・種類との対応はSQLiteの索引に記録する。巡回ごとに開催とレースURLの並びも
+    記録しておき、--replay でネットワークを使わずに同じ巡回を再現できるようにする。
+    """
+
+    def __init__(self, directory: str):
+        """
+        初期化
+
+        Args:
+            directory: 保存先ディレクトリ
+        """
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(directory, "blobs"), exist_ok=True)
+
+        self._conn = sqlite3.connect(os.path.join(directory, "index.sqlite3"), check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                page_key TEXT NOT NULL,
+                url TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                kind TEXT,
+                fetched_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_pages_key ON pages (page_key, fetched_at);
+            CREATE TABLE IF NOT EXISTS crawls (
+                crawl_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                mode TEXT NOT NULL,
+                target_date TEXT,
+                started_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS crawl_pages (
+                crawl_id INTEGER NOT NULL,
+                seq INTEGER NOT NULL,
+                meeting TEXT NOT NULL,
+                url TEXT NOT NULL,
+                PRIMARY KEY (crawl_id, seq)
+            );
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def page_key(url: str) -> str:
+        """
+        URLからキャッシュのキーを求める（JRADBのページはCNAMEで識別する）
+
+        Args:
+            url: ページのURL
+
+        Returns:
+            キー
+        """
+        parsed = urlparse(url)
+        cname = parse_qs(parsed.query).get("CNAME", [None])[0]
+        if cname:
+            return f"CNAME:{cname}"
+        return url
+
+    def _blob_path(self, content_hash: str) -> str:
+        return os.path.join(self.directory, "blobs", content_hash[:2], f"{content_hash}.html.gz")
+
+    def store(self, url: str, html: str, kind: str = "race") -> str:
+        """
+        ページを保存
+
+        Args:
+            url: ページのURL
+            html: HTML
+            kind: ページの種類（'meeting' / 'race'）
+
+        Returns:
+            コンテンツハッシュ
+        """
+        data = html.encode("utf-8")
+        content_hash = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(content_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO pages (page_key, url, content_hash, kind, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (self.page_key(url), url, content_hash, kind, time.time())
+            )
+            self._conn.commit()
+        return content_hash
+
+    def load(self, url: str) -> Optional[str]:
+        """
+        最後に保存したページを取得
+
+        Args:
+            url: ページのURL
+
+        Returns:
+            HTML（保存されていない場合はNone）
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash FROM pages WHERE page_key = ? ORDER BY fetched_at DESC LIMIT 1",
+                (self.page_key(url),)
+            ).fetchone()
+        if not row:
+            return None
+        return self.load_blob(row[0])
+
+    def load_blob(self, content_hash: str) -> Optional[str]:
+        """
+        コンテンツハッシュからHTMLを取得
+
+        Args:
+            content_hash: コンテンツハッシュ
+
+        Returns:
+            HTML（存在しない場合はNone）
+        """
+        path = self._blob_path(content_hash)
+        if not os.path.exists(path):
+            return None
+        with gzip.open(path, "rb") as f:
+            return f.read().decode("utf-8")
+
+    def list_pages(self, kind: Optional[str] = None) -> List[Tuple[str, str]]:
+        """
+        保存済みページ（キーごとに最新のもの）の一覧
+
+        Args:
+            kind: ページの種類で絞り込む場合に指定
+
+        Returns:
+            (URL, コンテンツハッシュ)のリスト
+        """
+        query = (
+            "SELECT url, content_hash FROM pages p WHERE fetched_at = "
+            "(SELECT MAX(fetched_at) FROM pages WHERE page_key = p.page_key)"
+        )
+        params: tuple = ()
+        if kind:
+            query += " AND kind = ?"
+            params = (kind,)
+        with self._lock:
+            return [(row[0], row[1]) for row in self._conn.execute(query + " ORDER BY page_key", params)]
+
+    def begin_crawl(self, mode: str, target_date: Optional[date] = None) -> int:
+        """
+        巡回の記録を開始
+
+        Args:
+            mode: スクレイピングのモード
+            target_date: 対象日
+
+        Returns:
+            巡回ID
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO crawls (mode, target_date, started_at) VALUES (?, ?, ?)",
+                (mode, target_date.isoformat() if target_date else None, time.time())
+            )
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def add_crawl_pages(self, crawl_id: int, meeting: str, urls: List[str]) -> None:
+        """
+        巡回で見つかった開催のレースURLを記録
+
+        Args:
+            crawl_id: 巡回ID
+            meeting: 開催の識別名
+            urls: レースURLのリスト
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT COALESCE(MAX(seq), -1) FROM crawl_pages WHERE crawl_id = ?", (crawl_id,)).fetchone()
+            seq = row[0] + 1
+            self._conn.executemany(
+                "INSERT INTO crawl_pages (crawl_id, seq, meeting, url) VALUES (?, ?, ?, ?)",
+                [(crawl_id, seq + i, meeting, url) for i, url in enumerate(urls)]
+            )
+            self._conn.commit()
+
+    def latest_crawl(self, mode: str, target_date: Optional[date] = None) -> List[Tuple[str, List[str]]]:
+        """
+        指定条件で最後に記録した巡回の開催・レースURLの並び
+
+        Args:
+            mode: スクレイピングのモード
+            target_date: 対象日
+
+        Returns:
+            (開催の識別名, レースURLのリスト)のリスト（記録がない場合は空）
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT crawl_id FROM crawls WHERE mode = ? AND target_date IS ? "
+                "AND crawl_id IN (SELECT crawl_id FROM crawl_pages) ORDER BY crawl_id DESC LIMIT 1",
+                (mode, target_date.isoformat() if target_date else None)
+            ).fetchone()
+            if not row:
+                return []
+            pages = self._conn.execute(
+                "SELECT meeting, url FROM crawl_pages WHERE crawl_id = ? ORDER BY seq", (row[0],)
+            ).fetchall()
+
+        meetings: List[Tuple[str, List[str]]] = []
+        for meeting, url in pages:
+            if not meetings or meetings[-1][0] != meeting:
+                meetings.append((meeting, []))
+            meetings[-1][1].append(url)
+        return meetings
+
+    def close(self) -> None:
+        """接続を閉じる"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,104 @@
+"""回顧モードの処理済み記録モジュール"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from src.models import Race, race_slot
+
+
+class ResultLedger:
+    """
+    出走履歴を書き込み済みの（レース, 馬）をSQLiteに記録する台帳
+
+    回顧モードを再実行したときに、既に書き込んだ出走履歴を重複して追記しないために使う
+    """
+
+    def __init__(self, path: str):
+        """
+        初期化
+
+        Args:
+            path: SQLiteファイルのパス
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS processed_results (
+                race_date TEXT NOT NULL,
+                venue TEXT NOT NULL,
+                race_number INTEGER NOT NULL,  -- レース番号（ない場合は 'name:レース名'）
+                horse_name TEXT NOT NULL,
+                horse_page_id TEXT,
+                processed_at REAL NOT NULL,
+                PRIMARY KEY (race_date, venue, race_number, horse_name)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def _key(self, race: Race, horse_name: str) -> tuple:
+        return (race.date.isoformat(), race.venue, race_slot(race.race_number, race.name), horse_name)
+
+    def is_recorded(self, race: Race, horse_name: str) -> bool:
+        """
+        出走履歴を書き込み済みかどうか
+
+        Args:
+            race: レース情報
+            horse_name: 馬名
+
+        Returns:
+            書き込み済みならTrue
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM processed_results WHERE race_date = ? AND venue = ? AND race_number = ? AND horse_name = ?",
+                self._key(race, horse_name)
+            ).fetchone()
+        return row is not None
+
+    def record(self, race: Race, horse_name: str, horse_page_id: Optional[str] = None) -> None:
+        """
+        出走履歴を書き込んだことを記録
+
+        Args:
+            race: レース情報
+            horse_name: 馬名
+            horse_page_id: 書き込んだ馬ページID
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO processed_results "
+                "(race_date, venue, race_number, horse_name, horse_page_id, processed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                self._key(race, horse_name) + (horse_page_id, time.time())
+            )
+            self._conn.commit()
+
+    def forget_race(self, race: Race) -> None:
+        """指定したレースの記録を削除（書き直したい場合用）"""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM processed_results WHERE race_date = ? AND venue = ? AND race_number = ?",
+                self._key(race, "")[:3]
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """全記録を削除"""
+        with self._lock:
+            self._conn.execute("DELETE FROM processed_results")
+            self._conn.commit()
+
+    def close(self) -> None:
+        """接続を閉じる"""
+        with self._lock:
+            self._conn.close()
@@ -1,14 +1,16 @@
 """メインエントリーポイント"""
 
 import argparse
+import os
 from datetime import date, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
 from src.config import Config
-from src.notion_client import NotionClient
-from src.scraper import Scraper
-from src.usecases.retrospective import RetrospectiveUseCase
-from src.usecases.prediction import PredictionUseCase
+from src.ledger import ResultLedger
+from src.crawl_journal import CrawlJournal
+from src.html_cache import HtmlCache
+from src.profiler import Profiler
+from src.scraper_daemon import DaemonScraper, is_daemon_running
 
 
 def parse_date(date_str: str) -> date:
@@ -27,6 +29,124 @@ def parse_date(date_str: str) -> date:
         raise ValueError(f"無効な日付形式です: {date_str} (YYYY-MM-DD形式で指定してください)")
 
 
+def parse_range(week: Optional[str], date_from: Optional[str], date_to: Optional[str]) -> Optional[Tuple[date, date]]:
+    """
+    retrospectiveモードの対象期間を決定
+    
+    Args:
+        week: --week（その日から7日間）
+        date_from: --from
+        date_to: --to（省略時は今日）
+        
+    Returns:
+        (開始日, 終了日)。期間の指定がない場合はNone（現在表示されているレースを処理）
+    """
+    if week and (date_from or date_to):
+        raise ValueError("--week と --from/--to は同時に指定できません")
+    if date_to and not date_from:
+        raise ValueError("--to を指定する場合は --from も指定してください")
+    if week:
+        start = parse_date(week)
+        return start, start + timedelta(days=6)
+    if date_from:
+        start = parse_date(date_from)
+        end = parse_date(date_to) if date_to else date.today()
+        if end < start:
+            raise ValueError(f"期間の終了日が開始日より前です: {start} 〜 {end}")
+        return start, end
+    return None
+
+
+def create_scraper(mode: str, target_date: Optional[date], resume: bool, replay: bool = False, use_daemon: bool = True,
+                   crawl_range: Optional[Tuple[date, date]] = None):
+    """
+    チェックポイント記録・HTMLキャッシュ付きのスクレイパーを作成
+    
+    スクレイパーデーモンが起動している場合は、デーモンに依頼するクライアントを返す
+    
+    Args:
+        mode: 実行モード
+        target_date: 対象日（predictionモード）
+        resume: 前回のチェックポイントから再開するかどうか
+        replay: キャッシュに保存した前回の巡回を再現するかどうか
+        use_daemon: 起動中のデーモンがあれば使うかどうか
+        crawl_range: 過去のレース結果を取得する期間（開始日, 終了日）。指定時はデーモンを使わない
+        
+    Returns:
+        Scraper または DaemonScraper
+    """
+    if use_daemon and not replay and not crawl_range and is_daemon_running():
+        return DaemonScraper(resume=resume)
+    
+    from src.scraper import Scraper
+    
+    html_cache = HtmlCache(Config.HTML_CACHE_DIR)
+    if replay:
+        return Scraper(html_cache=html_cache, replay=True)
+    
+    if crawl_range:
+        # 期間ごとに別のチェックポイントとして扱う（同じ期間なら --resume で再開できる）
+        journal_name = "backfill"
+        mode = f"backfill:{crawl_range[0].isoformat()}:{crawl_range[1].isoformat()}"
+    else:
+        journal_name = mode
+    journal = CrawlJournal(
+        os.path.join(Config.CACHE_DIR, f"crawl_journal_{journal_name}.jsonl"),
+        mode=mode,
+        target_date=target_date,
+        resume=resume
+    )
+    return Scraper(journal=journal, html_cache=html_cache)
+
+
+def attach_profiler(profiler: Profiler, scraper, notion_client) -> None:
+    """
+    スクレイパーの各段階・NotionClientの各メソッド・Notion API呼び出しに計測を仕込む
+    
+    Args:
+        profiler: 計測結果の記録先
+        scraper: スクレイパー（DaemonScraperの場合はデーモンへの依頼全体を計測する）
+        notion_client: NotionClient または AsyncNotionClient
+    """
+    if isinstance(scraper, DaemonScraper):
+        # ユースケースはiter_active_races（ジェネレーター）で受け取るため、反復全体を計測する
+        profiler.instrument(scraper, "scraper", methods=["iter_active_races"], names={"iter_active_races": "scraper.daemon"})
+    else:
+        profiler.instrument(
+            scraper, "scraper",
+            methods=["_navigate_to_menu_page", "_get_page", "_fetch_race_html", "_parse_race_html",
+                     "_parse_jra_entry_page", "_parse_jradb_page"],
+            names={
+                "_navigate_to_menu_page": "scraper.navigate",
+                "_get_page": "scraper.navigate.get_page",
+                "_fetch_race_html": "scraper.fetch.race_html",
+                "_parse_race_html": "scraper.parse",
+                "_parse_jra_entry_page": "scraper.parse.jra_entry_page",
+                "_parse_jradb_page": "scraper.parse.jradb_page",
+            }
+        )
+        profiler.instrument(
+            scraper.fetcher, "scraper",
+            methods=["fetch", "fetch_all"],
+            names={"fetch": "scraper.fetch", "fetch_all": "scraper.fetch.all"}
+        )
+    
+    from src.async_notion_client import AsyncNotionClient
+    
+    # 並行処理時は内側の同期クライアントを計測する（スレッドプール上での実処理時間になる）
+    client = notion_client.client if isinstance(notion_client, AsyncNotionClient) else notion_client
+    profiler.instrument(client, "notion")
+    profiler.instrument(
+        client, "notion",
+        methods=["_query_database_all", "_query_horse_page", "_ensure_past_races_section", "_list_block_children_all"]
+    )
+    profiler.instrument(
+        client.transport, "notion_api",
+        methods=["query_database", "create_page", "update_page", "retrieve_page",
+                 "list_block_children", "append_block_children"]
+    )
+
+
 def main():
     """メイン処理"""
     parser = argparse.ArgumentParser(description="競馬レース回顧メモ自動化ツール")
@@ -44,27 +164,120 @@ def main():
     parser.add_argument(
         "--week",
         type=str,
-        help="対象週の開始日（YYYY-MM-DD形式）。retrospectiveモードで使用"
+        help="対象週の開始日（YYYY-MM-DD形式）。retrospectiveモードで使用（その日から7日間の過去のレース結果を処理）"
+    )
+    parser.add_argument(
+        "--from",
+        dest="date_from",
+        type=str,
+        help="過去のレース結果をまとめて処理する期間の開始日（YYYY-MM-DD形式）。retrospectiveモードで使用"
+    )
+    parser.add_argument(
+        "--to",
+        dest="date_to",
+        type=str,
+        help="--from の期間の終了日（YYYY-MM-DD形式、この日を含む。省略時は今日）"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Notion API呼び出しの同時実行数。2以上を指定すると並行処理する"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="前回中断したスクレイピングをチェックポイントから再開する"
+    )
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="JRAサイトにアクセスせず、前回の巡回で保存したHTMLから再パースする"
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="スクレイパーデーモンが起動していても使わず、このプロセスでスクレイピングする"
+    )
+    parser.add_argument(
+        "--ignore-ledger",
+        action="store_true",
+        help="retrospectiveモードで処理済み台帳を無視し、全ての出走履歴を書き込む"
+    )
+    parser.add_argument(
+        "--no-warehouse",
+        action="store_true",
+        help="取得したレース情報をローカルのParquet（WAREHOUSE_DIR）に保存しない"
+    )
+    parser.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="NotionページIDのローカルキャッシュを消去してから実行"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="スクレイピングの各段階・Notionの各処理の回数と所要時間（p50/p95）を最後に表示する"
+    )
+    parser.add_argument(
+        "--profile-output",
+        type=str,
+        metavar="PATH",
+        help="--profile時にcProfileの結果（pstats形式）をPATHに保存する"
     )
     
     args = parser.parse_args()
     
+    # スクレイパー（bs4・lxml）とNotionクライアント（requests）は読み込みに時間がかかるため、
+    # --help や引数エラーで終わる場合に読み込まないよう、引数の解析後に読み込む
+    from src.notion_client import NotionClient
+    from src.async_notion_client import AsyncNotionClient
+    from src.usecases.retrospective import RetrospectiveUseCase
+    from src.usecases.prediction import PredictionUseCase
     
     # クライアントとスクレイパーを初期化
-    notion_client = NotionClient()
-    scraper = Scraper()
+    if args.concurrency > 1:
+        notion_client = AsyncNotionClient(concurrency=args.concurrency)
+    else:
+        notion_client = NotionClient()
+    if args.clear_cache:
+        notion_client.page_cache.clear()
+        print("ページIDキャッシュを消去しました")
+    
+    warehouse = None
+    if not args.no_warehouse:
+        from src import warehouse as race_warehouse
+        if race_warehouse.is_available():
+            warehouse = race_warehouse.RaceWarehouse(Config.WAREHOUSE_DIR)
+        else:
+            print("pyarrow がインストールされていないため、レース情報をローカルに保存しません")
+    
+    profiler = Profiler(cprofile_path=args.profile_output) if args.profile else None
+    if profiler:
+        profiler.start()
     
     # モード別処理
     try:
         if args.mode == "retrospective":
-            week_start = parse_date(args.week) if args.week else date.today()
-            usecase = RetrospectiveUseCase(notion_client, scraper)
-            usecase.execute(week_start)
+            crawl_range = parse_range(args.week, args.date_from, args.date_to)
+            scraper = create_scraper(args.mode, None, args.resume, args.replay, not args.no_daemon, crawl_range)
+            if profiler:
+                attach_profiler(profiler, scraper, notion_client)
+            ledger = None if args.ignore_ledger else ResultLedger(Config.LEDGER_PATH)
+            usecase = RetrospectiveUseCase(notion_client, scraper, ledger=ledger, warehouse=warehouse)
+            usecase.execute(*(crawl_range or ()))
             
         elif args.mode == "prediction":
             race_date = parse_date(args.date) if args.date else date.today()
-            usecase = PredictionUseCase(notion_client, scraper)
+            scraper = create_scraper(args.mode, race_date, args.resume, args.replay, not args.no_daemon)
+            if profiler:
+                attach_profiler(profiler, scraper, notion_client)
+            usecase = PredictionUseCase(notion_client, scraper, warehouse=warehouse)
             usecase.execute(race_date)
+        
+        if warehouse and warehouse.written_rows:
+            print(f"レース情報を保存しました: {warehouse.written_rows}行 ({Config.WAREHOUSE_DIR})")
+        print(notion_client.transport.summary())
     
     except ValueError as e:
         print(f"エラー: {e}")
@@ -74,6 +287,12 @@ def main():
         import traceback
         traceback.print_exc()
         return 1
+    finally:
+        if isinstance(notion_client, AsyncNotionClient):
+            notion_client.close()
+        if profiler:
+            profiler.stop()
+            print(profiler.report())
     
     return 0
 
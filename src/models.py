@@ -1,8 +1,8 @@
 """データモデル定義"""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict, field
 from datetime import date
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Union
 
 
 @dataclass
@@ -28,6 +28,17 @@ class Horse:
     horse_number: Optional[str] = None  # 馬番
 
 
+@dataclass
+class RacePace:
+    """ラップタイムの解析結果（src/pace.py で作成）"""
+    text: str  # 表示用のラップ（'12.5-11.0-11.8-...'）
+    laps: List[float] = field(default_factory=list)  # 各ハロンのタイム（秒）
+    first_3f: Optional[float] = None  # 前半3F
+    last_3f: Optional[float] = None  # 後半3F
+    deltas: List[float] = field(default_factory=list)  # 前のハロンからの増減（秒）
+    pace: Optional[str] = None  # "H"（ハイ）/ "M"（ミドル）/ "S"（スロー）
+
+
 @dataclass
 class Race:
     """レース情報"""
@@ -47,6 +58,7 @@ class Race:
     kaisai_number: Optional[str] = None  # 第N回のN
     kaisai_day: Optional[str] = None     # 第N日のN
     venue_id: Optional[str] = None       # 競馬場ID (1-a)
+    pace: Optional[RacePace] = None      # ラップタイムの解析結果（lap_timeから求めるため保存しない）
     
     def __post_init__(self):
         if self.horses is None:
@@ -69,3 +81,55 @@ class RaceResult:
     waku: Optional[str] = None  # 枠番
     horse_number: Optional[str] = None  # 馬番
 
+
+
+def race_to_dict(race: Race) -> Dict[str, Any]:
+    """
+    レース情報をJSONに保存できる辞書に変換
+    
+    Args:
+        race: レース情報
+        
+    Returns:
+        辞書（日付はISO形式の文字列）
+    """
+    data = asdict(race)
+    data["date"] = race.date.isoformat()
+    del data["pace"]
+    return data
+
+
+def race_from_dict(data: Dict[str, Any]) -> Race:
+    """
+    race_to_dictで変換した辞書からレース情報を復元
+    
+    Args:
+        data: 辞書
+        
+    Returns:
+        レース情報
+    """
+    data = dict(data)
+    data.pop("pace", None)
+    data["date"] = date.fromisoformat(data["date"])
+    data["horses"] = [Horse(**horse) for horse in data.get("horses") or []]
+    return Race(**data)
+
+
+def race_slot(race_number: Optional[int], race_name: Optional[str]) -> Union[int, str]:
+    """
+    開催日・競馬場の中でレースを識別する値
+
+    レース番号がない（出馬表から番号を取れなかった）レースは、同じ開催の別のレースと
+    混ざらないようレース名で識別する
+
+    Args:
+        race_number: レース番号
+        race_name: レース名
+
+    Returns:
+        レース番号、またはレース番号がない場合は "name:レース名"
+    """
+    if race_number is not None:
+        return race_number
+    return f"name:{race_name or ''}"
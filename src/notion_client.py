@@ -2,29 +2,188 @@
 
 from typing import Optional, List, Dict, Any
 from datetime import date
-from notion_client import Client
-from notion_client.api_endpoints import Endpoint
-import requests
 import re
+import threading
 
 from src.config import Config
 from src.models import Race, Horse, RaceResult
+from src.horse_index import HorseIndex
+from src.page_cache import PageCache
+from src.notion_transport import NotionTransport, NotionAPIError
+from src.write_planner import WritePlanner, PageStructure, PAST_RACES_HEADING
+from src.pace import race_pace, format_pace
 
 
 class NotionClient:
     """Notion APIクライアント"""
     
-    def __init__(self):
-        """Notionクライアントを初期化"""
+    def __init__(self, pool_size: int = 10):
+        """
+        Notionクライアントを初期化
+        
+        Args:
+            pool_size: HTTPコネクションプールのサイズ（並行実行時は同時実行数以上にする）
+        """
         Config.validate()
-        self.client = Client(auth=Config.NOTION_API_KEY)
+        self.transport = NotionTransport(
+            Config.NOTION_API_KEY,
+            base_url=Config.NOTION_BASE_URL,
+            notion_version=Config.NOTION_VERSION,
+            rate=Config.NOTION_RATE_LIMIT,
+            max_retries=Config.NOTION_MAX_RETRIES,
+            pool_size=pool_size
+        )
         self.horse_db_id = Config.NOTION_HORSE_DB_ID
         self.race_db_id = Config.NOTION_RACE_DB_ID
+        self.horse_index = HorseIndex(title_property="馬名")
+        self._horse_index_failed = False
+        self._horse_index_lock = threading.Lock()
+        self._missing_horses = set()  # 一括検索で見つからなかった馬名（実行中は検索し直さない）
+        self.page_cache = PageCache(Config.PAGE_CACHE_PATH, ttl_days=Config.PAGE_CACHE_TTL_DAYS)
+        self.planner = WritePlanner()
     
-    def find_horse_page(self, horse_name: str) -> Optional[str]:
+    def _query_database_all(self, database_id: str, payload: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        データベースクエリをページネーションしながら全件取得
+        
+        Args:
+            database_id: データベースID
+            payload: クエリ条件（filter, sortsなど）
+            
+        Returns:
+            ページオブジェクトのリスト
+        """
+        body = dict(payload or {})
+        body["page_size"] = 100
+        
+        results = []
+        while True:
+            data = self.transport.query_database(database_id, body)
+            results.extend(data.get("results", []))
+            if not data.get("has_more") or not data.get("next_cursor"):
+                break
+            body["start_cursor"] = data["next_cursor"]
+        return results
+    
+    def _list_block_children_all(self, block_id: str) -> List[Dict[str, Any]]:
+        """
+        子ブロックをページネーションしながら全件取得
+        
+        Args:
+            block_id: ブロック（ページ）ID
+            
+        Returns:
+            ブロックオブジェクトのリスト
+        """
+        results = []
+        cursor = None
+        while True:
+            data = self.transport.list_block_children(block_id, start_cursor=cursor)
+            results.extend(data.get("results", []))
+            if not data.get("has_more") or not data.get("next_cursor"):
+                break
+            cursor = data["next_cursor"]
+        return results
+    
+    def load_horse_index(self) -> bool:
+        """
+        馬データベース全体を一括取得して馬名インデックスを構築
+        
+        Returns:
+            成功したかどうか
+        """
+        try:
+            pages = self._query_database_all(self.horse_db_id)
+            count = self.horse_index.load(pages)
+            print(f"馬インデックスを構築しました: {count}頭")
+            return True
+        except Exception as e:
+            # 失敗した場合は従来の1頭ずつの検索にフォールバック
+            print(f"馬インデックス構築エラー: {e}")
+            self._horse_index_failed = True
+            return False
+    
+    def _is_stale_page_error(self, error: Exception) -> bool:
+        """
+        ページがアーカイブ・削除されていることを示すエラーかどうか
+        
+        Args:
+            error: API呼び出しで発生した例外
+            
+        Returns:
+            キャッシュ済みのページIDが無効になっている可能性がある場合True
+        """
+        code = getattr(error, "code", None)
+        if code == "object_not_found":
+            return True
+        return "archived" in str(error).lower()
+    
+    def is_page_alive(self, page_id: str) -> bool:
+        """
+        ページが存在し、アーカイブされていないかをNotionに問い合わせる
+        
+        Args:
+            page_id: ページID
+            
+        Returns:
+            有効なページならTrue
+        """
+        try:
+            page = self.transport.retrieve_page(page_id)
+            return not (page.get("archived") or page.get("in_trash"))
+        except Exception as e:
+            if self._is_stale_page_error(e):
+                return False
+            # 判定できない場合は有効とみなす（キャッシュを誤って捨てないため）
+            return True
+    
+    def invalidate_page(self, page_id: str) -> None:
+        """
+        無効になったページIDをキャッシュとインデックスから取り除く
+        
+        Args:
+            page_id: ページID
+        """
+        self.page_cache.invalidate_page(page_id)
+        self.horse_index.remove_page(page_id)
+        self.planner.forget_page(page_id)
+    
+    def find_horse_page(self, horse_name: str, horse_id: Optional[str] = None) -> Optional[str]:
         """
         馬名で馬ページを検索
         
+        ローカルキャッシュを最初に参照し、なければ初回呼び出し時に馬データベース全体を
+        読み込んだインデックスから応答する
+        
+        Args:
+            horse_name: 馬名
+            horse_id: 出馬票由来の馬ID（あれば）
+            
+        Returns:
+            ページID（見つからない場合はNone）
+        """
+        page_id = self.page_cache.get_horse(horse_name, horse_id)
+        if page_id:
+            return page_id
+        
+        if not self.horse_index.loaded and not self._horse_index_failed:
+            # 並行実行時に複数スレッドが同時に全件取得しないようにする
+            with self._horse_index_lock:
+                if not self.horse_index.loaded and not self._horse_index_failed:
+                    self.load_horse_index()
+        if self.horse_index.loaded:
+            page_id = self.horse_index.get(horse_name)
+        else:
+            page_id = self._query_horse_page(horse_name)
+        
+        if page_id:
+            self.page_cache.set_horse(horse_name, page_id, horse_id)
+        return page_id
+    
+    def _query_horse_page(self, horse_name: str) -> Optional[str]:
+        """
+        馬名で馬ページをNotion APIに直接問い合わせる（インデックスが使えない場合用）
+        
         Args:
             horse_name: 馬名
             
@@ -32,14 +191,6 @@ class NotionClient:
             ページID（見つからない場合はNone）
         """
         try:
-            # Notion APIの正しい使い方: POST /v1/databases/{database_id}/query
-            # notion-clientのdatabases.query()が使えないため、直接HTTPリクエストを送信
-            url = f"https://api.notion.com/v1/databases/{self.horse_db_id}/query"
-            headers = {
-                "Authorization": f"Bearer {Config.NOTION_API_KEY}",
-                "Content-Type": "application/json",
-                "Notion-Version": "2022-06-28"
-            }
             payload = {
                 "filter": {
                     "property": "馬名",  # プロパティ名は実際のNotion DBに合わせて調整
@@ -49,9 +200,7 @@ class NotionClient:
                 }
             }
             
-            response = requests.post(url, headers=headers, json=payload)
-            response.raise_for_status()
-            data = response.json()
+            data = self.transport.query_database(self.horse_db_id, payload)
             
             if data.get("results") and len(data["results"]) > 0:
                 return data["results"][0]["id"]
@@ -62,18 +211,70 @@ class NotionClient:
             traceback.print_exc()
             return None
     
-    def create_horse_page(self, horse_name: str) -> Optional[str]:
+    def resolve_horse_pages(self, horses: List[Horse]) -> None:
+        """
+        複数の馬の馬ページをまとめて検索し、horse.notion_page_id に設定する
+        
+        同名の馬は1回だけ検索し、ローカルキャッシュ（または読み込み済みのインデックス）にない馬名は
+        orフィルターに最大 NOTION_FILTER_BATCH 件ずつまとめて問い合わせる。
+        馬データベース全体は読み込まないため、出走馬の数に比例した少ない呼び出しで済む
+        
+        Args:
+            horses: 出走馬のリスト（複数レース分をまとめて渡してよい）
+        """
+        names: Dict[str, Optional[str]] = {}
+        for horse in horses:
+            names.setdefault(horse.name, horse.horse_id)
+        
+        pages: Dict[str, str] = {}
+        remaining = []
+        for name, horse_id in names.items():
+            page_id = self.page_cache.get_horse(name, horse_id)
+            if not page_id and self.horse_index.loaded:
+                page_id = self.horse_index.get(name)
+            if page_id:
+                pages[name] = page_id
+            elif not self.horse_index.loaded and name not in self._missing_horses:
+                remaining.append(name)
+        
+        for start in range(0, len(remaining), Config.NOTION_FILTER_BATCH):
+            chunk = remaining[start:start + Config.NOTION_FILTER_BATCH]
+            try:
+                results = self._query_database_all(self.horse_db_id, {
+                    "filter": {"or": [{"property": "馬名", "title": {"equals": name}} for name in chunk]}
+                })
+            except Exception as e:
+                # まとめて検索できない場合は1頭ずつの検索にフォールバック
+                print(f"馬ページ一括検索エラー: {e}")
+                for name in chunk:
+                    page_id = self._query_horse_page(name)
+                    if page_id:
+                        pages[name] = page_id
+                continue
+            for page in results:
+                # 同名ページが複数ある場合は1頭ずつの検索結果（先頭）に合わせて最初のものを優先
+                pages.setdefault(self.horse_index.extract_title(page), page["id"])
+            self._missing_horses.update(name for name in chunk if name not in pages)
+        
+        for name in remaining:
+            if name in pages:
+                self.page_cache.set_horse(name, pages[name], names[name])
+        for horse in horses:
+            horse.notion_page_id = pages.get(horse.name)
+    
+    def create_horse_page(self, horse_name: str, horse_id: Optional[str] = None) -> Optional[str]:
         """
         馬ページを作成
         
         Args:
             horse_name: 馬名
+            horse_id: 出馬票由来の馬ID（あれば）
             
         Returns:
             作成されたページID
         """
         try:
-            response = self.client.pages.create(
+            response = self.transport.create_page(
                 parent={"database_id": self.horse_db_id},
                 properties={
                     "馬名": {
@@ -108,29 +309,44 @@ class NotionClient:
                             "rich_text": [],
                             "language": "plain text"
                         }
+                    },
+                    # 最初の出走履歴追加時に見出しを確認・追加しなくて済むよう作成時に含める
+                    {
+                        "object": "block",
+                        "type": "heading_2",
+                        "heading_2": {
+                            "rich_text": [{"type": "text", "text": {"content": PAST_RACES_HEADING}}]
+                        }
                     }
                 ]
             )
+            self.planner.fold_children()
+            self.planner.mark_past_races_section(response["id"])
+            # 以降の検索がインデックスで解決できるように登録
+            self.horse_index.add(horse_name, response["id"])
+            self._missing_horses.discard(horse_name)
+            self.page_cache.set_horse(horse_name, response["id"], horse_id)
             return response["id"]
         except Exception as e:
             print(f"馬ページ作成エラー: {e}")
             return None
     
-    def find_or_create_horse_page(self, horse_name: str) -> Optional[str]:
+    def find_or_create_horse_page(self, horse_name: str, horse_id: Optional[str] = None) -> Optional[str]:
         """
         馬ページを検索、なければ作成
         
         Args:
             horse_name: 馬名
+            horse_id: 出馬票由来の馬ID（あれば）
             
         Returns:
             ページID
         """
-        page_id = self.find_horse_page(horse_name)
+        page_id = self.find_horse_page(horse_name, horse_id)
         if page_id:
             return page_id
         
-        return self.create_horse_page(horse_name)
+        return self.create_horse_page(horse_name, horse_id)
     
     def find_race_page(self, race_name: str, race_date: date, venue: str, race_number: Optional[int]) -> Optional[str]:
         """
@@ -145,14 +361,13 @@ class NotionClient:
         Returns:
             ページID（見つからない場合はNone）
         """
+        cached = self.page_cache.get_race_entry(race_date, venue, race_number, race_name)
+        if cached:
+            page_id, title = cached
+            self.planner.record_title(page_id, title)
+            return page_id
+        
         try:
-            url = f"https://api.notion.com/v1/databases/{self.race_db_id}/query"
-            headers = {
-                "Authorization": f"Bearer {Config.NOTION_API_KEY}",
-                "Content-Type": "application/json",
-                "Notion-Version": "2022-06-28"
-            }
-            
             and_filter = [
                 {
                     "property": "開催日",
@@ -175,6 +390,14 @@ class NotionClient:
                         "equals": race_number
                     }
                 })
+            elif race_name:
+                # レース番号がない場合は、同じ開催の別のレースと取り違えないようレース名で絞る
+                and_filter.append({
+                    "property": "レース名",
+                    "title": {
+                        "equals": race_name
+                    }
+                })
             
             # デバッグログを追加
             # print(f"  Notion検索フィルター: {and_filter}")
@@ -185,19 +408,24 @@ class NotionClient:
                 }
             }
             
-            response = requests.post(url, headers=headers, json=payload)
-            if response.status_code != 200:
-                print(f"  Notion APIエラー ({response.status_code}): {response.text}")
+            try:
+                data = self.transport.query_database(self.race_db_id, payload)
+            except NotionAPIError as e:
+                print(f"  Notion APIエラー ({e.status}): {e.message}")
                 # 失敗した場合はレース名のみで再試行（フォールバック）
                 if race_number:
                     print("  Rでの検索に失敗しました。レース名のみで再試行します。")
                     return self.find_race_page(race_name, race_date, venue, None)
                 return None
-
-            data = response.json()
             
             if data.get("results") and len(data["results"]) > 0:
-                return data["results"][0]["id"]
+                page = data["results"][0]
+                page_id = page["id"]
+                title_prop = page.get("properties", {}).get("レース名", {})
+                title = "".join(t.get("plain_text", "") for t in title_prop.get("title", [])) if title_prop else None
+                self.planner.record_title(page_id, title)
+                self.page_cache.set_race(race_date, venue, race_number, page_id, title, race_name=race_name)
+                return page_id
             return None
         except Exception as e:
             print(f"レースページ検索エラー: {e}")
@@ -279,15 +507,17 @@ class NotionClient:
                     "number": race.race_number
                 }
             
-            response = self.client.pages.create(
+            # 初期コンテンツは作成リクエストに含めて1回で作成する
+            response = self.transport.create_page(
                 parent={"database_id": self.race_db_id},
-                properties=properties
+                properties=properties,
+                children=self._build_race_initial_blocks(race)
             )
+            self.planner.fold_children()
             
             page_id = response["id"]
-            
-            # 初期コンテンツを追加
-            self._add_race_initial_blocks(page_id, race)
+            self.planner.record_title(page_id, race.name)
+            self.page_cache.set_race(race.date, race.venue, race.race_number, page_id, race.name)
             
             return page_id
         except Exception as e:
@@ -306,19 +536,25 @@ class NotionClient:
         """
         page_id = self.find_race_page(race.name, race.date, race.venue, race.race_number)
         if page_id:
-            # レース名が「詳細不明」の場合は更新を試みる
-            if race.name and race.name != "レース詳細不明":
+            # レース名が「詳細不明」の場合は更新を試みる（同じタイトルなら更新しない）
+            if race.name and race.name != "レース詳細不明" and self.planner.should_update_title(page_id, race.name):
                 try:
-                    self.client.pages.update(
-                        page_id=page_id,
+                    self.transport.update_page(
+                        page_id,
                         properties={
                             "レース名": {
                                 "title": [{"text": {"content": race.name}}]
                             }
                         }
                     )
-                except Exception:
-                    pass
+                    self.planner.record_title(page_id, race.name)
+                    self.page_cache.set_race(race.date, race.venue, race.race_number, page_id, race.name)
+                except Exception as e:
+                    # キャッシュしていたページがアーカイブされていた場合は検索し直す
+                    if self._is_stale_page_error(e) and not self.is_page_alive(page_id):
+                        print(f"  キャッシュ済みのレースページが無効になっていました: {page_id}")
+                        self.invalidate_page(page_id)
+                        return self.find_or_create_race_page(race)
             return page_id
         
         return self.create_race_page(race)
@@ -360,7 +596,7 @@ class NotionClient:
                 }
             }
             
-            self.client.blocks.children.append(
+            self.transport.append_block_children(
                 block_id=race_page_id,
                 children=[block]
             )
@@ -422,7 +658,7 @@ class NotionClient:
                 })
 
             if children:
-                self.client.blocks.children.append(
+                self.transport.append_block_children(
                     block_id=race_page_id,
                     children=children
                 )
@@ -431,33 +667,78 @@ class NotionClient:
             print(f"出走馬リスト追加エラー: {e}")
             return False
 
-    def _ensure_past_races_section(self, page_id: str) -> None:
+    def _ensure_past_races_section(self, page_id: str) -> Optional[PageStructure]:
         """
         馬ページ内に「過去レース」セクション（見出し2）があることを確認し、なければ作成する
+        
+        ページのブロック構造は最初の1回だけ全件読み込み、以降は記録した構造を使う
+        
+        Args:
+            page_id: 馬ページID
+            
+        Returns:
+            ページのブロック構造（確認に失敗した場合はNone）
         """
+        structure = self.planner.structure(page_id)
+        if structure:
+            return structure
+        
         try:
-            blocks = self.client.blocks.children.list(block_id=page_id)
-            for block in blocks.get("results", []):
-                if block["type"] == "heading_2":
-                    text = "".join([t["plain_text"] for t in block["heading_2"]["rich_text"]])
-                    if "過去レース" in text:
-                        return
-            
-            # 見つからない場合はページ末尾に作成
-            self.client.blocks.children.append(
-                block_id=page_id,
-                children=[
-                    {
-                        "object": "block",
-                        "type": "heading_2",
-                        "heading_2": {
-                            "rich_text": [{"type": "text", "text": {"content": "過去レース"}}]
+            structure = PageStructure.from_blocks(self._list_block_children_all(page_id))
+            if not structure:
+                # 見つからない場合はページ末尾に作成
+                response = self.transport.append_block_children(
+                    block_id=page_id,
+                    children=[
+                        {
+                            "object": "block",
+                            "type": "heading_2",
+                            "heading_2": {
+                                "rich_text": [{"type": "text", "text": {"content": PAST_RACES_HEADING}}]
+                            }
                         }
-                    }
-                ]
-            )
+                    ]
+                )
+                heading_id = (response.get("results") or [{}])[0].get("id")
+                structure = PageStructure(
+                    sections={PAST_RACES_HEADING: heading_id} if heading_id else {},
+                    past_races_id=heading_id,
+                    last_block_id=heading_id
+                )
+            self.planner.record_structure(page_id, structure)
+            return structure
         except Exception as e:
             print(f"過去レースセクション確認エラー: {e}")
+            return None
+    
+    def _append_race_history(self, page_id: str, blocks: List[Dict[str, Any]], structure: Optional[PageStructure]) -> None:
+        """
+        出走履歴のブロックを「過去レース」セクションの末尾に追記
+        
+        Args:
+            page_id: 馬ページID
+            blocks: 追記するブロック
+            structure: ページのブロック構造（不明な場合はページ末尾に追記）
+        """
+        after = structure.insert_after if structure else None
+        try:
+            response = self.transport.append_block_children(block_id=page_id, children=blocks, after=after)
+        except NotionAPIError as e:
+            if not after or e.code not in ("validation_error", "object_not_found"):
+                raise
+            # 記録していた追記位置のブロックが削除されていても、ページ自体が有効なら構造を読み直して再試行する
+            # （ページがアーカイブ・削除されていた場合は呼び出し元で馬ページを引き直す）
+            if not self.is_page_alive(page_id):
+                raise
+            print(f"  馬ページの構造が変わっていたため読み直します: {page_id}")
+            self.planner.forget_structure(page_id)
+            structure = self._ensure_past_races_section(page_id)
+            after = structure.insert_after if structure else None
+            response = self.transport.append_block_children(block_id=page_id, children=blocks, after=after)
+        
+        results = response.get("results") or []
+        if structure and results:
+            self.planner.record_append(page_id, results[-1]["id"])
 
     def _generate_video_urls(self, race: Race) -> dict:
         """
@@ -504,13 +785,14 @@ class NotionClient:
         if "白" in waku_text: return "gray"
         return "default"
 
-    def add_race_history_to_horse_page(self, horse_page_id: str, race_result: RaceResult) -> bool:
+    def add_race_history_to_horse_page(self, horse_page_id: str, race_result: RaceResult, retry_stale: bool = True) -> bool:
         """
         馬ページに出走履歴を追加
         
         Args:
             horse_page_id: 馬ページID
             race_result: レース結果情報
+            retry_stale: ページがアーカイブ済みだった場合に馬ページを引き直して再試行するか
             
         Returns:
             成功したかどうか
@@ -519,322 +801,344 @@ class NotionClient:
             race = race_result.race
             horse = race_result.horse
             
-            # 過去レース見出しがあることを確認
-            self._ensure_past_races_section(horse_page_id)
+            # 過去レース見出しがあることを確認（ページの構造は実行中1回だけ読み込む）
+            structure = self._ensure_past_races_section(horse_page_id)
             
             # レースページのIDがない場合は検索
             if not race.notion_page_id:
                 race.notion_page_id = self.find_race_page(race.name, race.date, race.venue, race.race_number)
 
-            # レース情報のタイトル (H3)
-            # レース番号（R）があれば含める
-            r_str = f"{race.race_number}R " if race.race_number else ""
-            race_info = f"{race.date.strftime('%Y-%m-%d')} {race.venue} {r_str}{race.name}"
-            race_info = race_info.replace("JRA", "").strip()
-            if race_result.position:
-                race_info += f" ({race_result.position}着)"
-            
-            # レース詳細情報
-            # 行1: タイム、上がり、馬体重
-            line1 = f"タイム: {race_result.finish_time if race_result.finish_time else '取得失敗'} | 上がり: {race_result.last_3f if race_result.last_3f else '取得失敗'} | 馬体重: {race_result.horse_weight if race_result.horse_weight else '取得失敗'}"
-            # 行2: 競馬場、コース、距離、馬場状況
-            # track_typeに詳細（ダート・右等）が入っている前提
-            track_info = f"{race.distance}m ({race.track_type if race.track_type else '芝'})"
-            line2 = f"競馬場: {race.venue} | {track_info} | 馬場: {race.track_condition if race.track_condition else '良'}"
-            # 行3: 騎手、斤量
-            line3 = f"騎手: {race_result.jockey} | 斤量: {race_result.weight}kg"
-
-            # ラップタイム整形
-            lap_text = "取得失敗"
-            if race.lap_time:
-                try:
-                    laps = [l.strip() for l in race.lap_time.split('-') if l.strip()]
-                    formatted_laps = "-".join(laps)
-                    lap_floats = []
-                    for l in laps:
-                        try:
-                            lap_floats.append(float(l))
-                        except:
-                            continue
-                    if lap_floats:
-                        first_3 = sum(lap_floats[:3])
-                        last_3 = sum(lap_floats[-3:])
-                        lap_text = f"{formatted_laps} ({first_3:.1f}-{last_3:.1f})"
-                    else:
-                        lap_text = formatted_laps
-                except Exception as e:
-                    print(f"ラップタイム整形エラー: {e}")
-                    lap_text = race.lap_time
-
-            # ポジション整形
-            pos_text = "取得失敗"
-            if race_result.passing_order:
-                raw_pos = race_result.passing_order.strip()
-                if '-' in raw_pos:
-                    pos_text = raw_pos
-                elif ' ' in raw_pos:
-                    pos_text = "-".join(raw_pos.split())
-                else:
-                    pos_text = raw_pos
-
-            # 行3: 騎手、斤量
-            line3 = f"騎手: {race_result.jockey} | 斤量: {race_result.weight}kg"
-            # 行4: ラップ、上がり、ポジション
-            line4 = f"ラップ: {lap_text} | 上がり: {race_result.last_3f if race_result.last_3f else '取得失敗'} | ポジション: {pos_text}"
+            blocks = self._build_race_history_blocks(race_result)
 
-            # 映像URLの生成
-            video_urls = self._generate_video_urls(race)
-            video_links = []
-            for label, url in video_urls.items():
-                if video_links:
-                    video_links.append({"type": "text", "text": {"content": " "}})
-                video_links.append({
+            # 過去レースセクションの末尾に追記
+            self._append_race_history(horse_page_id, blocks, structure)
+            return True
+        except Exception as e:
+            # キャッシュしていた馬ページがアーカイブされていた場合は引き直して再試行
+            if retry_stale and self._is_stale_page_error(e) and not self.is_page_alive(horse_page_id):
+                print(f"  キャッシュ済みの馬ページが無効になっていました: {horse_page_id}")
+                self.invalidate_page(horse_page_id)
+                horse = race_result.horse
+                new_page_id = self.find_or_create_horse_page(horse.name, horse.horse_id)
+                if new_page_id and new_page_id != horse_page_id:
+                    horse.notion_page_id = new_page_id
+                    return self.add_race_history_to_horse_page(new_page_id, race_result, retry_stale=False)
+            print(f"出走履歴追加エラー: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
+    
+    def _build_race_history_blocks(self, race_result: RaceResult) -> List[Dict[str, Any]]:
+        """
+        馬ページに追記する出走履歴のブロックを作成
+        
+        Args:
+            race_result: レース結果情報（race.notion_page_idは解決済みであること）
+            
+        Returns:
+            追記するブロックのリスト
+        """
+        race = race_result.race
+        
+        # レース情報のタイトル (H3)
+        # レース番号（R）があれば含める
+        r_str = f"{race.race_number}R " if race.race_number else ""
+        race_info = f"{race.date.strftime('%Y-%m-%d')} {race.venue} {r_str}{race.name}"
+        race_info = race_info.replace("JRA", "").strip()
+        if race_result.position:
+            race_info += f" ({race_result.position}着)"
+        
+        # レース詳細情報
+        # 行1: タイム、上がり、馬体重
+        line1 = f"タイム: {race_result.finish_time if race_result.finish_time else '取得失敗'} | 上がり: {race_result.last_3f if race_result.last_3f else '取得失敗'} | 馬体重: {race_result.horse_weight if race_result.horse_weight else '取得失敗'}"
+        # 行2: 競馬場、コース、距離、馬場状況
+        # track_typeに詳細（ダート・右等）が入っている前提
+        track_info = f"{race.distance}m ({race.track_type if race.track_type else '芝'})"
+        line2 = f"競馬場: {race.venue} | {track_info} | 馬場: {race.track_condition if race.track_condition else '良'}"
+        # 行3: 騎手、斤量
+        line3 = f"騎手: {race_result.jockey} | 斤量: {race_result.weight}kg"
+        
+        # ラップタイム整形（解析結果はレースごとに1回だけ求めて使い回す）
+        pace = race_pace(race)
+        lap_text = format_pace(pace) if pace else "取得失敗"
+        
+        # ポジション整形
+        pos_text = "取得失敗"
+        if race_result.passing_order:
+            raw_pos = race_result.passing_order.strip()
+            if '-' in raw_pos:
+                pos_text = raw_pos
+            elif ' ' in raw_pos:
+                pos_text = "-".join(raw_pos.split())
+            else:
+                pos_text = raw_pos
+        
+        # 行3: 騎手、斤量
+        line3 = f"騎手: {race_result.jockey} | 斤量: {race_result.weight}kg"
+        # 行4: ラップ、上がり、ポジション
+        line4 = f"ラップ: {lap_text} | 上がり: {race_result.last_3f if race_result.last_3f else '取得失敗'} | ポジション: {pos_text}"
+        
+        # 映像URLの生成
+        video_urls = self._generate_video_urls(race)
+        video_links = []
+        for label, url in video_urls.items():
+            if video_links:
+                video_links.append({"type": "text", "text": {"content": " "}})
+            video_links.append({
+                "type": "text",
+                "text": {
+                    "content": f"[{label}]",
+                    "link": {"url": url}
+                }
+            })
+        
+        # 枠番・馬番の整形
+        waku_rich_text = []
+        if race_result.waku or race_result.horse_number:
+            # 枠番 (色付き)
+            waku_match = re.search(r'(\d+)', race_result.waku) if race_result.waku else None
+            waku_num = waku_match.group(1) if waku_match else ""
+            if waku_num:
+                color = self._get_waku_color(race_result.waku)
+                # 黒枠の場合は太字に
+                is_black = "黒" in (race_result.waku or "")
+                waku_rich_text.append({
                     "type": "text",
-                    "text": {
-                        "content": f"[{label}]",
-                        "link": {"url": url}
+                    "text": {"content": f"{waku_num}枠"},
+                    "annotations": {
+                        "color": color,
+                        "bold": True if is_black else False
                     }
                 })
-
-            # 枠番・馬番の整形
-            waku_rich_text = []
-            if race_result.waku or race_result.horse_number:
-                # 枠番 (色付き)
-                waku_match = re.search(r'(\d+)', race_result.waku) if race_result.waku else None
-                waku_num = waku_match.group(1) if waku_match else ""
-                if waku_num:
-                    color = self._get_waku_color(race_result.waku)
-                    # 黒枠の場合は太字に
-                    is_black = "黒" in (race_result.waku or "")
-                    waku_rich_text.append({
-                        "type": "text",
-                        "text": {"content": f"{waku_num}枠"},
-                        "annotations": {
-                            "color": color,
-                            "bold": True if is_black else False
-                        }
-                    })
-                
-                # 馬番
-                if race_result.horse_number:
-                    if waku_rich_text:
-                        waku_rich_text.append({"type": "text", "text": {"content": " "}})
-                    waku_rich_text.append({
-                        "type": "text",
-                        "text": {"content": f"{race_result.horse_number}番"}
-                    })
-                
+            
+            # 馬番
+            if race_result.horse_number:
                 if waku_rich_text:
                     waku_rich_text.append({"type": "text", "text": {"content": " "}})
-
-            # 追加するブロックのリスト
-            blocks = [
-                {
-                    "object": "block",
-                    "type": "heading_3",
-                    "heading_3": {
-                        "rich_text": [{"type": "text", "text": {"content": race_info}}]
-                    }
-                },
-                {
-                    "object": "block",
-                    "type": "paragraph",
-                    "paragraph": {
-                        "rich_text": [
-                            {
-                                "type": "mention",
-                                "mention": {
-                                    "page": {
-                                        "id": race.notion_page_id
-                                    }
+                waku_rich_text.append({
+                    "type": "text",
+                    "text": {"content": f"{race_result.horse_number}番"}
+                })
+            
+            if waku_rich_text:
+                waku_rich_text.append({"type": "text", "text": {"content": " "}})
+        
+        # 追加するブロックのリスト
+        blocks = [
+            {
+                "object": "block",
+                "type": "heading_3",
+                "heading_3": {
+                    "rich_text": [{"type": "text", "text": {"content": race_info}}]
+                }
+            },
+            {
+                "object": "block",
+                "type": "paragraph",
+                "paragraph": {
+                    "rich_text": [
+                        {
+                            "type": "mention",
+                            "mention": {
+                                "page": {
+                                    "id": race.notion_page_id
                                 }
                             }
-                        ] + ([{"type": "text", "text": {"content": " "}}] + video_links if video_links else [])
-                    }
+                        }
+                    ] + ([{"type": "text", "text": {"content": " "}}] + video_links if video_links else [])
                 }
-            ]
-
-            # 詳細情報 (弾丸リスト)
-            # 1. 枠番・馬番
-            if waku_rich_text:
-                blocks.append({
-                    "object": "block",
-                    "type": "bulleted_list_item",
-                    "bulleted_list_item": {
-                        "rich_text": waku_rich_text
-                    }
-                })
-
-            # 2. その他統計データ
-            blocks.extend([
-                {
-                    "object": "block",
-                    "type": "bulleted_list_item",
-                    "bulleted_list_item": {
-                        "rich_text": [{"type": "text", "text": {"content": line1}}]
-                    }
-                },
-                {
-                    "object": "block",
-                    "type": "bulleted_list_item",
-                    "bulleted_list_item": {
-                        "rich_text": [{"type": "text", "text": {"content": line2}}]
-                    }
-                },
-                {
-                    "object": "block",
-                    "type": "bulleted_list_item",
-                    "bulleted_list_item": {
-                        "rich_text": [{"type": "text", "text": {"content": line3}}]
-                    }
-                },
-                {
-                    "object": "block",
-                    "type": "bulleted_list_item",
-                    "bulleted_list_item": {
-                        "rich_text": [{"type": "text", "text": {"content": line4}}]
-                    }
-                },
-                {
-                    "object": "block",
-                    "type": "paragraph",
-                    "paragraph": {
-                        "rich_text": [
-                            {
-                                "type": "text",
-                                "text": {
-                                    "content": "レースメモ",
-                                    "link": None
-                                },
-                                "annotations": {"bold": True}
-                            }
-                        ]
-                    }
-                },
-                {
-                    "object": "block",
-                    "type": "code",
-                    "code": {
-                        "rich_text": [],
-                        "language": "plain text"
-                    }
-                },
-                {
-                    "object": "block",
-                    "type": "divider",
-                    "divider": {}
+            }
+        ]
+        
+        # 詳細情報 (弾丸リスト)
+        # 1. 枠番・馬番
+        if waku_rich_text:
+            blocks.append({
+                "object": "block",
+                "type": "bulleted_list_item",
+                "bulleted_list_item": {
+                    "rich_text": waku_rich_text
                 }
-            ])
-
-            # ページ末尾に追記
-            self.client.blocks.children.append(
-                block_id=horse_page_id,
-                children=blocks
-            )
-            return True
-        except Exception as e:
-            print(f"出走履歴追加エラー: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
+            })
+        
+        # 2. その他統計データ
+        blocks.extend([
+            {
+                "object": "block",
+                "type": "bulleted_list_item",
+                "bulleted_list_item": {
+                    "rich_text": [{"type": "text", "text": {"content": line1}}]
+                }
+            },
+            {
+                "object": "block",
+                "type": "bulleted_list_item",
+                "bulleted_list_item": {
+                    "rich_text": [{"type": "text", "text": {"content": line2}}]
+                }
+            },
+            {
+                "object": "block",
+                "type": "bulleted_list_item",
+                "bulleted_list_item": {
+                    "rich_text": [{"type": "text", "text": {"content": line3}}]
+                }
+            },
+            {
+                "object": "block",
+                "type": "bulleted_list_item",
+                "bulleted_list_item": {
+                    "rich_text": [{"type": "text", "text": {"content": line4}}]
+                }
+            },
+            {
+                "object": "block",
+                "type": "paragraph",
+                "paragraph": {
+                    "rich_text": [
+                        {
+                            "type": "text",
+                            "text": {
+                                "content": "レースメモ",
+                                "link": None
+                            },
+                            "annotations": {"bold": True}
+                        }
+                    ]
+                }
+            },
+            {
+                "object": "block",
+                "type": "code",
+                "code": {
+                    "rich_text": [],
+                    "language": "plain text"
+                }
+            },
+            {
+                "object": "block",
+                "type": "divider",
+                "divider": {}
+            }
+        ])
+        
+        return blocks
     
-    def _add_race_initial_blocks(self, race_page_id: str, race: Race) -> None:
+    def _build_race_pace_blocks(self, race: Race) -> List[Dict[str, Any]]:
         """
-        レースページに初期ブロックを追加 (出走馬リストを表形式で冒頭に配置)
+        レースページに載せるラップのブロックを作成（ラップタイムがない場合は空）
         
         Args:
-            race_page_id: レースページID
             race: レース情報
+            
+        Returns:
+            ブロックのリスト
         """
-        try:
-            # テーブルの行を作成
-            table_rows = []
+        pace = race_pace(race)
+        if not pace:
+            return []
+        deltas = " ".join(f"{d:+.1f}" for d in pace.deltas)
+        text = f"ラップ: {format_pace(pace)}"
+        if deltas:
+            text += f"\n増減: {deltas}"
+        return [{
+            "object": "block",
+            "type": "paragraph",
+            "paragraph": {"rich_text": [{"type": "text", "text": {"content": text}}]}
+        }]
+    
+    def _build_race_initial_blocks(self, race: Race) -> List[Dict[str, Any]]:
+        """
+        レースページの初期ブロックを作成 (出走馬リストを表形式で冒頭に配置)
+        
+        Args:
+            race: レース情報
+            
+        Returns:
+            ページ作成リクエストに含めるブロックのリスト
+        """
+        # テーブルの行を作成
+        table_rows = []
+        
+        # ヘッダー行 (6列)
+        header_row = {
+            "object": "block",
+            "type": "table_row",
+            "table_row": {
+                "cells": [
+                    [{"type": "text", "text": {"content": "印"}}],
+                    [{"type": "text", "text": {"content": "馬名"}}],
+                    [{"type": "text", "text": {"content": "性齢"}}],
+                    [{"type": "text", "text": {"content": "騎手"}}],
+                    [{"type": "text", "text": {"content": "斤量"}}],
+                    [{"type": "text", "text": {"content": "メモ"}}]
+                ]
+            }
+        }
+        table_rows.append(header_row)
+        
+        # 各馬の行
+        for horse in race.horses:
+            # 馬名セル (メンションまたはテキスト)
+            name_cell = []
+            if horse.notion_page_id:
+                name_cell.append({
+                    "type": "mention",
+                    "mention": {"page": {"id": horse.notion_page_id}}
+                })
+            else:
+                name_cell.append({
+                    "type": "text",
+                    "text": {"content": horse.name}
+                })
             
-            # ヘッダー行 (6列)
-            header_row = {
+            row = {
                 "object": "block",
                 "type": "table_row",
                 "table_row": {
                     "cells": [
-                        [{"type": "text", "text": {"content": "印"}}],
-                        [{"type": "text", "text": {"content": "馬名"}}],
-                        [{"type": "text", "text": {"content": "性齢"}}],
-                        [{"type": "text", "text": {"content": "騎手"}}],
-                        [{"type": "text", "text": {"content": "斤量"}}],
-                        [{"type": "text", "text": {"content": "メモ"}}]
+                        [], # 印 (空)
+                        name_cell,
+                        [{"type": "text", "text": {"content": f"{horse.gender or ''}{horse.age or ''}"}}],
+                        [{"type": "text", "text": {"content": horse.jockey or ''}}],
+                        [{"type": "text", "text": {"content": horse.weight or ''}}],
+                        []  # メモ (空)
                     ]
                 }
             }
-            table_rows.append(header_row)
-            
-            # 各馬の行
-            for horse in race.horses:
-                # 馬名セル (メンションまたはテキスト)
-                name_cell = []
-                if horse.notion_page_id:
-                    name_cell.append({
-                        "type": "mention",
-                        "mention": {"page": {"id": horse.notion_page_id}}
-                    })
-                else:
-                    name_cell.append({
-                        "type": "text",
-                        "text": {"content": horse.name}
-                    })
-                
-                row = {
-                    "object": "block",
-                    "type": "table_row",
-                    "table_row": {
-                        "cells": [
-                            [], # 印 (空)
-                            name_cell,
-                            [{"type": "text", "text": {"content": f"{horse.gender or ''}{horse.age or ''}"}}],
-                            [{"type": "text", "text": {"content": horse.jockey or ''}}],
-                            [{"type": "text", "text": {"content": horse.weight or ''}}],
-                            []  # メモ (空)
-                        ]
-                    }
-                }
-                table_rows.append(row)
+            table_rows.append(row)
 
-            blocks = [
-                {
-                    "object": "block",
-                    "type": "heading_2",
-                    "heading_2": {
-                        "rich_text": [{"type": "text", "text": {"content": "出走馬"}}]
-                    }
-                },
-                {
-                    "object": "block",
-                    "type": "table",
-                    "table": {
-                        "table_width": 6,
-                        "has_column_header": True,
-                        "has_row_header": False,
-                        "children": table_rows
-                    }
-                },
-                {
-                    "object": "block",
-                    "type": "heading_2",
-                    "heading_2": {
-                        "rich_text": [{"type": "text", "text": {"content": "予想"}}]
-                    }
-                },
-                {
-                    "object": "block",
-                    "type": "paragraph",
-                    "paragraph": {"rich_text": []}
+        blocks = [
+            {
+                "object": "block",
+                "type": "heading_2",
+                "heading_2": {
+                    "rich_text": [{"type": "text", "text": {"content": "出走馬"}}]
                 }
-            ]
-            
-            self.client.blocks.children.append(
-                block_id=race_page_id,
-                children=blocks
-            )
-        except Exception as e:
-            print(f"初期ブロック追加エラー: {e}")
-            import traceback
-            traceback.print_exc()
+            },
+            {
+                "object": "block",
+                "type": "table",
+                "table": {
+                    "table_width": 6,
+                    "has_column_header": True,
+                    "has_row_header": False,
+                    "children": table_rows
+                }
+            },
+            *self._build_race_pace_blocks(race),
+            {
+                "object": "block",
+                "type": "heading_2",
+                "heading_2": {
+                    "rich_text": [{"type": "text", "text": {"content": "予想"}}]
+                }
+            },
+            {
+                "object": "block",
+                "type": "paragraph",
+                "paragraph": {"rich_text": []}
+            }
+        ]
+
+        return blocks
@@ -0,0 +1,294 @@
+"""Notion API通信モジュール（レート制限・リトライ対応）"""
+
+import random
+import threading
+import time
+from typing import Optional, List, Dict, Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+
+class NotionAPIError(Exception):
+    """Notion APIがエラーを返した場合の例外"""
+
+    def __init__(self, status: int, code: str, message: str):
+        """
+        初期化
+
+        Args:
+            status: HTTPステータスコード
+            code: Notionのエラーコード（object_not_found, validation_errorなど）
+            message: エラーメッセージ
+        """
+        super().__init__(f"{status} {code}: {message}")
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+class TokenBucket:
+    """
+    トークンバケット方式のレートリミッター
+
+    429を受けたら補充レートを下げ、成功が続くと設定値まで徐々に戻す
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        初期化
+
+        Args:
+            rate: 1秒あたりの補充トークン数（平均リクエスト数）
+            capacity: バケット容量（バースト許容数）
+        """
+        self.max_rate = rate
+        self.min_rate = rate / 8
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def acquire(self) -> float:
+        """
+        トークンを1つ取得（足りなければ待機）
+
+        Returns:
+            待機した秒数
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float) -> None:
+        """Retry-Afterの間、トークンの補充を止める"""
+        with self._lock:
+            self._refill()
+            # ちょうどseconds秒後に1リクエストだけ送れる状態にする
+            self._tokens = min(self._tokens, 1) - seconds * self.rate
+
+    def slow_down(self) -> None:
+        """レート制限を受けたので補充レートを半分にする"""
+        with self._lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def speed_up(self) -> None:
+        """成功したので補充レートを少しずつ戻す"""
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill()
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+class NotionTransport:
+    """NotionClientの全API呼び出しが通る通信レイヤー"""
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://api.notion.com/v1",
+        notion_version: str = "2022-06-28",
+        rate: float = 3.0,
+        burst: float = 3.0,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        pool_size: int = 10,
+        timeout: float = 30.0
+    ):
+        """
+        初期化
+
+        Args:
+            api_key: Notion APIキー
+            base_url: APIのベースURL
+            notion_version: Notion-Versionヘッダーの値
+            rate: 1秒あたりの平均リクエスト数
+            burst: 瞬間的に許容するリクエスト数
+            max_retries: 429・5xx・通信エラー時の最大リトライ回数（ページ作成・ブロック追記は429と接続失敗のみ）
+            backoff_base: 指数バックオフの初期待機秒数
+            backoff_max: 指数バックオフの最大待機秒数
+            pool_size: コネクションプールのサイズ
+            timeout: 1リクエストのタイムアウト秒数
+        """
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.limiter = TokenBucket(rate, burst)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+            "Notion-Version": notion_version
+        })
+
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, float] = {
+            "requests": 0,      # 実際に送信したHTTPリクエスト数
+            "calls": 0,         # request()の呼び出し数
+            "throttled": 0,     # 429を受けた回数
+            "retried": 0,       # リトライした回数
+            "failed": 0,        # 最終的に失敗した呼び出し数
+            "wait_seconds": 0.0  # レートリミッター・バックオフで待機した合計秒数
+        }
+
+    def _count(self, key: str, value: float = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += value
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """ジッター付き指数バックオフの待機秒数（full jitter）"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _retry_after(self, response: requests.Response) -> Optional[float]:
+        """Retry-Afterヘッダーを秒数として取得"""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return None
+
+    def _not_sent(self, error: requests.RequestException) -> bool:
+        """接続の確立に失敗した（リクエストがNotionに届いていない）通信エラーかどうか"""
+        if isinstance(error, requests.ConnectTimeout):
+            return True
+        if isinstance(error, requests.ConnectionError) and not isinstance(error, requests.Timeout):
+            reason = getattr(error.args[0], "reason", error.args[0]) if error.args else None
+            return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+        return False
+
+    def request(self, method: str, path: str, body: Optional[Dict[str, Any]] = None, params: Optional[Dict[str, Any]] = None,
+                idempotent: bool = True) -> Dict[str, Any]:
+        """
+        APIを呼び出す（レート制限・リトライ込み）
+
+        Args:
+            method: HTTPメソッド
+            path: ベースURLからのパス（例: "/pages"）
+            body: リクエストボディ
+            params: クエリパラメータ
+            idempotent: 繰り返しても結果が変わらない呼び出しか。Falseの場合（ページ作成・ブロック追記）は
+                書き込まれたか分からない応答待ちのタイムアウト・5xxではリトライせず例外にする
+                （Notion側で保存済みだった場合に重複して作成しないため）。429と接続失敗のみリトライする
+
+        Returns:
+            レスポンスのJSON
+
+        Raises:
+            NotionAPIError: リトライしても成功しなかった、またはリトライ対象外のエラー
+        """
+        url = f"{self.base_url}{path}"
+        self._count("calls")
+
+        attempt = 0
+        while True:
+            self._count("wait_seconds", self.limiter.acquire())
+            self._count("requests")
+            try:
+                response = self.session.request(method, url, json=body, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries or not (idempotent or self._not_sent(e)):
+                    self._count("failed")
+                    raise NotionAPIError(0, "connection_error", str(e))
+                delay = self._backoff_delay(attempt)
+            else:
+                if response.status_code < 400:
+                    self.limiter.speed_up()
+                    return response.json() if response.content else {}
+
+                retryable = response.status_code == 429 or (idempotent and response.status_code in self.RETRY_STATUSES)
+                if not retryable or attempt >= self.max_retries:
+                    self._count("failed")
+                    raise self._to_error(response)
+
+                delay = self._backoff_delay(attempt)
+                if response.status_code == 429:
+                    self._count("throttled")
+                    self.limiter.slow_down()
+                    retry_after = self._retry_after(response)
+                    if retry_after is not None:
+                        # 他スレッドも含めて送信を止め、待機はリミッターに任せる（ジッターのみ加える）
+                        self.limiter.pause(retry_after)
+                        delay = random.uniform(0, self.backoff_base)
+
+            self._count("retried")
+            self._count("wait_seconds", delay)
+            time.sleep(delay)
+            attempt += 1
+
+    def _to_error(self, response: requests.Response) -> NotionAPIError:
+        """エラーレスポンスを例外に変換"""
+        try:
+            data = response.json()
+            return NotionAPIError(response.status_code, data.get("code", ""), data.get("message", response.text))
+        except ValueError:
+            return NotionAPIError(response.status_code, "", response.text)
+
+    # --- エンドポイント別のヘルパー ---
+
+    def query_database(self, database_id: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """POST /databases/{id}/query"""
+        return self.request("POST", f"/databases/{database_id}/query", body=payload or {})
+
+    def create_page(self, parent: Dict[str, Any], properties: Dict[str, Any], children: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """POST /pages"""
+        body: Dict[str, Any] = {"parent": parent, "properties": properties}
+        if children:
+            body["children"] = children
+        return self.request("POST", "/pages", body=body, idempotent=False)
+
+    def update_page(self, page_id: str, properties: Dict[str, Any]) -> Dict[str, Any]:
+        """PATCH /pages/{id}"""
+        return self.request("PATCH", f"/pages/{page_id}", body={"properties": properties})
+
+    def retrieve_page(self, page_id: str) -> Dict[str, Any]:
+        """GET /pages/{id}"""
+        return self.request("GET", f"/pages/{page_id}")
+
+    def list_block_children(self, block_id: str, start_cursor: Optional[str] = None, page_size: int = 100) -> Dict[str, Any]:
+        """GET /blocks/{id}/children"""
+        params: Dict[str, Any] = {"page_size": page_size}
+        if start_cursor:
+            params["start_cursor"] = start_cursor
+        return self.request("GET", f"/blocks/{block_id}/children", params=params)
+
+    def append_block_children(self, block_id: str, children: List[Dict[str, Any]], after: Optional[str] = None) -> Dict[str, Any]:
+        """PATCH /blocks/{id}/children"""
+        body: Dict[str, Any] = {"children": children}
+        if after:
+            body["after"] = after
+        return self.request("PATCH", f"/blocks/{block_id}/children", body=body, idempotent=False)
+
+    def summary(self) -> str:
+        """統計情報の文字列表現"""
+        return (
+            f"API呼び出し {int(self.stats['calls'])}回 "
+            f"(送信 {int(self.stats['requests'])}回, 429 {int(self.stats['throttled'])}回, "
+            f"リトライ {int(self.stats['retried'])}回, 失敗 {int(self.stats['failed'])}回, "
+            f"待機 {self.stats['wait_seconds']:.1f}秒)"
+        )
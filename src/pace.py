@@ -0,0 +1,110 @@
+"""ラップタイムの解析モジュール
+
+レースのラップタイム（'12.5-11.0-11.8-...'）を数値化し、前半3F・後半3F・1ハロンごとの増減・
+ペース（ハイ/ミドル/スロー）を求める。複数のレースのラップを1つの配列にまとめて一括で計算し、
+結果は Race.pace に保持して、出走馬ごとの出走履歴・レースページの作成で使い回す。
+"""
+
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from src.models import Race, RacePace
+
+
+# 前半3Fと後半3Fの差（秒）がこれを超えたらハイペース/スローペースとする
+PACE_THRESHOLD = 1.0
+PACE_LABELS = {"H": "ハイ", "M": "ミドル", "S": "スロー"}
+
+
+def _split_laps(lap_time: str) -> List[str]:
+    return [lap.strip() for lap in lap_time.split('-') if lap.strip()]
+
+
+def _to_float(text: str) -> Optional[float]:
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def analyze_races(races: Iterable[Race]) -> None:
+    """
+    レースのラップタイムをまとめて解析し、結果を race.pace に設定する
+
+    ラップタイムがないレースは race.pace を None のままにする。
+    数値のラップが3つ未満のレースは前半3F・後半3F・ペースを None にする
+
+    Args:
+        races: レース情報
+    """
+    targets = []
+    texts = []
+    values = []
+    for race in races:
+        laps = _split_laps(race.lap_time or "")
+        if not laps:
+            # ラップタイムがない・区切りだけ（'-'）のレースは解析しない
+            continue
+        targets.append(race)
+        texts.append("-".join(laps))
+        # 数値にできないラップは計算から除く（表示用の文字列には残す）
+        values.append([v for v in map(_to_float, laps) if v is not None])
+    if not targets:
+        return
+
+    # 長さの異なるラップを NaN で埋めた (レース数 × 最大ラップ数) の配列にまとめる
+    lengths = np.array([len(v) for v in values])
+    width = max(int(lengths.max()), 3)
+    matrix = np.full((len(values), width), np.nan)
+    for i, row in enumerate(values):
+        matrix[i, :len(row)] = row
+
+    # 前半3F・後半3Fはラップが3つ以上あるレースだけ求める（3つ未満の行は使わない）
+    first_3f = matrix[:, :3].sum(axis=1)
+    tail = np.clip(lengths[:, None] - 3 + np.arange(3), 0, None)
+    last_3f = np.take_along_axis(matrix, tail, axis=1).sum(axis=1)
+    deltas = np.diff(matrix, axis=1)
+    balance = first_3f - last_3f
+    paces = np.where(balance < -PACE_THRESHOLD, "H", np.where(balance > PACE_THRESHOLD, "S", "M"))
+
+    for i, race in enumerate(targets):
+        count = int(lengths[i])
+        has_3f = count >= 3
+        race.pace = RacePace(
+            text=texts[i],
+            laps=values[i],
+            first_3f=round(float(first_3f[i]), 1) if has_3f else None,
+            last_3f=round(float(last_3f[i]), 1) if has_3f else None,
+            deltas=[round(float(d), 1) for d in deltas[i, :max(count - 1, 0)]],
+            pace=str(paces[i]) if has_3f else None
+        )
+
+
+def race_pace(race: Race) -> Optional[RacePace]:
+    """
+    レースのラップ解析結果を取得（未解析なら解析して保持する）
+
+    Args:
+        race: レース情報
+
+    Returns:
+        解析結果（ラップタイムがない場合はNone）
+    """
+    if race.pace is None and _split_laps(race.lap_time or ""):
+        analyze_races([race])
+    return race.pace
+
+
+def format_pace(pace: RacePace) -> str:
+    """
+    ラップの表示用文字列 '12.5-11.0-11.8-... (35.3-34.9 ミドル)'
+
+    前半3F・後半3Fを求められない（ラップが3つ未満の）場合はラップだけを返す
+
+    Args:
+        pace: 解析結果
+    """
+    if pace.first_3f is None:
+        return pace.text
+    return f"{pace.text} ({pace.first_3f:.1f}-{pace.last_3f:.1f} {PACE_LABELS[pace.pace]})"
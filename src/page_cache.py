@@ -0,0 +1,200 @@
+"""NotionページIDのローカルキャッシュモジュール"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+from typing import Optional, Tuple
+
+from src.models import race_slot
+
+
+class PageCache:
+    """馬・レースのNotionページIDをSQLiteに保存し、予想・回顧の実行間で共有するキャッシュ"""
+
+    def __init__(self, path: str, ttl_days: float = 30):
+        """
+        初期化
+
+        Args:
+            path: SQLiteファイルのパス
+            ttl_days: キャッシュの有効期間（日）。0以下の場合は無期限
+        """
+        self.path = path
+        self.ttl_seconds = ttl_days * 24 * 60 * 60
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS horse_pages (
+                name TEXT PRIMARY KEY,
+                horse_id TEXT,
+                page_id TEXT NOT NULL,
+                cached_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_horse_pages_horse_id ON horse_pages (horse_id);
+            CREATE TABLE IF NOT EXISTS race_pages (
+                race_date TEXT NOT NULL,
+                venue TEXT NOT NULL,
+                race_number INTEGER NOT NULL,  -- レース番号（ない場合は 'name:レース名'）
+                page_id TEXT NOT NULL,
+                title TEXT,
+                cached_at REAL NOT NULL,
+                PRIMARY KEY (race_date, venue, race_number)
+            );
+            """
+        )
+        self._conn.commit()
+
+    def _is_fresh(self, cached_at: float) -> bool:
+        """TTL内かどうか"""
+        if self.ttl_seconds <= 0:
+            return True
+        return time.time() - cached_at < self.ttl_seconds
+
+    def get_horse(self, horse_name: str, horse_id: Optional[str] = None) -> Optional[str]:
+        """
+        馬のページIDを取得
+
+        Args:
+            horse_name: 馬名
+            horse_id: 出馬票由来の馬ID（あれば馬名より優先）
+
+        Returns:
+            ページID（キャッシュにない・期限切れの場合はNone）
+        """
+        with self._lock:
+            row = None
+            if horse_id:
+                row = self._conn.execute(
+                    "SELECT page_id, cached_at FROM horse_pages WHERE horse_id = ?", (horse_id,)
+                ).fetchone()
+            if row is None:
+                row = self._conn.execute(
+                    "SELECT page_id, cached_at FROM horse_pages WHERE name = ?", (horse_name,)
+                ).fetchone()
+        if row and self._is_fresh(row[1]):
+            return row[0]
+        return None
+
+    def set_horse(self, horse_name: str, page_id: str, horse_id: Optional[str] = None) -> None:
+        """
+        馬のページIDを保存
+
+        Args:
+            horse_name: 馬名
+            page_id: ページID
+            horse_id: 出馬票由来の馬ID
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO horse_pages (name, horse_id, page_id, cached_at) VALUES (?, ?, ?, ?)",
+                (horse_name, horse_id, page_id, time.time())
+            )
+            self._conn.commit()
+
+    def get_race(self, race_date: date, venue: str, race_number: Optional[int], race_name: Optional[str] = None) -> Optional[str]:
+        """
+        レースのページIDを取得
+
+        Args:
+            race_date: 開催日
+            venue: 競馬場
+            race_number: レース番号
+            race_name: レース名（レース番号がない場合はレース名で識別する）
+
+        Returns:
+            ページID（キャッシュにない・期限切れの場合はNone）
+        """
+        entry = self.get_race_entry(race_date, venue, race_number, race_name)
+        return entry[0] if entry else None
+
+    def get_race_entry(self, race_date: date, venue: str, race_number: Optional[int], race_name: Optional[str] = None) -> Optional[Tuple[str, Optional[str]]]:
+        """
+        レースのページIDと保存時のタイトルを取得
+
+        Args:
+            race_date: 開催日
+            venue: 競馬場
+            race_number: レース番号
+            race_name: レース名（レース番号がない場合はレース名で識別する）
+
+        Returns:
+            (ページID, タイトル)（キャッシュにない・期限切れの場合はNone）
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT page_id, title, cached_at FROM race_pages WHERE race_date = ? AND venue = ? AND race_number = ?",
+                (race_date.isoformat(), venue, race_slot(race_number, race_name))
+            ).fetchone()
+        if row and self._is_fresh(row[2]):
+            return row[0], row[1]
+        return None
+
+    def set_race(self, race_date: date, venue: str, race_number: Optional[int], page_id: str, title: Optional[str] = None,
+                 race_name: Optional[str] = None) -> None:
+        """
+        レースのページIDを保存
+
+        Args:
+            race_date: 開催日
+            venue: 競馬場
+            race_number: レース番号
+            page_id: ページID
+            title: ページのタイトル（レース名）
+            race_name: 識別に使うレース名（レース番号がない場合のみ使う。省略時はtitle）
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO race_pages (race_date, venue, race_number, page_id, title, cached_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (race_date.isoformat(), venue, race_slot(race_number, race_name if race_name is not None else title), page_id, title, time.time())
+            )
+            self._conn.commit()
+
+    def invalidate_page(self, page_id: str) -> int:
+        """
+        指定ページIDのエントリを削除（アーカイブ・削除されたページ用）
+
+        Args:
+            page_id: ページID
+
+        Returns:
+            削除した件数
+        """
+        with self._lock:
+            count = self._conn.execute("DELETE FROM horse_pages WHERE page_id = ?", (page_id,)).rowcount
+            count += self._conn.execute("DELETE FROM race_pages WHERE page_id = ?", (page_id,)).rowcount
+            self._conn.commit()
+        return count
+
+    def invalidate_horse(self, horse_name: str) -> None:
+        """指定した馬のエントリを削除"""
+        with self._lock:
+            self._conn.execute("DELETE FROM horse_pages WHERE name = ?", (horse_name,))
+            self._conn.commit()
+
+    def invalidate_race(self, race_date: date, venue: str, race_number: Optional[int], race_name: Optional[str] = None) -> None:
+        """指定したレースのエントリを削除"""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM race_pages WHERE race_date = ? AND venue = ? AND race_number = ?",
+                (race_date.isoformat(), venue, race_slot(race_number, race_name))
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """全エントリを削除"""
+        with self._lock:
+            self._conn.execute("DELETE FROM horse_pages")
+            self._conn.execute("DELETE FROM race_pages")
+            self._conn.commit()
+
+    def close(self) -> None:
+        """接続を閉じる"""
+        with self._lock:
+            self._conn.close()
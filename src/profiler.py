@@ -0,0 +1,159 @@
+"""--profile 用の処理段階ごとの計測モジュール"""
+
+import cProfile
+import functools
+import inspect
+import os
+import time
+from typing import Optional, List, Iterable
+
+from src.step_timer import StepTimer
+
+
+def percentile(sorted_values: List[float], ratio: float) -> float:
+    """
+    ソート済みの値の百分位数（線形補間）
+
+    Args:
+        sorted_values: 昇順にソートした値
+        ratio: 0〜1（0.5で中央値）
+    """
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * ratio
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+class Profiler(StepTimer):
+    """
+    スクレイパーの各段階・NotionClientの各メソッド・API呼び出しを計測する
+
+    instrumentでオブジェクトのメソッドを計測付きのラッパーに差し替え、
+    最後にreportで段階ごとの回数・合計・p50/p95を表示する。
+    cprofile_pathを指定するとcProfileの結果（pstats形式）も保存する。
+    """
+
+    def __init__(self, cprofile_path: Optional[str] = None):
+        """
+        初期化
+
+        Args:
+            cprofile_path: cProfileの結果の保存先（snakeviz・flameprof等で可視化できる）
+        """
+        super().__init__()
+        self.cprofile_path = cprofile_path
+        self._cprofile: Optional[cProfile.Profile] = None
+
+    def start(self) -> None:
+        """cProfileを開始（cprofile_path指定時のみ）"""
+        if self.cprofile_path:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def stop(self) -> None:
+        """cProfileを停止して保存"""
+        if self._cprofile is None:
+            return
+        self._cprofile.disable()
+        directory = os.path.dirname(self.cprofile_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._cprofile.dump_stats(self.cprofile_path)
+        self._cprofile = None
+
+    def instrument(self, obj, prefix: str, methods: Optional[Iterable[str]] = None, names: Optional[dict] = None) -> None:
+        """
+        オブジェクトのメソッドを計測付きのラッパーに差し替える（インスタンス単位）
+
+        Args:
+            obj: 計測対象のオブジェクト
+            prefix: 段階名の接頭辞（例: 'notion'）
+            methods: 対象のメソッド名（省略時はクラスで定義された公開メソッド）
+            names: メソッド名→段階名の対応（指定しないものは "prefix.メソッド名"）
+        """
+        names = names or {}
+        if methods is None:
+            methods = [
+                name for name, member in inspect.getmembers(type(obj), inspect.isfunction)
+                if not name.startswith("_")
+            ]
+        for name in methods:
+            method = getattr(obj, name)
+            step = names.get(name, f"{prefix}.{name}")
+            if inspect.iscoroutinefunction(method):
+                setattr(obj, name, self._wrap_async(method, step))
+            elif inspect.isgeneratorfunction(method):
+                setattr(obj, name, self._wrap_generator(method, step))
+            else:
+                setattr(obj, name, self._wrap(method, step))
+
+    def _wrap(self, method, step: str):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            with self.measure(step):
+                return method(*args, **kwargs)
+        return wrapper
+
+    def _wrap_generator(self, method, step: str):
+        # 呼び出しはジェネレーターを作るだけなので、反復全体でジェネレーター内にいた時間を1回分として記録する
+        # （値を受け取った側の処理時間は含めない）
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            elapsed = 0.0
+            iterator = method(*args, **kwargs)
+            try:
+                while True:
+                    started = time.perf_counter()
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                    finally:
+                        elapsed += time.perf_counter() - started
+                    yield item
+            finally:
+                iterator.close()
+                self.record(step, elapsed)
+        return wrapper
+
+    def _wrap_async(self, method, step: str):
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            with self.measure(step):
+                return await method(*args, **kwargs)
+        return wrapper
+
+    def report(self, title: str = "処理時間の内訳 (--profile)") -> str:
+        """
+        段階ごとの回数・合計・平均・p50・p95・最大の一覧
+
+        段階名の接頭辞（scraper / notion / notion_api）ごとにまとめ、合計時間の長い順に並べる。
+        呼び出しが入れ子になる段階（find_or_create_* が find_* を呼ぶなど）の時間は重複して数える。
+        """
+        with self._lock:
+            items = {step: sorted(durations) for step, durations in self._durations.items()}
+        if not items:
+            return f"{title}: 記録なし"
+
+        lines = [f"{title}:"]
+        width = max(len(step) for step in items)
+        groups = {}
+        for step, durations in items.items():
+            groups.setdefault(step.split(".")[0], []).append((step, durations))
+
+        for group, steps in sorted(groups.items(), key=lambda kv: -max(sum(d) for _, d in kv[1])):
+            lines.append(f"  [{group}]")
+            for step, durations in sorted(steps, key=lambda kv: -sum(kv[1])):
+                total = sum(durations)
+                lines.append(
+                    f"    {step:<{width}} {len(durations):6d}回  合計 {total:8.2f}秒  "
+                    f"平均 {total / len(durations) * 1000:8.1f}ms  "
+                    f"p50 {percentile(durations, 0.5) * 1000:8.1f}ms  "
+                    f"p95 {percentile(durations, 0.95) * 1000:8.1f}ms  "
+                    f"最大 {durations[-1] * 1000:8.1f}ms"
+                )
+        if self.cprofile_path:
+            lines.append(f"  cProfileの結果: {self.cprofile_path}（メインスレッドのみ。python -m pstats / snakeviz / flameprof で表示）")
+        return "\n".join(lines)
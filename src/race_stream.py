@@ -0,0 +1,174 @@
+"""スクレイピングとNotionへの書き込みをつなぐ有界キュー"""
+
+import asyncio
+import queue
+import threading
+from typing import Iterable, Iterator, AsyncIterator, Optional, List
+
+from src.config import Config
+from src.models import Race
+
+
+_DONE = object()
+
+
+class _Failure:
+    """生産側で発生した例外を消費側に渡すための入れ物"""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class RaceStream:
+    """
+    レースの生成（スクレイピング）を別スレッドで進め、上限付きのキューを通して受け渡す
+
+    消費側（Notionへの書き込み）が追いつかない間はキューが一杯になり生産側が待つため、
+    メモリ上に溜まるレースは maxsize 件までに抑えられる。
+    生産側で発生した例外は、消費側がキューを読み進めたときに同じ例外として送出される。
+
+    使い方:
+        stream = RaceStream(scraper.iter_active_races(mode='retrospective'))
+        try:
+            for race in stream: ...          # 同期
+            async for race in stream: ...    # 非同期
+            for batch in stream.batches(): ...  # 開催日ごとにまとめて受け取る
+        finally:
+            stream.close()
+    """
+
+    def __init__(self, races: Iterable[Race], maxsize: Optional[int] = None):
+        """
+        初期化（生産側のスレッドを開始する）
+
+        Args:
+            races: レースを順に返すイテラブル（ジェネレーター）
+            maxsize: キューに溜められるレースの上限（省略時は設定値）
+        """
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize or Config.RACE_QUEUE_SIZE)
+        self._closed = threading.Event()
+        self._held = None
+        self._thread = threading.Thread(target=self._produce, args=(races,), name="race-stream", daemon=True)
+        self._thread.start()
+
+    def _put(self, item) -> bool:
+        """キューに空きができるまで待って入れる（close後はFalse）"""
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self, races: Iterable[Race]) -> None:
+        try:
+            for race in races:
+                if not self._put(race):
+                    return
+        except BaseException as e:
+            self._put(_Failure(e))
+        finally:
+            # 途中で打ち切った場合も、ジェネレーターの後始末（スクレイパーのブラウザ終了など）をここで走らせる
+            try:
+                getattr(races, "close", lambda: None)()
+            except Exception as e:
+                print(f"レース取得の終了処理エラー: {e}")
+            self._put(_DONE)
+
+    def _unwrap(self, item):
+        if isinstance(item, _Failure):
+            raise item.error
+        return item
+
+    def _take(self):
+        """キューから1件取り出す（batchesで先読みしたレース・終了・例外の印があればそれを返す）"""
+        if self._held is not None:
+            item, self._held = self._held, None
+            return item
+        return self._queue.get()
+
+    def _next_batch(self, max_horses: int) -> Optional[List[Race]]:
+        """
+        同じ開催日のレースを、出走馬が max_horses 頭に達するか別の開催日のレースが届くか取得が終わるまで待ってまとめる
+
+        Returns:
+            レースのリスト（取得が終わっていればNone）
+        """
+        item = self._unwrap(self._take())
+        if item is _DONE:
+            return None
+        batch = [item]
+        names = {horse.name for horse in item.horses}
+        while len(names) < max_horses:
+            item = self._take()
+            if item is _DONE or isinstance(item, _Failure) or item.date != batch[0].date:
+                # 終了・例外・次の開催日のレースは、まとめたレースを返してから渡す
+                self._held = item
+                break
+            merged = names | {horse.name for horse in item.horses}
+            if len(merged) > max_horses:
+                self._held = item
+                break
+            batch.append(item)
+            names = merged
+        return batch
+
+    def batches(self, max_horses: Optional[int] = None) -> Iterator[List[Race]]:
+        """
+        レースを開催日ごとに、出走馬（馬名の重複を除く）が max_horses 頭以内になるようにまとめて返す
+
+        まとまりの出走馬を1回の一括検索で引けるよう、上限に達するか、別の開催日のレースが届くか、
+        取得が終わるまで次のレースを待つ（1レースで上限を超える場合はそのレースだけで返す）
+
+        Args:
+            max_horses: 1回にまとめる出走馬の上限（省略時は NOTION_FILTER_BATCH）
+
+        Yields:
+            レースのリスト（取得できた順）
+        """
+        while True:
+            batch = self._next_batch(max_horses or Config.NOTION_FILTER_BATCH)
+            if batch is None:
+                return
+            yield batch
+
+    async def abatches(self, max_horses: Optional[int] = None) -> AsyncIterator[List[Race]]:
+        """batchesの非同期版"""
+        loop = asyncio.get_running_loop()
+        while True:
+            # まとまりがそろうまでの待機でイベントループを止めないよう、既定のスレッドプールで待つ
+            batch = await loop.run_in_executor(None, self._next_batch, max_horses or Config.NOTION_FILTER_BATCH)
+            if batch is None:
+                return
+            yield batch
+
+    def __iter__(self) -> Iterator[Race]:
+        while True:
+            item = self._unwrap(self._queue.get())
+            if item is _DONE:
+                return
+            yield item
+
+    async def __aiter__(self) -> AsyncIterator[Race]:
+        loop = asyncio.get_running_loop()
+        while True:
+            # キューの待機でイベントループを止めないよう、既定のスレッドプールで待つ
+            item = self._unwrap(await loop.run_in_executor(None, self._queue.get))
+            if item is _DONE:
+                return
+            yield item
+
+    def close(self) -> None:
+        """
+        消費を打ち切る
+
+        生産側はキューへの追加をやめ、実行中のレース取得が終わった時点で
+        レースのジェネレーターを閉じて終了する
+        """
+        self._closed.set()
+        try:
+            # キューを待っている消費側があれば起こす
+            self._queue.put_nowait(_DONE)
+        except queue.Full:
+            pass
@@ -1,20 +1,33 @@
 """出馬票・レース情報取得モジュール"""
 
-from typing import List, Optional
-from datetime import date, timedelta
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+from datetime import date
+from html import unescape
+from urllib.parse import parse_qs, urljoin, urlparse
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer, Tag
 import re
-import time
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 
+from src.config import Config
 from src.models import Race, Horse
+from src.crawl_journal import CrawlJournal
+from src.driver_cache import ChromeDriverCache
+from src.html_cache import HtmlCache
+from src.html_parser import make_soup, resolve_backend
+from src.fetcher import HttpFetcher
+from src.step_timer import StepTimer
+from src.pace import analyze_races
+
+
+@dataclass
+class MeetingTarget:
+    """開催日/場リンクの遷移先"""
+    label: str  # リンクテキスト（例: 1回中山1日）
+    url: Optional[str] = None  # 直接アクセスできるURL（doActionの場合はCNAME付きのJRADB URL）
+    race_date: Optional[date] = None  # 開催日（過去のレース結果から巡回する場合）
 
 
 class Scraper:
@@ -23,6 +36,53 @@ class Scraper:
     BASE_URL = "https://www.jra.go.jp"
     JRADB_BASE_URL = "https://www.jra.go.jp/JRADB/accessD.html"
     
+    # JRAサイトの doAction('/JRADB/accessD.html', 'pw01...') 呼び出し
+    DO_ACTION_PATTERN = re.compile(r"doAction\(\s*['\"]([^'\"]+)['\"]\s*,\s*['\"]([^'\"]+)['\"]")
+    
+    # 過去のレース結果のCNAME（月ごとの開催一覧: pw01skl..YYYYMM、開催日のレース一覧: pw01srl...YYYYMMDD）
+    ARCHIVE_MONTH_CNAME_PATTERN = re.compile(r'^pw01skl\d{2}(\d{4})(\d{2})(?:/\w+)?$')
+    ARCHIVE_MEETING_CNAME_PATTERN = re.compile(r'^pw01srl\d*(\d{4})(\d{2})(\d{2})(?:/\w+)?$')
+    
+    # ページ全体のテキストから抽出する開催日・開催情報（例: 2024年1月6日, 1回中山1日）
+    DATE_PATTERN = re.compile(r'(\d{4})年(\d{1,2})月(\d{1,2})日')
+    KAISAI_PATTERN = re.compile(r'(\d+)回([一-龠]{2,3})(\d+)日')
+    TITLE_PATTERN = re.compile(r'<title[^>]*>(.*?)</title>', re.I | re.S)
+    
+    # レースページの本文（出走馬のテーブル・レースヘッダー・開催日）が入る要素。ナビゲーションやscriptは木にしない
+    CONTENT_STRAINER = SoupStrainer(id="main")
+    
+    # レースURLからのレース番号抽出
+    CNAME_RACE_NUMBER_PATTERN = re.compile(r'CNAME=.*(\d{2})\d{8}$')
+    RACE_NO_PATTERN = re.compile(r'race_no=(\d+)')
+    
+    # 出馬表ページのテーブル・セクション・レース名
+    RACE_TABLE_CLASS = re.compile(r'race|entry|shutuba', re.I)
+    RACE_SECTION_CLASS = re.compile(r'race|entry', re.I)
+    RACE_TITLE_PATTERN = re.compile(r'R\d+|第\d+R|レース\d+', re.I)
+    RACE_CELL_PATTERN = re.compile(r'R\d+|第\d+R')
+    RACE_NUMBER_TEXT_PATTERN = re.compile(r'(\d+)R')
+    
+    # JRADBページのヘッダー領域
+    RACE_HEAD_CLASS = re.compile(r'race_header|race_head|race_number|race_data', re.I)
+    RACE_NUM_CLASS = re.compile(r'race.*num|race_number', re.I)
+    RACE_NAME_CLASS = re.compile(r'race.*name|race_title', re.I)
+    NAME_DIV_CLASS = re.compile(r'^(cell\s+)?name$', re.I)
+    NUM_CLASS = re.compile(r'num', re.I)
+    NAME_CLASS = re.compile(r'name', re.I)
+    LAP_TIME_PATTERN = re.compile(r'ハロンタイム')
+    DISTANCE_PATTERN = re.compile(r'([\d,]+)(?=メートル|m)')
+    NUMBER_PATTERN = re.compile(r'(\d+)')
+    NON_EMPTY_PATTERN = re.compile(r'.+')
+    DISTANCE_TEXT_PATTERN = re.compile(r'\d+m|\d+メートル')
+    
+    # 出走馬の行
+    POSITION_PATTERN = re.compile(r'^\d+$')
+    RESULT_NAME_PATTERN = re.compile(r'^([^\d\(\[<]+)')
+    MARK_PATTERN = re.compile(r'[▲△☆★◇]')
+    GENDER_AGE_PATTERN = re.compile(r'([一-龠])(\d+)')
+    WHITESPACE_PATTERN = re.compile(r'\s+')
+    NON_NAME_PATTERN = re.compile(r'^[\d\s\-\.]+$')
+    
     # 競馬場IDのマッピング (映像URL生成用)
     VENUE_ID_MAP = {
         "札幌": "1", "函館": "2", "福島": "3", "新潟": "4",
@@ -30,13 +90,23 @@ class Scraper:
         "阪神": "9", "小倉": "a"
     }
     
-    def __init__(self, headless: bool = True):
+    def __init__(self, headless: bool = True, journal: Optional[CrawlJournal] = None, use_http: bool = True,
+                 html_cache: Optional[HtmlCache] = None, replay: bool = False, parser_backend: Optional[str] = None,
+                 keep_driver: bool = False):
         """
         スクレイパーを初期化
         
         Args:
             headless: ヘッドレスモードで実行するかどうか
+            journal: 巡回結果を逐次記録するジャーナル（指定時は記録済みの開催・レースを再取得しない）
+            use_http: レースページをHTTPで直接取得するかどうか（Falseの場合は常にSeleniumを使う）
+            html_cache: 取得したページを保存するキャッシュ
+            replay: Trueの場合はネットワークもブラウザも使わず、html_cacheに保存した前回の巡回を再現する
+            parser_backend: HTMLパーサーのバックエンド（'auto' / 'lxml' / 'html.parser'、省略時は設定値）
+            keep_driver: Trueの場合は巡回が終わってもブラウザを閉じない（デーモンで使い回す場合）
         """
+        if replay and html_cache is None:
+            raise ValueError("replayモードにはhtml_cacheの指定が必要です")
         self.session = requests.Session()
         self.session.headers.update({
             "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -47,7 +117,21 @@ class Scraper:
             "Upgrade-Insecure-Requests": "1",
             "Referer": "https://www.jra.go.jp/"
         })
+        self.fetcher = HttpFetcher(
+            self.session,
+            max_per_host=Config.SCRAPER_MAX_PER_HOST,
+            delay=Config.SCRAPER_REQUEST_DELAY
+        )
+        self.use_http = use_http
         self.headless = headless
+        self.keep_driver = keep_driver
+        self.journal = journal
+        self.html_cache = html_cache
+        self.replay = replay
+        self.parser_backend = resolve_backend(parser_backend or Config.SCRAPER_PARSER)
+        self._crawl_id = None
+        self.wait_timeout = Config.SCRAPER_WAIT_TIMEOUT
+        self.timer = StepTimer()
         self.driver = None
     
     def _get_driver(self):
@@ -58,6 +142,11 @@ class Scraper:
             WebDriverインスタンス
         """
         if self.driver is None:
+            # seleniumはブラウザが必要になったときだけ読み込む（HTTP取得・replayでは使わない）
+            from selenium import webdriver
+            from selenium.webdriver.chrome.options import Options
+            from selenium.webdriver.chrome.service import Service
+            
             chrome_options = Options()
             if self.headless:
                 chrome_options.add_argument('--headless')
@@ -67,7 +156,8 @@ class Scraper:
             chrome_options.add_argument('--window-size=1920,1080')
             chrome_options.add_argument('user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
             
-            service = Service(ChromeDriverManager().install())
+            driver_path = Config.CHROMEDRIVER_PATH or ChromeDriverCache(Config.CHROMEDRIVER_CACHE_PATH).resolve()
+            service = Service(driver_path)
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
         
         return self.driver
@@ -82,6 +172,26 @@ class Scraper:
         """デストラクタ"""
         self._close_driver()
     
+    def _wait_until(self, driver, step: str, condition):
+        """
+        条件が満たされるまで待機し、待機時間をステップ名で記録
+        
+        Args:
+            driver: WebDriver
+            step: ステップ名（待機時間の内訳に表示）
+            condition: expected_conditionsの条件
+            
+        Returns:
+            条件の戻り値
+            
+        Raises:
+            TimeoutException: wait_timeout秒以内に条件が満たされない場合
+        """
+        from selenium.webdriver.support.ui import WebDriverWait
+        
+        with self.timer.measure(step):
+            return WebDriverWait(driver, self.wait_timeout, poll_frequency=0.1).until(condition)
+    
     def _get_page(self, url: str) -> Optional[BeautifulSoup]:
         """
         URLからHTMLページを取得してパース
@@ -96,7 +206,7 @@ class Scraper:
             response = self.session.get(url, timeout=10, allow_redirects=True)
             response.raise_for_status()
             response.encoding = response.apparent_encoding or 'utf-8'
-            return BeautifulSoup(response.text, 'html.parser')
+            return make_soup(response.text, self.parser_backend)
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 403:
                 print(f"アクセス拒否 (403): {url}")
@@ -120,7 +230,7 @@ class Scraper:
             馬名
         """
         # 余分な空白や改行を除去
-        name = re.sub(r'\s+', '', text.strip())
+        name = self.WHITESPACE_PATTERN.sub('', text.strip())
         return name
     
     
@@ -129,13 +239,16 @@ class Scraper:
         TOPページからステップ1（クイックメニュー）をクリックして
         開催日/場選択ページ（ステップ2）へ遷移する
         """
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        
         driver = self._get_driver()
-        wait = WebDriverWait(driver, 10)
         
         # 1. TOPページ
         print(f"アクセス中: {self.BASE_URL} (モード: {mode})")
-        driver.get(self.BASE_URL)
-        time.sleep(1)
+        with self.timer.measure("TOPページ読み込み"):
+            driver.get(self.BASE_URL)
+        self._wait_until(driver, "クイックメニュー表示", EC.visibility_of_element_located((By.CSS_SELECTOR, "div.inner ul li a")))
 
         # 2. Step 1: クイックメニュー選択
         link_text_keyword = "出馬" if mode == 'prediction' else "レース結果"
@@ -166,7 +279,8 @@ class Scraper:
             if target_link:
                 print(f"クリック(1): {target_link.text}")
                 target_link.click()
-                time.sleep(1)
+                self._wait_until(driver, "開催選択ページ遷移", EC.staleness_of(target_link))
+                self._wait_until(driver, "開催選択ページ表示", EC.presence_of_element_located((By.CSS_SELECTOR, "div#main")))
             else:
                 raise Exception(f"'{link_text_keyword}'リンクが見つかりません")
                 
@@ -187,8 +301,34 @@ class Scraper:
         Returns:
             レース情報のリスト
         """
-        races = []
+        return list(self.iter_active_races(mode=mode, target_date=target_date))
+    
+    def iter_active_races(self, mode: str = 'prediction', target_date: Optional[date] = None) -> Iterator[Race]:
+        """
+        現在アクティブな全てのレース情報を、パースした順に1件ずつ返す
+        
+        開催ごとにレースページを取得・パースして返すため、呼び出し側は巡回の終了を待たずに
+        先に取得できた開催のレースから処理を始められる
+        
+        Args:
+            mode: 'forecast' (予想) or 'retrospective' (回顧)
+            target_date: 特定の日付のみを対象にする場合に指定
+            
+        Yields:
+            レース情報（開催・レースの順）
+        """
+        race_count = 0
+        self.timer.reset()
+        if self.replay:
+            yield from self._iter_replay_races(mode, target_date)
+            return
+        
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        
         print(f"アクティブなレースを取得中... (モード: {mode}, 対象日: {target_date if target_date else '全て'})")
+        if self.html_cache:
+            self._crawl_id = self.html_cache.begin_crawl(mode, target_date)
         
         try:
             # Step 1: メニューページへ遷移
@@ -210,101 +350,436 @@ class Scraper:
                     return elems
 
             print("ステップ2を実行中: 開催日/場リンクを抽出...")
-            elements = get_meeting_links(driver)
-            meeting_count = len([e for e in elements if e.is_displayed()])
+            # 全開催のリンク先（href / doActionのCNAME）を1回の訪問でまとめて取得する
+            targets = self._capture_meeting_targets([e for e in get_meeting_links(driver) if e.is_displayed()])
+            meeting_count = len(targets)
+            if self.journal:
+                self.journal.match_targets([f"{t.label} {t.url or ''}".strip() for t in targets])
             
             print(f"  {meeting_count}件の開催日/場が見つかりました")
             
-            # 各開催日/場ごとループ (インデックスベース)
-            for m_idx in range(meeting_count):
+            # 各開催日/場ごとループ
+            # 開催ごとにレースURLを収集し、その開催のレースページを並行に取得・パースして返す
+            for m_idx, target in enumerate(targets):
                 print(f"  開催 {m_idx+1}/{meeting_count} を巡回中...")
+                meeting = target.label
+                
+                if self.journal and self.journal.is_meeting_done(meeting):
+                    print(f"    チェックポイントから復元: {meeting}")
+                    self._record_crawl_pages(meeting, self.journal.race_urls_for_meeting(meeting))
+                    restored = self.journal.races_for_meeting(meeting)
+                    analyze_races(restored)
+                    for race in restored:
+                        race_count += 1
+                        yield race
+                    continue
                 
                 try:
-                    # 2回目以降、または要素再取得のために再遷移
-                    if m_idx > 0:
-                        driver = self._navigate_to_menu_page(mode=mode)
-                    
-                    # 要素を再取得
-                    elements = get_meeting_links(driver)
+                    # Step 3: レース詳細リンクを全て収集（開催ページへ直接アクセス）
+                    race_links = self._collect_race_links_via_http(target) if self.use_http else []
                     
-                    valid_elements = [e for e in elements if e.is_displayed()]
-                    target_link = None
-                    if m_idx < len(valid_elements):
-                        target_link = valid_elements[m_idx]
+                    if not race_links and target.url:
+                        # ブラウザで開催ページへ直接遷移（doActionと同じくCNAMEをPOST）
+                        try:
+                            driver = self._open_meeting_in_driver(target)
+                            race_links = self._collect_race_links_from_driver(driver)
+                        except Exception as e:
+                            print(f"    開催ページへの直接遷移エラー ({target.url}): {e}")
                     
-                    if not target_link:
-                        print(f"    警告: インデックス {m_idx} のリンクが見つかりませんスキップします")
-                        continue
+                    if not race_links:
+                        # 遷移先が使えない開催のみ、TOPページから辿り直して開催リンクをクリック
+                        print(f"    遷移先が使えないためメニューから辿り直します: {meeting} ({target.url or 'URLなし'})")
+                        driver = self._navigate_to_menu_page(mode=mode)
+                        target_link = next(
+                            (e for e in get_meeting_links(driver) if e.is_displayed() and e.text == meeting),
+                            None
+                        )
+                        if not target_link:
+                            print(f"    警告: '{meeting}' のリンクが見つかりませんスキップします")
+                            continue
                         
-                    print(f"    クリック: {target_link.text}")
-                    target_link.click()
-                    time.sleep(1)
-                    
-                    # Step 3: レース詳細リンクを全て収集
-                    wait = WebDriverWait(driver, 10)
-                    race_links = []
-                    
-                    # レース一覧テーブル(table#race_list) または 出馬表セル(td.syutsuba) からリンクを取得
-                    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "table#race_list, td.syutsuba")))
-                    
-                    # 1. table#race_list (結果一覧など)
-                    elements = driver.find_elements(By.CSS_SELECTOR, "table#race_list tbody th a")
-                    if not elements:
-                        # 2. td.syutsuba (出馬表ページ)
-                        elements = driver.find_elements(By.CSS_SELECTOR, "td.syutsuba a")
+                        print(f"    クリック: {target_link.text}")
+                        target_link.click()
+                        self._wait_until(driver, "開催ページ遷移", EC.staleness_of(target_link))
+                        race_links = self._collect_race_links_from_driver(driver)
                     
-                    race_links = [e.get_attribute('href') for e in elements if e.get_attribute('href')]
-                    
-                    race_links = list(dict.fromkeys(race_links))
                     print(f"    -> {len(race_links)}件のレースが見つかりました")
-                    
-                    # 各レースへアクセス
-                    for r_idx, race_url in enumerate(race_links):
-                        # print(f"      レース {r_idx+1}/{len(race_links)} 処理中")
-                        try:
-                            driver.get(race_url)
-                            time.sleep(1)
-                            
-                            soup = BeautifulSoup(driver.page_source, 'html.parser')
-                            
-                            # 日付指定なしでパース（ページから抽出させる）
-                            dummy_date = date.today() 
-                            
-                            current_races = self._parse_jra_entry_page(soup, dummy_date, race_url)
-                            if not current_races:
-                                current_races = self._parse_jradb_page(soup, dummy_date, race_url)
-                            
-                            if current_races:
-                                races.extend(current_races)
-                            else:
-                                pass # 警告省略
-                                
-                            time.sleep(0.5)
-                        except Exception as e:
-                            print(f"      レース処理エラー: {e}")
-                            continue
+                    self._record_crawl_pages(meeting, race_links)
                             
                 except Exception as e:
                     print(f"  開催処理エラー: {e}")
                     continue
+                
+                # Step 4: この開催のレースページを並行に取得してパース
+                for race in self._iter_meeting_races(meeting, race_links):
+                    race_count += 1
+                    yield race
 
         except Exception as e:
              print(f"全体エラー: {e}")
+        finally:
+            # 途中で打ち切られた（ジェネレーターを閉じられた）場合もブラウザを終了する
+            # ジャーナルは1レコードごとにディスクへ書き出しているので閉じる必要はない
+            if not self.keep_driver:
+                self._close_driver()
 
-        print(f"合計 {len(races)}件のレース情報を取得しました")
-        return races
+        print(f"合計 {race_count}件のレース情報を取得しました")
+        print(self.timer.summary())
 
-    def _parse_jra_entry_page(self, soup: BeautifulSoup, race_date: date, url: str = "") -> List[Race]:
+    def _iter_replay_races(self, mode: str, target_date: Optional[date]) -> Iterator[Race]:
+        """
+        キャッシュに保存した前回の巡回をネットワーク・ブラウザを使わずに再現する
+        
+        Args:
+            mode: スクレイピングのモード
+            target_date: 対象日
+            
+        Yields:
+            レース情報
+        """
+        print(f"キャッシュからレースを再現中... (モード: {mode}, 対象日: {target_date if target_date else '全て'})")
+        meetings = self.html_cache.latest_crawl(mode, target_date)
+        if not meetings:
+            print("  再現できる巡回の記録がありません（先に通常モードで実行してください）")
+            return
+        
+        race_count = 0
+        missing = 0
+        for meeting, race_links in meetings:
+            print(f"  開催: {meeting} ({len(race_links)}レース)")
+            meeting_races = []
+            for race_url in race_links:
+                with self.timer.measure("キャッシュからの再現"):
+                    html = self.html_cache.load(race_url)
+                    if not html:
+                        print(f"      キャッシュにないためスキップします: {race_url[-40:]}")
+                        missing += 1
+                        continue
+                    try:
+                        meeting_races.extend(self._parse_race_html(html, race_url))
+                    except Exception as e:
+                        print(f"      レース処理エラー: {e}")
+                        continue
+            with self.timer.measure("キャッシュからの再現"):
+                analyze_races(meeting_races)
+            # 呼び出し側の処理時間を計測に含めないよう、計測の外で返す
+            for race in meeting_races:
+                race_count += 1
+                yield race
+        
+        print(f"合計 {race_count}件のレース情報を再現しました (キャッシュなし {missing}件)")
+        print(self.timer.summary(title="処理時間の内訳"))
+    
+    def _record_crawl_pages(self, meeting: str, race_links: List[str]) -> None:
+        """巡回で見つかったレースURLをキャッシュの巡回記録に追加"""
+        if self.html_cache and self._crawl_id is not None and race_links:
+            self.html_cache.add_crawl_pages(self._crawl_id, meeting, race_links)
+    
+    def _store_page(self, url: str, html: Optional[str], kind: str) -> None:
+        """取得したページをキャッシュに保存"""
+        if self.html_cache and html:
+            try:
+                self.html_cache.store(url, html, kind=kind)
+            except Exception as e:
+                print(f"      HTMLキャッシュ保存エラー ({url}): {e}")
+
+    def _link_url(self, href: Optional[str], onclick: Optional[str], base_url: str) -> Optional[str]:
+        """
+        リンクの遷移先URLを求める
+        
+        JRAのリンクは doAction('/JRADB/accessD.html', 'pw01...') 形式のonclickで
+        遷移するものが多いため、その場合はCNAMEを付けたJRADBのURLに変換する
+        
+        Args:
+            href: href属性
+            onclick: onclick属性
+            base_url: 相対URLの基準
+            
+        Returns:
+            遷移先URL（求められない場合はNone）
+        """
+        match = self.DO_ACTION_PATTERN.search(onclick or "") or self.DO_ACTION_PATTERN.search(href or "")
+        if match:
+            return f"{urljoin(self.BASE_URL, match.group(1))}?CNAME={match.group(2)}"
+        if href and not href.startswith(("javascript:", "#")) and not href.endswith("#"):
+            return urljoin(base_url, href)
+        return None
+    
+    def _capture_meeting_targets(self, elements) -> List[MeetingTarget]:
+        """
+        開催リンク要素から遷移先を取得
+        
+        Args:
+            elements: 開催リンクのWebElementリスト
+            
+        Returns:
+            開催の遷移先リスト
+        """
+        targets = []
+        for e in elements:
+            url = self._link_url(e.get_attribute('href'), e.get_attribute('onclick'), self.BASE_URL)
+            targets.append(MeetingTarget(label=e.text, url=url))
+        return targets
+    
+    def _collect_race_links_via_http(self, target: MeetingTarget) -> List[str]:
+        """
+        開催ページをHTTPで直接取得してレースURLを収集
+        
+        Args:
+            target: 開催の遷移先
+            
+        Returns:
+            レースURLのリスト（取得できなかった場合は空）
+        """
+        if not target.url:
+            return []
+        
+        with self.timer.measure("開催ページ取得(HTTP)"):
+            html = self.fetcher.fetch(target.url)
+        if not html:
+            return []
+        self._store_page(target.url, html, kind="meeting")
+        
+        # レースへのリンクはテーブル内にしかないので、テーブル部分だけを木にする
+        soup = make_soup(html, self.parser_backend, parse_only=SoupStrainer("table"))
+        # 1. table#race_list (結果一覧など)  2. td.syutsuba (出馬表ページ)
+        anchors = soup.select("table#race_list tbody th a") or soup.select("td.syutsuba a")
+        race_links = [self._link_url(a.get('href'), a.get('onclick'), target.url) for a in anchors]
+        return list(dict.fromkeys(url for url in race_links if url))
+    
+    def _open_meeting_in_driver(self, target: MeetingTarget):
+        """
+        ブラウザで開催ページへ直接遷移
+        
+        JRADBのURL（?CNAME=...）はdoActionと同じくCNAMEをフォームでPOSTし、
+        それ以外のURLはそのまま開く
+        
+        Args:
+            target: 開催の遷移先（urlが必要）
+            
+        Returns:
+            開催ページを表示しているWebDriver
+        """
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        
+        driver = self._get_driver()
+        parsed = urlparse(target.url)
+        cname = parse_qs(parsed.query).get("CNAME", [None])[0]
+        current_page = driver.find_element(By.TAG_NAME, "html")
+        with self.timer.measure("開催ページ読み込み(ブラウザ)"):
+            if "/JRADB/" in parsed.path and cname:
+                driver.execute_script(
+                    """
+                    const form = document.createElement('form');
+                    form.method = 'POST';
+                    form.action = arguments[0];
+                    const input = document.createElement('input');
+                    input.type = 'hidden';
+                    input.name = 'cname';
+                    input.value = arguments[1];
+                    form.appendChild(input);
+                    document.body.appendChild(form);
+                    form.submit();
+                    """,
+                    f"{parsed.scheme}://{parsed.netloc}{parsed.path}", cname
+                )
+            else:
+                driver.get(target.url)
+        self._wait_until(driver, "開催ページ遷移", EC.staleness_of(current_page))
+        return driver
+    
+    def _collect_race_links_from_driver(self, driver) -> List[str]:
+        """
+        ブラウザで表示中の開催ページからレースURLを収集
+        
+        Args:
+            driver: 開催ページを表示しているWebDriver
+            
+        Returns:
+            レースURLのリスト
+        """
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        
+        # レース一覧テーブル(table#race_list) または 出馬表セル(td.syutsuba) からリンクを取得
+        self._wait_until(driver, "レース一覧表示", EC.presence_of_element_located((By.CSS_SELECTOR, "table#race_list, td.syutsuba")))
+        
+        # 1. table#race_list (結果一覧など)
+        elements = driver.find_elements(By.CSS_SELECTOR, "table#race_list tbody th a")
+        if not elements:
+            # 2. td.syutsuba (出馬表ページ)
+            elements = driver.find_elements(By.CSS_SELECTOR, "td.syutsuba a")
+        
+        race_links = [
+            self._link_url(e.get_attribute('href'), e.get_attribute('onclick'), driver.current_url)
+            for e in elements
+        ]
+        return list(dict.fromkeys(url for url in race_links if url))
+    
+    def _iter_meeting_races(self, meeting: str, race_links: List[str], browser_fallback: bool = True) -> Iterator[Race]:
+        """
+        1開催分のレースページをまとめて並行に取得・パースし、開催のラップをまとめて解析してから返す
+        
+        同じホストへの同時リクエスト数はfetcherで制限しているため、開催ごとに取得しても
+        全開催をまとめて取得する場合と取得のスループットは変わらない
+        
+        Args:
+            meeting: 開催の識別名
+            race_links: レースURLのリスト
+            browser_fallback: HTTPで取得できなかったページをブラウザで取得するかどうか
+                （複数の開催を並行に巡回する場合はブラウザを共有できないのでFalse）
+            
+        Yields:
+            レース情報（レースの順序は入力どおり）
+        """
+        pending_urls = [url for url in race_links if not (self.journal and self.journal.has_race(url))]
+        pages = {}
+        if self.use_http and pending_urls:
+            with self.timer.measure("レースページ取得(HTTP一括)"):
+                pages = self.fetcher.fetch_all(pending_urls)
+        
+        meeting_complete = True
+        meeting_races = []
+        for race_url in race_links:
+            if self.journal and self.journal.has_race(race_url):
+                meeting_races.extend(self.journal.races_for(race_url))
+                continue
+            
+            try:
+                html = pages.get(race_url)
+                if not self._is_race_page(html):
+                    if not browser_fallback:
+                        print(f"      レースページを取得できなかったためスキップします: {race_url[-40:]}")
+                        meeting_complete = False
+                        continue
+                    if self.use_http:
+                        print(f"      HTTP取得結果が不完全なためブラウザで取得します: {race_url[-40:]}")
+                    html = self._fetch_race_html(race_url, try_http=False)
+                self._store_page(race_url, html, kind="race")
+                
+                current_races = self._parse_race_html(html, race_url)
+                
+                if self.journal:
+                    self.journal.record_race(meeting, race_url, current_races)
+            except Exception as e:
+                print(f"      レース処理エラー: {e}")
+                meeting_complete = False
+                continue
+            
+            meeting_races.extend(current_races)
+        
+        if self.journal and meeting_complete:
+            self.journal.record_meeting(meeting)
+        
+        # ラップの解析は開催の全レースをまとめて1回だけ行う（ページ・出走馬ごとには計算しない）
+        analyze_races(meeting_races)
+        yield from meeting_races
+    
+    def _parse_race_html(self, html: str, race_url: str, backend: Optional[str] = None) -> List[Race]:
+        """
+        レースページのHTMLをパース
+        
+        Args:
+            html: レースページのHTML
+            race_url: レースページのURL（レース番号の抽出に使う）
+            backend: HTMLパーサーのバックエンド（省略時はスクレイパーの設定）
+            
+        Returns:
+            レース情報のリスト
+        """
+        backend = backend or self.parser_backend
+        # 本文（div#main）だけを木にする。本文が見つからない・テーブルや開催日を含まない構成のページは全体をパースする
+        soup = make_soup(html, backend, parse_only=self.CONTENT_STRAINER)
+        page_text = soup.get_text()
+        if soup.find('table') is not None and self.DATE_PATTERN.search(page_text):
+            # レース名の最終fallbackに使うtitleは本文の外にあるので、木に足しておく
+            title_match = self.TITLE_PATTERN.search(html)
+            if title_match:
+                title = unescape(title_match.group(1)).strip()
+                soup.insert(0, soup.new_tag('title', string=title))
+                page_text = title + page_text
+            races = self._parse_race_soup(soup, race_url, page_text)
+            if races:
+                return races
+        # 本文の外にある要素が必要なページ
+        return self._parse_race_soup(make_soup(html, backend), race_url)
+    
+    def _parse_race_soup(self, soup: BeautifulSoup, race_url: str, page_text: Optional[str] = None) -> List[Race]:
+        """
+        パース済みのレースページからレース情報を抽出（出馬表として読めなければ結果ページとして読む）
+        
+        Args:
+            soup: レースページ
+            race_url: レースページのURL
+            page_text: soup.get_text()の結果（計算済みの場合）
+            
+        Returns:
+            レース情報のリスト
+        """
+        # 日付・開催情報の抽出に使うページ全体のテキストは1回だけ求めて両方のパーサーで共有する
+        if page_text is None:
+            page_text = soup.get_text()
+        
+        # 日付指定なしでパース（ページから抽出させる）
+        dummy_date = date.today() 
+        
+        races = self._parse_jra_entry_page(soup, dummy_date, race_url, page_text=page_text)
+        if not races:
+            races = self._parse_jradb_page(soup, dummy_date, race_url, page_text=page_text)
+        return races
+    
+    def _is_race_page(self, html: Optional[str]) -> bool:
+        """
+        HTTPで取得したHTMLがパースに使えるレースページかどうか
+        
+        出馬表・結果ページは出走馬のテーブルを含む。エラーページや
+        JavaScriptでの描画が必要なページはテーブルを含まないのでSeleniumで取り直す。
+        """
+        return bool(html) and "<table" in html.lower() and "馬名" in html
+    
+    def _fetch_race_html(self, race_url: str, try_http: bool = True) -> str:
+        """
+        レースページのHTMLを取得
+        
+        まずHTTPで直接取得し、使えない場合のみSeleniumで取得する
+        
+        Args:
+            race_url: レースページのURL
+            try_http: HTTPでの取得を試みるかどうか（取得済みで不完全だった場合はFalse）
+            
+        Returns:
+            HTML
+        """
+        if self.use_http and try_http:
+            html = self.fetcher.fetch(race_url)
+            if self._is_race_page(html):
+                return html
+            print(f"      HTTP取得結果が不完全なためブラウザで取得します: {race_url[-40:]}")
+        
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        
+        driver = self._get_driver()
+        with self.timer.measure("レースページ読み込み(ブラウザ)"):
+            driver.get(race_url)
+        self._wait_until(driver, "レース表表示(ブラウザ)", EC.presence_of_element_located((By.CSS_SELECTOR, "table")))
+        return driver.page_source
+    
+    def _parse_jra_entry_page(self, soup: BeautifulSoup, race_date: date, url: str = "", page_text: Optional[str] = None) -> List[Race]:
         """
         JRA出馬表ページをパース（Seleniumまたは通常のHTML）
+        
+        page_textにはsoup.get_text()の結果を渡せる（呼び出し側で計算済みの場合に再計算しない）
         """
         races = []
         
         # 実際の開催日をページから抽出
         actual_date = race_date # デフォルト
         try:
-            page_text = soup.get_text()
-            date_match = re.search(r'(\d{4})年(\d{1,2})月(\d{1,2})日', page_text)
+            if page_text is None:
+                page_text = soup.get_text()
+            date_match = self.DATE_PATTERN.search(page_text)
             if date_match:
                 y = int(date_match.group(1))
                 m = int(date_match.group(2))
@@ -316,43 +791,38 @@ class Scraper:
         
         # レース情報を含むテーブルやセクションを探す
         # JRAサイトの構造に応じて調整が必要
-        
-        # レーステーブルを探す
-        race_tables = soup.find_all('table', class_=re.compile(r'race|entry|shutuba', re.I))
+        # テーブル（class一致のもの・全て）とレース情報を含む可能性のあるdivやsectionを1回の走査で集める
+        race_tables = []
+        all_tables = []
+        race_sections = []
+        for tag in soup.descendants:
+            if not isinstance(tag, Tag):
+                continue
+            if tag.name == 'table':
+                all_tables.append(tag)
+                if self._class_matches(tag.get('class'), self.RACE_TABLE_CLASS):
+                    race_tables.append(tag)
+            elif tag.name in ('div', 'section') and self._class_matches(tag.get('class'), self.RACE_SECTION_CLASS):
+                race_sections.append(tag)
         
         if not race_tables:
             # より広範囲にテーブルを探す
-            race_tables = soup.find_all('table')
+            race_tables = all_tables
             print(f"テーブル要素を{len(race_tables)}件発見")
         
-        # レース情報を含む可能性のあるdivやsectionも探す
-        race_sections = soup.find_all(['div', 'section'], class_=re.compile(r'race|entry', re.I))
-        
         for section in race_sections:
             # レース名を取得
-            race_name_elem = section.find(['h2', 'h3', 'h4', 'span', 'div'], 
-                                         string=re.compile(r'R\d+|第\d+R|レース\d+', re.I))
+            race_name_elem = section.find(['h2', 'h3', 'h4', 'span', 'div'],
+                                         string=self.RACE_TITLE_PATTERN)
             if not race_name_elem:
                 continue
             
             race_name = race_name_elem.get_text(strip=True)
-
-            # レース番号を抽出 (例: "1R" or "第1R")
-            race_num = None
             
+            # レース番号を抽出 (例: "1R" or "第1R")
             # 1. URLから抽出
-            if url:
-                # CNAMEパターン: pw01sde1006202401041120240104 のような形式
-                # 最後の8桁日付(20240104)の直前の2桁(11)がレース番号
-                cname_match = re.search(r'CNAME=.*(\d{2})\d{8}$', url)
-                if cname_match:
-                    race_num = int(cname_match.group(1))
-                
-                if not race_num:
-                    num_match = re.search(r'race_no=(\d+)', url)
-                    if num_match:
-                        race_num = int(num_match.group(1))
-
+            race_num = self._race_number_from_url(url)
+            
             # 2. HTMLから抽出 (URLで見つからない場合)
             if not race_num and race_name_elem:
                 # テキストまたはimgのaltから抽出を試みる
@@ -361,7 +831,7 @@ class Scraper:
                 if img and img.get('alt'):
                     text_to_search += " " + img.get('alt')
                 
-                num_match = re.search(r'(\d+)R', text_to_search)
+                num_match = self.RACE_NUMBER_TEXT_PATTERN.search(text_to_search)
                 if num_match:
                     race_num = int(num_match.group(1))
             
@@ -390,10 +860,13 @@ class Scraper:
             # レース名を含む行を探す
             rows = table.find_all('tr')
             for row in rows:
+                # 行全体のテキストに一致しなければ、どのセルにも一致しない
+                if not self.RACE_CELL_PATTERN.search(row.get_text(strip=True)):
+                    continue
                 cells = row.find_all(['td', 'th'])
                 for cell in cells:
                     text = cell.get_text(strip=True)
-                    if re.search(r'R\d+|第\d+R', text):
+                    if self.RACE_CELL_PATTERN.search(text):
                         # レース情報を抽出
                         race_info = self._extract_race_info_from_row(row, race_date)
                         if race_info:
@@ -412,19 +885,65 @@ class Scraper:
         
         return races
     
+    def _race_number_from_url(self, url: str) -> Optional[int]:
+        """
+        レースページのURLからレース番号を抽出
+        
+        Args:
+            url: レースページのURL
+        
+        Returns:
+            レース番号（抽出できない場合はNone）
+        """
+        race_num = None
+        if url:
+            # CNAMEパターン: pw01sde1006202401041120240104 のような形式
+            # 最後の8桁日付(20240104)の直前の2桁(11)がレース番号
+            cname_match = self.CNAME_RACE_NUMBER_PATTERN.search(url)
+            if cname_match:
+                race_num = int(cname_match.group(1))
+            
+            if not race_num:
+                num_match = self.RACE_NO_PATTERN.search(url)
+                if num_match:
+                    race_num = int(num_match.group(1))
+        return race_num
+    
+    @staticmethod
+    def _class_matches(classes, pattern) -> bool:
+        """
+        class属性をsoup.find(class_=...)と同じ規則で照合
+        
+        各class値のいずれかが一致するか、複数の値を空白で連結した文字列が一致すればTrue
+        
+        Args:
+            classes: tag.get('class') の値
+            pattern: 完全一致させる文字列、または検索する正規表現
+        """
+        if not classes:
+            return False
+        values = [classes] if isinstance(classes, str) else list(classes)
+        if isinstance(pattern, str):
+            matches = lambda value: value == pattern
+        else:
+            matches = lambda value: pattern.search(value) is not None
+        if any(matches(value) for value in values):
+            return True
+        return len(values) != 1 and matches(" ".join(values))
+    
     def _extract_race_info_from_section(self, section, race_date: date) -> dict:
         """セクションからレース情報を抽出"""
         info = {}
         
         # レース名
-        name_elem = section.find(string=re.compile(r'.+'))
+        name_elem = section.find(string=self.NON_EMPTY_PATTERN)
         if name_elem:
             info['name'] = name_elem.strip()
         
         # 距離
-        distance_text = section.find(string=re.compile(r'\d+m|\d+メートル'))
+        distance_text = section.find(string=self.DISTANCE_TEXT_PATTERN)
         if distance_text:
-            distance_match = re.search(r'(\d+)', distance_text)
+            distance_match = self.NUMBER_PATTERN.search(distance_text)
             if distance_match:
                 info['distance'] = int(distance_match.group(1))
         
@@ -445,7 +964,7 @@ class Scraper:
             for cell in cells[1:]:
                 text = cell.get_text(strip=True)
                 # 馬名らしいテキストを探す
-                if len(text) > 1 and not re.match(r'^[\d\s\-\.]+$', text):
+                if len(text) > 1 and not self.NON_NAME_PATTERN.match(text):
                     horse = Horse(name=self._parse_horse_name(text))
                     horses.append(horse)
                     break
@@ -461,7 +980,7 @@ class Scraper:
             text = cell.get_text(strip=True)
             # 距離情報
             if 'm' in text or 'メートル' in text:
-                distance_match = re.search(r'(\d+)', text)
+                distance_match = self.NUMBER_PATTERN.search(text)
                 if distance_match:
                     info['distance'] = int(distance_match.group(1))
         
@@ -498,7 +1017,7 @@ class Scraper:
                 age_elem = jockey_td.find('p', class_='age')
                 if age_elem:
                     age_text = age_elem.get_text(strip=True)
-                    match = re.search(r'([一-龠])(\d+)', age_text)
+                    match = self.GENDER_AGE_PATTERN.search(age_text)
                     if match:
                         gender = match.group(1)
                         age = match.group(2)
@@ -525,21 +1044,26 @@ class Scraper:
         return horses
     
     
-    def _parse_jradb_page(self, soup: BeautifulSoup, race_date: date, url: str = "") -> List[Race]:
+    def _parse_jradb_page(self, soup: BeautifulSoup, race_date: date, url: str = "", page_text: Optional[str] = None) -> List[Race]:
         """
         JRA競馬データベース（結果など）のページをパース
+        
+        page_textにはsoup.get_text()の結果を渡せる（呼び出し側で計算済みの場合に再計算しない）
         """
         races = []
         
-        # テーブルを探す
-        tables = soup.find_all('table')
-        if not tables:
+        # 最初のテーブルがレース結果/出走表と仮定
+        target_table = soup.find('table')
+        if target_table is None:
             return races
-            
+        
+        # ヘッダー領域の要素を1回の走査でまとめて探す
+        header = self._scan_jradb_header(soup)
+        
         # ハロンタイム（ラップタイム）の抽出
         lap_time = None
         try:
-            lap_th = soup.find('th', string=re.compile(r'ハロンタイム'))
+            lap_th = header['lap_time']
             if lap_th:
                 lap_td = lap_th.find_next_sibling('td')
                 if lap_td:
@@ -547,9 +1071,7 @@ class Scraper:
                     print(f"  ラップタイム抽出: {lap_time}")
         except Exception as e:
             print(f"  ラップタイム抽出エラー: {e}")
-
-        # 最初のテーブルがレース結果/出走表と仮定
-        target_table = tables[0]
+        
         horses = []
         
         rows = target_table.find_all('tr')
@@ -567,69 +1089,10 @@ class Scraper:
             current_horse = None
             
             # レース結果(Result): [着順(0), 枠(1), 馬番(2), 馬名(3), 性齢(4), 負担重量(5), 騎手を(6), タイム(7), 着差(8), コーナー(9), 上がり(10), ..., 馬体重(13)]
-            if len(cells) > 10 and re.match(r'^\d+$', cells[0].get_text(strip=True)):
+            position = cells[0].get_text(strip=True) if len(cells) > 10 else None
+            if position is not None and self.POSITION_PATTERN.match(position):
                 # 結果ページ
-                name_raw = cells[3].get_text(strip=True)
-                match = re.match(r'^([^\d\(\[<]+)', name_raw)
-                if match:
-                    name = match.group(1).strip()
-                    name = re.sub(r'[▲△☆★◇]', '', name)
-                    
-                    # 馬体重の抽出 (クラス指定 td.h_weight)
-                    h_weight = None
-                    for cell in cells:
-                        if 'h_weight' in cell.get('class', []):
-                            h_weight = cell.get_text(strip=True)
-                            break
-                    if not h_weight and len(cells) > 13:
-                        h_weight = cells[13].get_text(strip=True)
-
-                    # 性齢 (通常 5列目/index 4)
-                    gender_age_raw = cells[4].get_text(strip=True)
-                    gender = None
-                    age = None
-                    if gender_age_raw:
-                        ga_match = re.match(r'([一-龠])(\d+)', gender_age_raw)
-                        if ga_match:
-                            gender = ga_match.group(1)
-                            age = ga_match.group(2)
-
-                    # 通過順位 (9列目/index 8または9)
-                    # li要素を個別に取得してハイフンで繋ぐ
-                    passing_order_cell = cells[9]
-                    li_elements = passing_order_cell.find_all('li')
-                    if li_elements:
-                        passing_order = "-".join([li.get_text(strip=True) for li in li_elements])
-                    else:
-                        passing_order = passing_order_cell.get_text(strip=True)
-
-                    # 騎手 (7列目/index 6)
-                    jockey_cell = cells[6]
-                    jockey_elem = jockey_cell.find('a')
-                    jockey_name = (jockey_elem.get_text(strip=True) if jockey_elem else jockey_cell.get_text(strip=True)).strip()
-
-                    # 枠番 (2列目/index 1)
-                    waku_cell = cells[1]
-                    waku_img = waku_cell.find('img')
-                    waku_text = waku_img.get('alt') if waku_img else waku_cell.get_text(strip=True)
-                    
-                    # 馬番 (3列目/index 2)
-                    horse_number = cells[2].get_text(strip=True)
-
-                    current_horse = Horse(
-                        name=name,
-                        position=cells[0].get_text(strip=True),
-                        waku=waku_text,
-                        horse_number=horse_number,
-                        gender=gender,
-                        age=age,
-                        jockey=jockey_name,
-                        weight=cells[5].get_text(strip=True),
-                        passing_order=passing_order,
-                        last_3f=cells[10].get_text(strip=True),
-                        finish_time=cells[7].get_text(strip=True) if len(cells) > 7 else None,
-                        horse_weight=h_weight
-                    )
+                current_horse = self._extract_result_horse(cells, position)
             else:
                 # 出馬表 (td.horse セレクタ優先)
                 horse_td = row.find('td', class_='horse')
@@ -647,7 +1110,7 @@ class Scraper:
                                 age_elem = jockey_td.find('p', class_='age')
                                 if age_elem:
                                     age_text = age_elem.get_text(strip=True)
-                                    ga_match = re.search(r'([一-龠])(\d+)', age_text)
+                                    ga_match = self.GENDER_AGE_PATTERN.search(age_text)
                                     if ga_match:
                                         gender = ga_match.group(1)
                                         age = ga_match.group(2)
@@ -659,8 +1122,8 @@ class Scraper:
                                 jockey_elem = jockey_td.find('a')
                                 if jockey_elem:
                                     jockey = jockey_elem.get_text(strip=True)
-                                    jockey = re.sub(r'[▲△☆★◇]', '', jockey).strip()
-
+                                    jockey = self.MARK_PATTERN.sub('', jockey).strip()
+                            
                             current_horse = Horse(
                                 name=name,
                                 gender=gender,
@@ -682,27 +1145,26 @@ class Scraper:
             
             # レース番号・名称要素の受動的特定
             # navigation barを除去するために、特定のヘッダー領域内を優先的に探す
-            race_head = soup.find(class_=re.compile(r'race_header|race_head|race_number|race_data', re.I))
-            r_num_elem = (race_head.find(class_=re.compile(r'num', re.I)) if race_head else None) or \
-                         soup.find(class_=re.compile(r'race.*num|race_number', re.I))
-            r_name_elem = (race_head.find(class_=re.compile(r'name', re.I)) if race_head else None) or \
-                          soup.find(class_=re.compile(r'race.*name|race_title', re.I))
-
+            race_head = header['race_head']
+            r_num_elem = (race_head.find(class_=self.NUM_CLASS) if race_head else None) or header['race_num']
+            r_name_elem = (race_head.find(class_=self.NAME_CLASS) if race_head else None) or header['race_name']
+            
             # 実際の開催日をページから抽出
             actual_date = race_date # デフォルト
             kaisai_number = None
             kaisai_day = None
             try:
-                page_text = soup.get_text()
-                date_match = re.search(r'(\d{4})年(\d{1,2})月(\d{1,2})日', page_text)
+                if page_text is None:
+                    page_text = soup.get_text()
+                date_match = self.DATE_PATTERN.search(page_text)
                 if date_match:
                     y = int(date_match.group(1))
                     m = int(date_match.group(2))
                     d = int(date_match.group(3))
                     actual_date = date(y, m, d)
-
+                
                 # 開催情報: 「n回{競馬場名}m日」から抽出 (例: 1回中山1日)
-                kaisai_match = re.search(r'(\d+)回([一-龠]{2,3})(\d+)日', page_text)
+                kaisai_match = self.KAISAI_PATTERN.search(page_text)
                 if kaisai_match:
                     kaisai_number = kaisai_match.group(1)
                     venue = kaisai_match.group(2)
@@ -711,11 +1173,11 @@ class Scraper:
                 venue_id = self.VENUE_ID_MAP.get(venue)
                 
                 # コース・距離 (div class="course" or div class="cell course")
-                course_elem = soup.find(class_="course")
+                course_elem = header['course']
                 if course_elem:
                     course_text = course_elem.get_text(strip=True)
                     # 距離の抽出 (カンマを除去)
-                    dist_match = re.search(r'([\d,]+)(?=メートル|m)', course_text)
+                    dist_match = self.DISTANCE_PATTERN.search(course_text)
                     if dist_match:
                         distance = int(dist_match.group(1).replace(',', ''))
                     
@@ -731,7 +1193,7 @@ class Scraper:
                             track_type = 'ダート'
                 
                 # 馬場状態 (div class="baba" > li:nth-child(2) > span.txt)
-                baba_div = soup.find(class_="baba")
+                baba_div = header['baba']
                 if baba_div:
                     li_list = baba_div.find_all('li')
                     if len(li_list) >= 2:
@@ -743,25 +1205,13 @@ class Scraper:
                         txt_elem = li_list[0].find(class_="txt")
                         if txt_elem:
                             track_condition = txt_elem.get_text(strip=True)
-                
+            
             except Exception as e:
                 print(f"  レース詳細抽出エラー: {e}")
-
-            # レース番号を抽出
-            race_num = None
             
+            # レース番号を抽出
             # 1. URLから抽出
-            if url:
-                # CNAMEパターン: pw01sde1006202401041120240104 のような形式
-                # 最後の8桁日付(20240104)の直前の2桁(11)がレース番号
-                cname_match = re.search(r'CNAME=.*(\d{2})\d{8}$', url)
-                if cname_match:
-                    race_num = int(cname_match.group(1))
-                
-                if not race_num:
-                    num_match = re.search(r'race_no=(\d+)', url)
-                    if num_match:
-                        race_num = int(num_match.group(1))
+            race_num = self._race_number_from_url(url)
             
             # 2. HTMLから抽出 (URLで見つからない場合)
             if not race_num and r_num_elem:
@@ -770,20 +1220,20 @@ class Scraper:
                 if img and img.get('alt'):
                     num_text += " " + img.get('alt')
                 
-                num_match = re.search(r'(\d+)', num_text)
+                num_match = self.NUMBER_PATTERN.search(num_text)
                 if num_match:
                     race_num = int(num_match.group(1))
-
+            
             # 名称の決定
             if r_name_elem:
                 race_name = r_name_elem.get_text(strip=True).replace("JRA", "").strip()
             
             # fallback: div.name や div.cell.name を探す
             if race_name == "レース詳細不明":
-                name_div = soup.find(['div', 'span'], class_=re.compile(r'^(cell\s+)?name$', re.I))
+                name_div = header['name_div']
                 if name_div:
                     race_name = name_div.get_text(strip=True).replace("JRA", "").strip()
-
+            
             if race_name == "レース詳細不明" and r_num_elem:
                 race_name = f"{r_num_elem.get_text(strip=True)}レース"
             
@@ -792,9 +1242,9 @@ class Scraper:
                  title = soup.title.string if soup.title else ""
                  if title:
                      race_name = title.split('|')[0].replace('JRA', '').replace('結果', '').strip()
-
+            
             print(f"  抽出結果(URL: {url[-30:] if url else 'none'}): レース名='{race_name}', R={race_num}, 会場='{venue}'")
-
+            
             race = Race(
                 name=race_name,
                 date=actual_date,
@@ -810,9 +1260,128 @@ class Scraper:
                 venue_id=venue_id
             )
             races.append(race)
-            
+        
         return races
     
+    def _scan_jradb_header(self, soup: BeautifulSoup) -> dict:
+        """
+        JRADBページのヘッダー要素を1回の走査でまとめて探す
+        
+        各項目はsoup.findと同じく文書順で最初に一致した要素（見つからない場合はNone）
+        
+        Returns:
+            race_head / race_num / race_name / course / baba / name_div / lap_time → 要素
+        """
+        # (項目, 対象タグ名（Noneは全て）, classの条件)
+        rules = (
+            ('race_head', None, self.RACE_HEAD_CLASS),
+            ('race_num', None, self.RACE_NUM_CLASS),
+            ('race_name', None, self.RACE_NAME_CLASS),
+            ('course', None, "course"),
+            ('baba', None, "baba"),
+            ('name_div', ('div', 'span'), self.NAME_DIV_CLASS),
+        )
+        found = {key: None for key, _, _ in rules}
+        found['lap_time'] = None
+        remaining = len(found)
+        
+        for tag in soup.descendants:
+            if not isinstance(tag, Tag):
+                continue
+            
+            # ハロンタイムの見出し (th の文字列で判定)
+            if found['lap_time'] is None and tag.name == 'th':
+                text = tag.string
+                if text is not None and self.LAP_TIME_PATTERN.search(text):
+                    found['lap_time'] = tag
+                    remaining -= 1
+            
+            classes = tag.get('class')
+            if classes:
+                for key, names, pattern in rules:
+                    if found[key] is None and (names is None or tag.name in names) and self._class_matches(classes, pattern):
+                        found[key] = tag
+                        remaining -= 1
+            
+            if remaining == 0:
+                break
+        
+        return found
+    
+    def _extract_result_horse(self, cells, position: str) -> Optional[Horse]:
+        """
+        結果ページの1行から出走馬の成績を抽出
+        
+        Args:
+            cells: 行のtd/th要素のリスト
+            position: 着順（cells[0]のテキスト）
+        
+        Returns:
+            出走馬情報（馬名が取れない場合はNone）
+        """
+        name_raw = cells[3].get_text(strip=True)
+        match = self.RESULT_NAME_PATTERN.match(name_raw)
+        if not match:
+            return None
+        name = match.group(1).strip()
+        name = self.MARK_PATTERN.sub('', name)
+        
+        # 馬体重の抽出 (クラス指定 td.h_weight)
+        h_weight = None
+        for cell in cells:
+            if 'h_weight' in cell.get('class', []):
+                h_weight = cell.get_text(strip=True)
+                break
+        if not h_weight and len(cells) > 13:
+            h_weight = cells[13].get_text(strip=True)
+        
+        # 性齢 (通常 5列目/index 4)
+        gender_age_raw = cells[4].get_text(strip=True)
+        gender = None
+        age = None
+        if gender_age_raw:
+            ga_match = self.GENDER_AGE_PATTERN.match(gender_age_raw)
+            if ga_match:
+                gender = ga_match.group(1)
+                age = ga_match.group(2)
+        
+        # 通過順位 (9列目/index 8または9)
+        # li要素を個別に取得してハイフンで繋ぐ
+        passing_order_cell = cells[9]
+        li_elements = passing_order_cell.find_all('li')
+        if li_elements:
+            passing_order = "-".join([li.get_text(strip=True) for li in li_elements])
+        else:
+            passing_order = passing_order_cell.get_text(strip=True)
+        
+        # 騎手 (7列目/index 6)
+        jockey_cell = cells[6]
+        jockey_elem = jockey_cell.find('a')
+        jockey_name = (jockey_elem.get_text(strip=True) if jockey_elem else jockey_cell.get_text(strip=True)).strip()
+        
+        # 枠番 (2列目/index 1)
+        waku_cell = cells[1]
+        waku_img = waku_cell.find('img')
+        waku_text = waku_img.get('alt') if waku_img else waku_cell.get_text(strip=True)
+        
+        # 馬番 (3列目/index 2)
+        horse_number = cells[2].get_text(strip=True)
+        
+        return Horse(
+            name=name,
+            position=position,
+            waku=waku_text,
+            horse_number=horse_number,
+            gender=gender,
+            age=age,
+            jockey=jockey_name,
+            weight=cells[5].get_text(strip=True),
+            passing_order=passing_order,
+            last_3f=cells[10].get_text(strip=True),
+            finish_time=cells[7].get_text(strip=True) if len(cells) > 7 else None,
+            horse_weight=h_weight
+        )
+    
     def _parse_race_entries_alternative(self, soup: BeautifulSoup, race_date: date) -> List[Race]:
         """
         代替パース方法（より柔軟な抽出）
@@ -848,27 +1417,168 @@ class Scraper:
         
         return races
     
-    def get_races_for_week(self, week_start: date) -> List[Race]:
+    def get_races_between(self, start: date, end: date) -> List[Race]:
         """
-        指定週の全レース情報を取得（回顧用）
+        指定期間の全レース結果を過去のレース結果から取得（回顧用）
         
         Args:
-            week_start: 週の開始日
+            start: 期間の開始日
+            end: 期間の終了日（この日を含む）
             
         Returns:
             レース情報のリスト
         """
-        races = []
-        current_date = week_start
+        return list(self.iter_races_between(start, end))
+    
+    def iter_races_between(self, start: date, end: date) -> Iterator[Race]:
+        """
+        指定期間の全レース結果を過去のレース結果（JRADB）から取得し、開催日順に1件ずつ返す
+        
+        期間内の開催をBACKFILL_MEETING_CONCURRENCY件ずつ並行に巡回し、巡回が終わった開催から
+        開催日順に返す。リクエストはBACKFILL_REQUEST_DELAY秒間隔・ホストごとの同時実行数の上限を守る。
         
-        # 1週間分のレース情報を取得
-        for i in range(7):
-            date_to_check = current_date + timedelta(days=i)
-            day_races = self.get_race_entries(date_to_check)
-            races.extend(day_races)
+        Args:
+            start: 期間の開始日
+            end: 期間の終了日（この日を含む）
             
-            # レート制限を考慮して少し待機
-            time.sleep(0.5)
+        Yields:
+            レース情報（開催日・開催・レースの順）
+        """
+        crawl_mode = f"backfill:{start.isoformat()}:{end.isoformat()}"
+        self.timer.reset()
+        if self.replay:
+            yield from self._iter_replay_races(crawl_mode, None)
+            return
         
-        return races
-
+        print(f"過去のレース結果を取得中... (期間: {start} 〜 {end})")
+        if self.html_cache:
+            self._crawl_id = self.html_cache.begin_crawl(crawl_mode, None)
+        
+        default_delay = self.fetcher.delay
+        self.fetcher.delay = max(default_delay, Config.BACKFILL_REQUEST_DELAY)
+        race_count = 0
+        try:
+            targets = self._list_archive_meetings(start, end)
+            print(f"  {len(targets)}件の開催日/場が見つかりました")
+            
+            concurrency = max(1, Config.BACKFILL_MEETING_CONCURRENCY)
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="meeting") as executor:
+                # 先行して巡回する開催はconcurrency件まで（返し終えた開催の分だけ次を始める）
+                remaining = iter(targets)
+                running = deque()
+                for target in remaining:
+                    running.append((target, executor.submit(self._crawl_archive_meeting, target)))
+                    if len(running) >= concurrency:
+                        break
+                
+                while running:
+                    target, future = running.popleft()
+                    races = future.result()
+                    next_target = next(remaining, None)
+                    if next_target:
+                        running.append((next_target, executor.submit(self._crawl_archive_meeting, next_target)))
+                    print(f"  開催を巡回しました: {target.label} ({len(races)}レース)")
+                    for race in races:
+                        race_count += 1
+                        yield race
+        finally:
+            self.fetcher.delay = default_delay
+        
+        print(f"合計 {race_count}件のレース情報を取得しました")
+        print(self.timer.summary(title="処理時間の内訳"))
+    
+    def _archive_links(self, html: str, base_url: str) -> List[Tuple[str, str, str]]:
+        """
+        JRADBのページからdoActionのリンクを取得
+        
+        Args:
+            html: HTML
+            base_url: 相対URLの基準
+            
+        Returns:
+            (CNAME, 遷移先URL, リンクテキスト)のリスト
+        """
+        links = []
+        for a in make_soup(html, self.parser_backend).find_all('a'):
+            match = self.DO_ACTION_PATTERN.search(a.get('onclick') or "") or self.DO_ACTION_PATTERN.search(a.get('href') or "")
+            if match:
+                url = self._link_url(a.get('href'), a.get('onclick'), base_url)
+                links.append((match.group(2), url, self._parse_horse_name(a.get_text())))
+        return links
+    
+    def _list_archive_meetings(self, start: date, end: date) -> List[MeetingTarget]:
+        """
+        過去のレース結果の月ごとの開催一覧を辿り、期間内の開催を列挙
+        
+        月選択ページから期間内の月の開催一覧へ進み（各月のページにある前後の月へのリンクも辿る）、
+        開催日が期間内の開催を集める
+        
+        Args:
+            start: 期間の開始日
+            end: 期間の終了日
+            
+        Returns:
+            開催の遷移先リスト（開催日順）
+        """
+        first_month = (start.year, start.month)
+        last_month = (end.year, end.month)
+        month_urls = {}
+        pending = [f"{Config.JRADB_ARCHIVE_URL}?CNAME={Config.JRADB_ARCHIVE_CNAME}"]
+        visited = set()
+        targets = {}
+        
+        while pending:
+            url = pending.pop()
+            if url in visited:
+                continue
+            visited.add(url)
+            with self.timer.measure("開催一覧取得(HTTP)"):
+                html = self.fetcher.fetch(url)
+            if not html:
+                continue
+            self._store_page(url, html, kind="archive")
+            
+            for cname, link_url, text in self._archive_links(html, url):
+                month = self.ARCHIVE_MONTH_CNAME_PATTERN.match(cname)
+                if month:
+                    key = (int(month.group(1)), int(month.group(2)))
+                    if first_month <= key <= last_month and key not in month_urls:
+                        month_urls[key] = link_url
+                        pending.append(link_url)
+                    continue
+                
+                meeting = self.ARCHIVE_MEETING_CNAME_PATTERN.match(cname)
+                if meeting:
+                    race_date = date(int(meeting.group(1)), int(meeting.group(2)), int(meeting.group(3)))
+                    if start <= race_date <= end and link_url not in targets:
+                        # 同じ開催名（例: 1回中山1日）は年が違えば別の開催なので開催日を付けて区別する
+                        targets[link_url] = MeetingTarget(label=f"{race_date.isoformat()} {text}", url=link_url, race_date=race_date)
+        
+        if not month_urls:
+            print(f"  警告: 過去のレース結果の月選択ページから期間内の月が見つかりませんでした（JRADB_ARCHIVE_CNAMEを確認してください）")
+        return sorted(targets.values(), key=lambda t: (t.race_date, t.label))
+    
+    def _crawl_archive_meeting(self, target: MeetingTarget) -> List[Race]:
+        """
+        過去の1開催分のレース一覧・レースページを取得してパース（ワーカースレッドで実行）
+        
+        Args:
+            target: 開催の遷移先
+            
+        Returns:
+            レース情報のリスト
+        """
+        meeting = target.label
+        if self.journal and self.journal.is_meeting_done(meeting):
+            self._record_crawl_pages(meeting, self.journal.race_urls_for_meeting(meeting))
+            restored = self.journal.races_for_meeting(meeting)
+            analyze_races(restored)
+            return restored
+        
+        try:
+            race_links = self._collect_race_links_via_http(target)
+            self._record_crawl_pages(meeting, race_links)
+            return list(self._iter_meeting_races(meeting, race_links, browser_fallback=False))
+        except Exception as e:
+            print(f"  開催処理エラー ({meeting}): {e}")
+            return []
@@ -0,0 +1,311 @@
+"""ブラウザを起動したまま待機するスクレイパーデーモン
+
+CLIを実行するたびにChromeの起動・TOPページの読み込みからやり直すのを避けるため、
+Scraper（ブラウザとHTTPセッション）を常駐させ、ローカルのUnixドメインソケットで
+スクレイピングの依頼を受け付ける。デーモンが起動していれば src/main.py は自動的に依頼する。
+
+プロトコル（1接続1依頼、1行1件のJSON）:
+    → {"action": "scrape", "mode": "prediction", "target_date": "2025-01-18", "resume": false}
+    ← {"ok": true, "race": race_to_dictの結果}    （パースできた順に1件ずつ）
+    ← {"ok": true, "done": true, "count": 36, "elapsed": 12.3}
+    → {"action": "ping"}      ← {"ok": true, "jobs": 3, "busy": false}
+    → {"action": "shutdown"}  ← {"ok": true}
+
+起動:
+    python -m src.scraper_daemon             # 前面で起動（Ctrl+Cで停止）
+    python -m src.scraper_daemon --stop      # 起動中のデーモンを停止
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from datetime import date
+from typing import Optional, Iterator, List, Dict, Any
+
+from src.config import Config
+from src.crawl_journal import CrawlJournal
+from src.html_cache import HtmlCache
+from src.models import Race, race_to_dict, race_from_dict
+
+
+class ScraperDaemonError(Exception):
+    """デーモンとの通信・デーモン側の処理の失敗"""
+
+
+def _responses(socket_path: str, message: Dict[str, Any], timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """
+    デーモンに1件の依頼を送り、応答を1行ずつ受け取る
+
+    Args:
+        socket_path: デーモンのソケットのパス
+        message: 依頼内容
+        timeout: 1行ごとの応答待ちの上限（秒、Noneは無制限）
+
+    Yields:
+        応答
+
+    Raises:
+        OSError: 接続できない場合
+        ScraperDaemonError: デーモンがエラーを返した場合
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as reader:
+            for line in reader:
+                response = json.loads(line)
+                if not response.get("ok"):
+                    raise ScraperDaemonError(response.get("error", "不明なエラー"))
+                yield response
+
+
+def _request(socket_path: str, message: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    デーモンに1件の依頼を送り、1行の応答を受け取る
+
+    Args:
+        socket_path: デーモンのソケットのパス
+        message: 依頼内容
+        timeout: 応答待ちの上限（秒、Noneは無制限）
+
+    Returns:
+        応答
+    """
+    for response in _responses(socket_path, message, timeout):
+        return response
+    raise ScraperDaemonError("デーモンから応答がありません")
+
+
+def is_daemon_running(socket_path: Optional[str] = None) -> bool:
+    """
+    デーモンが起動していて応答するかどうか
+
+    Args:
+        socket_path: ソケットのパス（省略時は設定値）
+    """
+    socket_path = socket_path or Config.SCRAPER_DAEMON_SOCKET
+    if not os.path.exists(socket_path):
+        return False
+    try:
+        _request(socket_path, {"action": "ping"}, timeout=1.0)
+        return True
+    except (OSError, ValueError, ScraperDaemonError):
+        return False
+
+
+class DaemonScraper:
+    """
+    スクレイピングをデーモンに依頼するクライアント
+
+    get_active_races / iter_active_racesだけを持ち、ユースケースからはScraperと同じように使える
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, resume: bool = False):
+        """
+        初期化
+
+        Args:
+            socket_path: デーモンのソケットのパス（省略時は設定値）
+            resume: デーモン側でチェックポイントから再開させるかどうか
+        """
+        self.socket_path = socket_path or Config.SCRAPER_DAEMON_SOCKET
+        self.resume = resume
+
+    def get_active_races(self, mode: str = 'prediction', target_date: Optional[date] = None) -> List[Race]:
+        """
+        デーモンにスクレイピングを依頼してレース情報を取得
+
+        Args:
+            mode: 'prediction' (予想) or 'retrospective' (回顧)
+            target_date: 特定の日付のみを対象にする場合に指定
+
+        Returns:
+            レース情報のリスト
+        """
+        return list(self.iter_active_races(mode=mode, target_date=target_date))
+
+    def iter_active_races(self, mode: str = 'prediction', target_date: Optional[date] = None) -> Iterator[Race]:
+        """
+        デーモンにスクレイピングを依頼し、デーモンがパースした順にレース情報を受け取る
+
+        Args:
+            mode: 'prediction' (予想) or 'retrospective' (回顧)
+            target_date: 特定の日付のみを対象にする場合に指定
+
+        Yields:
+            レース情報
+        """
+        print(f"スクレイパーデーモンに依頼します: {self.socket_path} (モード: {mode}, 対象日: {target_date if target_date else '全て'})")
+        for response in _responses(self.socket_path, {
+            "action": "scrape",
+            "mode": mode,
+            "target_date": target_date.isoformat() if target_date else None,
+            "resume": self.resume,
+        }):
+            if response.get("done"):
+                print(f"デーモンから {response['count']}件のレース情報を受け取りました ({response['elapsed']:.1f}秒)")
+                return
+            yield race_from_dict(response["race"])
+        raise ScraperDaemonError("デーモンとの接続が途中で切れました")
+
+
+class ScraperDaemon:
+    """
+    Scraperを常駐させて依頼を順に処理するデーモン
+
+    ブラウザは1つなので、スクレイピングは同時に1件ずつ処理する（ping・shutdownは処理中でも応答する）
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, headless: bool = True):
+        """
+        初期化
+
+        Args:
+            socket_path: 待ち受けるソケットのパス（省略時は設定値）
+            headless: ヘッドレスモードでブラウザを起動するかどうか
+        """
+        from src.scraper import Scraper
+
+        self.socket_path = socket_path or Config.SCRAPER_DAEMON_SOCKET
+        if is_daemon_running(self.socket_path):
+            raise ScraperDaemonError(f"デーモンは既に起動しています: {self.socket_path}")
+        if os.path.exists(self.socket_path):
+            # 前回異常終了したときに残ったソケット
+            os.remove(self.socket_path)
+        directory = os.path.dirname(self.socket_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.scraper = Scraper(headless=headless, html_cache=HtmlCache(Config.HTML_CACHE_DIR), keep_driver=True)
+        self.jobs = 0
+        self._job_lock = threading.Lock()
+        self._server = socketserver.ThreadingUnixStreamServer(self.socket_path, self._handler_class())
+        self._server.daemon_threads = True
+
+    def _handler_class(self):
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def write(self, response: Dict[str, Any]) -> None:
+                self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                self.wfile.flush()
+
+            def handle(self):
+                responses = None
+                try:
+                    responses = daemon.dispatch(json.loads(self.rfile.readline()))
+                    for response in responses:
+                        self.write(response)
+                except (BrokenPipeError, ConnectionResetError):
+                    # 依頼元が途中で終了した（ジョブはcloseで打ち切られる）
+                    pass
+                except Exception as e:
+                    try:
+                        self.write({"ok": False, "error": f"{type(e).__name__}: {e}"})
+                    except OSError:
+                        # 依頼元が切断済みなら返答は捨てる
+                        pass
+                finally:
+                    if responses is not None:
+                        responses.close()
+
+        return Handler
+
+    def dispatch(self, message: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        依頼を処理
+
+        Args:
+            message: 依頼内容
+
+        Yields:
+            応答（scrapeはレースごとに1件と最後の完了通知、それ以外は1件）
+        """
+        action = message.get("action")
+        if action == "ping":
+            yield {"ok": True, "jobs": self.jobs, "busy": self._job_lock.locked()}
+        elif action == "shutdown":
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+            yield {"ok": True}
+        elif action == "scrape":
+            yield from self._scrape(message)
+        else:
+            yield {"ok": False, "error": f"不明な依頼です: {action}"}
+
+    def _scrape(self, message: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        mode = message.get("mode")
+        if mode not in ("prediction", "retrospective"):
+            yield {"ok": False, "error": f"不明なモードです: {mode}"}
+            return
+        target_date = date.fromisoformat(message["target_date"]) if message.get("target_date") else None
+
+        with self._job_lock:
+            started = time.perf_counter()
+            self.scraper.journal = CrawlJournal(
+                os.path.join(Config.CACHE_DIR, f"crawl_journal_{mode}.jsonl"),
+                mode=mode,
+                target_date=target_date,
+                resume=bool(message.get("resume"))
+            )
+            count = 0
+            try:
+                for race in self.scraper.iter_active_races(mode=mode, target_date=target_date):
+                    count += 1
+                    yield {"ok": True, "race": race_to_dict(race)}
+            except Exception:
+                # ブラウザの状態が壊れている可能性があるため、次の依頼で起動し直す
+                self.scraper._close_driver()
+                raise
+            self.jobs += 1
+            yield {"ok": True, "done": True, "count": count, "elapsed": time.perf_counter() - started}
+
+    def serve_forever(self) -> None:
+        """停止されるまで依頼を待ち受ける"""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            self.scraper._close_driver()
+
+
+def main():
+    """単体で起動"""
+    parser = argparse.ArgumentParser(description="ブラウザを起動したまま待機するスクレイパーデーモン")
+    parser.add_argument("--socket", default=None, help="待ち受けるソケットのパス（省略時は SCRAPER_DAEMON_SOCKET）")
+    parser.add_argument("--show-browser", action="store_true", help="ブラウザを画面に表示する")
+    parser.add_argument("--stop", action="store_true", help="起動中のデーモンを停止する")
+    args = parser.parse_args()
+
+    socket_path = args.socket or Config.SCRAPER_DAEMON_SOCKET
+    if args.stop:
+        if not is_daemon_running(socket_path):
+            print(f"デーモンは起動していません: {socket_path}")
+            return 1
+        _request(socket_path, {"action": "shutdown"}, timeout=5.0)
+        print("デーモンを停止しました")
+        return 0
+
+    try:
+        daemon = ScraperDaemon(socket_path, headless=not args.show_browser)
+    except ScraperDaemonError as e:
+        print(f"エラー: {e}")
+        return 1
+    print(f"スクレイパーデーモンを起動しました: {socket_path}")
+    print("  src/main.py は起動中のデーモンに自動的にスクレイピングを依頼します（--no-daemon で無効化）")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(f"デーモンを終了しました（処理した依頼 {daemon.jobs}件）")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
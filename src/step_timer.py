@@ -0,0 +1,69 @@
+"""処理ステップごとの待機時間計測モジュール"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Iterator
+
+
+class StepTimer:
+    """ステップ名ごとに所要時間を記録し、集計結果を表示する"""
+
+    def __init__(self):
+        """初期化"""
+        self._lock = threading.Lock()
+        self._durations: Dict[str, List[float]] = {}
+
+    def record(self, step: str, seconds: float) -> None:
+        """
+        所要時間を記録
+
+        Args:
+            step: ステップ名
+            seconds: 所要時間（秒）
+        """
+        with self._lock:
+            self._durations.setdefault(step, []).append(seconds)
+
+    @contextmanager
+    def measure(self, step: str) -> Iterator[None]:
+        """
+        withブロックの所要時間を記録
+
+        Args:
+            step: ステップ名
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(step, time.perf_counter() - started)
+
+    def reset(self) -> None:
+        """記録を消去"""
+        with self._lock:
+            self._durations.clear()
+
+    def summary(self, title: str = "待機時間の内訳") -> str:
+        """
+        ステップごとの回数・合計・平均・最大の一覧
+
+        Args:
+            title: 見出し
+
+        Returns:
+            表示用の文字列
+        """
+        with self._lock:
+            items = sorted(self._durations.items(), key=lambda kv: sum(kv[1]), reverse=True)
+        if not items:
+            return f"{title}: 記録なし"
+
+        lines = [f"{title}:"]
+        for step, durations in items:
+            total = sum(durations)
+            lines.append(
+                f"  {step}: {len(durations)}回, 合計 {total:.2f}秒, "
+                f"平均 {total / len(durations):.2f}秒, 最大 {max(durations):.2f}秒"
+            )
+        return "\n".join(lines)
@@ -1,26 +1,37 @@
 """予想モードの実装"""
 
+import asyncio
 from datetime import date
-from typing import List
+from typing import TYPE_CHECKING, Union, Optional
 
-from src.models import Race, Horse
+from src.config import Config
+from src.models import Race
 from src.notion_client import NotionClient
-from src.scraper import Scraper
+from src.async_notion_client import AsyncNotionClient
+from src.race_stream import RaceStream
+
+if TYPE_CHECKING:
+    from src.scraper import Scraper
+    from src.warehouse import RaceWarehouse
 
 
 class PredictionUseCase:
     """予想モードのユースケース"""
     
-    def __init__(self, notion_client: NotionClient, scraper: Scraper):
+    def __init__(self, notion_client: Union[NotionClient, AsyncNotionClient], scraper: "Scraper", warehouse: Optional["RaceWarehouse"] = None):
         """
         初期化
         
         Args:
-            notion_client: Notion APIクライアント
+            notion_client: Notion APIクライアント（AsyncNotionClientの場合は並行処理する）
             scraper: スクレイパー
+            warehouse: レース結果の保存先（指定した場合、出馬表をParquetに保存する）
         """
         self.notion_client = notion_client
         self.scraper = scraper
+        self.warehouse = warehouse
+        self.race_count = 0
+        self.horse_count = 0
     
     def execute(self, race_date: date) -> None:
         """
@@ -31,36 +42,111 @@ class PredictionUseCase:
         """
         print(f"予想モード: アクティブな出馬票を処理します (基準日: {race_date})")
         
-        # 全出馬票を取得
+        # 出馬票の取得（別スレッド）と並行して、取得できたレースから順にNotionへ書き込む
+        self.race_count = 0
+        self.horse_count = 0
+        races = RaceStream(self.scraper.iter_active_races(mode='prediction', target_date=race_date))
         try:
-            races = self.scraper.get_active_races(mode='prediction', target_date=race_date)
+            if isinstance(self.notion_client, AsyncNotionClient):
+                asyncio.run(self._process_races_concurrently(races))
+            else:
+                self._process_races(races)
         except NotImplementedError:
             print("エラー: 出馬票取得機能が未実装です")
             return
+        finally:
+            races.close()
+            if self.warehouse:
+                try:
+                    self.warehouse.flush()
+                except Exception as e:
+                    # 処理中の例外を上書きしないよう、保存の失敗は表示だけにする
+                    print(f"レース情報の保存エラー: {e}")
         
-        if not races:
+        if not self.race_count:
             print("該当するレースが見つかりませんでした")
             return
         
-        print(f"{len(races)}件のレースが見つかりました")
+        print(f"\n処理完了: {self.race_count}件のレースを処理しました")
+        print(self.notion_client.planner.report(
+            int(self.notion_client.transport.stats["calls"]),
+            self.race_count,
+            self.horse_count
+        ))
+    
+    def _count(self, race: Race) -> None:
+        """処理したレース・出走馬の数を記録（レース結果の保存先があれば保存する）"""
+        self.race_count += 1
+        self.horse_count += len(race.horses)
+        if self.warehouse:
+            try:
+                self.warehouse.add(race, 'prediction')
+            except Exception as e:
+                # 保存に失敗してもNotionへの書き込みは続ける
+                print(f"レース情報の保存エラー: {e}")
+    
+    def _process_races(self, races: RaceStream) -> None:
+        """
+        レースを順番に処理
         
-        # 各レースについて処理
-        for race in races:
-            print(f"\n処理中: {race.date} {race.venue} {race.name}")
-            
-            # 1. 各出走馬について馬ページを先に検索（メンション作成のため）
-            print(f"  出走馬数: {len(race.horses)}頭")
-            for horse in race.horses:
-                horse_page_id = self.notion_client.find_horse_page(horse.name)
-                horse.notion_page_id = horse_page_id
-            
-            # 2. レースページを作成（ここで出走馬リストも冒頭に追加される）
-            race_page_id = self.notion_client.find_or_create_race_page(race)
-            if not race_page_id:
-                print(f"  エラー: レースページの作成に失敗しました")
-                continue
+        Args:
+            races: レース情報のストリーム
+        """
+        # 開催日ごとに出走馬が一括検索1回分（NOTION_FILTER_BATCH頭）になるまでレースをまとめ、馬ページをまとめて検索する
+        for batch in races.batches():
+            # 1. 出走馬の馬ページをまとめて検索（メンション作成のため）
+            horses = [horse for race in batch for horse in race.horses]
+            print(f"\n馬ページを一括検索中: {len(batch)}レース / {len(horses)}頭")
+            self.notion_client.resolve_horse_pages(horses)
             
-            race.notion_page_id = race_page_id
-            print(f"  レースページを処理しました")
+            for race in batch:
+                self._count(race)
+                print(f"\n処理中: {race.date} {race.venue} {race.name}")
+                print(f"  出走馬数: {len(race.horses)}頭")
+                
+                # 2. レースページを作成（ここで出走馬リストも冒頭に追加される）
+                race_page_id = self.notion_client.find_or_create_race_page(race)
+                if not race_page_id:
+                    print(f"  エラー: レースページの作成に失敗しました")
+                    continue
+                
+                race.notion_page_id = race_page_id
+                print(f"  レースページを処理しました")
+    
+    async def _process_races_concurrently(self, races: RaceStream) -> None:
+        """
+        レースを並行に処理
+        
+        取得できたレースから順に処理を始め、取得の終了を待たない。
+        出走馬の馬ページは、同じ開催日のレースを一括検索1回分（NOTION_FILTER_BATCH頭）まで
+        まとめてから検索する
+        
+        Args:
+            races: レース情報のストリーム
+        """
+        async def process_race(race: Race) -> None:
+            # レースページを作成（ここで出走馬リストも冒頭に追加される）
+            race.notion_page_id = await self.notion_client.find_or_create_race_page(race)
+            if race.notion_page_id:
+                print(f"レースページを処理しました: {race.date} {race.venue} {race.name} ({len(race.horses)}頭)")
+            else:
+                print(f"エラー: レースページの作成に失敗しました: {race.date} {race.venue} {race.name}")
+        
+        # 処理中のレースが上限に達したら空くまで次を受け取らない（その間はスクレイピング側も待つ）
+        in_flight = asyncio.Semaphore(Config.RACE_QUEUE_SIZE)
+        tasks = set()
+        
+        def finish(task: asyncio.Task) -> None:
+            tasks.discard(task)
+            in_flight.release()
         
-        print(f"\n処理完了: {len(races)}件のレースを処理しました")
+        async for batch in races.abatches():
+            # 出走馬の馬ページをまとめて検索（メンション作成のため）
+            await self.notion_client.resolve_horse_pages([horse for race in batch for horse in race.horses])
+            for race in batch:
+                self._count(race)
+                await in_flight.acquire()
+                task = asyncio.create_task(process_race(race))
+                tasks.add(task)
+                task.add_done_callback(finish)
+        await asyncio.gather(*tasks)
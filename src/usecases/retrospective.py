@@ -1,53 +1,121 @@
 """回顧モードの実装"""
 
+import asyncio
 from datetime import date, timedelta
-from typing import List
+from typing import TYPE_CHECKING, Iterable, List, Dict, Union, Optional
 
+from src.config import Config
 from src.models import Race, Horse, RaceResult
 from src.notion_client import NotionClient
-from src.scraper import Scraper
+from src.async_notion_client import AsyncNotionClient
+from src.ledger import ResultLedger
+from src.race_stream import RaceStream
+
+if TYPE_CHECKING:
+    from src.scraper import Scraper
+    from src.warehouse import RaceWarehouse
 
 
 class RetrospectiveUseCase:
     """回顧モードのユースケース"""
     
-    def __init__(self, notion_client: NotionClient, scraper: Scraper):
+    def __init__(self, notion_client: Union[NotionClient, AsyncNotionClient], scraper: "Scraper", ledger: Optional[ResultLedger] = None,
+                 warehouse: Optional["RaceWarehouse"] = None):
         """
         初期化
         
         Args:
-            notion_client: Notion APIクライアント
+            notion_client: Notion APIクライアント（AsyncNotionClientの場合は並行処理する）
             scraper: スクレイパー
+            ledger: 処理済み台帳（指定した場合、書き込み済みの出走履歴はスキップする）
+            warehouse: レース結果の保存先（指定した場合、取得した全項目をParquetに保存する）
         """
         self.notion_client = notion_client
         self.scraper = scraper
+        self.ledger = ledger
+        self.warehouse = warehouse
+        self.skipped_count = 0
+        self.race_count = 0
+        self.horse_count = 0
     
-    def execute(self, week_start: date) -> None:
+    def execute(self, start: Optional[date] = None, end: Optional[date] = None) -> None:
         """
         回顧処理を実行
         
         Args:
-            week_start: 対象週の開始日（ログ出力用、スクレイピングには影響なし）
+            start: 対象期間の開始日（省略時はJRAサイトに現在表示されている全てのレース）
+            end: 対象期間の終了日（この日を含む、省略時は開始日から1週間）
         """
-        print(f"回顧モード: アクティブな全てのレースを処理します (週基準: {week_start})")
+        if start:
+            end = end or start + timedelta(days=6)
+            print(f"回顧モード: 過去のレース結果を処理します (期間: {start} 〜 {end})")
+            source = self.scraper.iter_races_between(start, end)
+        else:
+            print("回顧モード: アクティブな全てのレースを処理します")
+            source = self.scraper.iter_active_races(mode='retrospective')
         
-        # 全レース情報を取得
+        # レース情報の取得（別スレッド）と並行して、取得できたレースから順にNotionへ書き込む
+        self.skipped_count = 0
+        self.race_count = 0
+        self.horse_count = 0
+        races = RaceStream(source)
         try:
-            races = self.scraper.get_active_races(mode='retrospective')
+            if isinstance(self.notion_client, AsyncNotionClient):
+                asyncio.run(self._process_races_concurrently(races))
+            else:
+                self._process_races(races)
         except NotImplementedError:
             print("エラー: 出馬票取得機能が未実装です")
             return
+        finally:
+            races.close()
+            if self.warehouse:
+                try:
+                    self.warehouse.flush()
+                except Exception as e:
+                    # 処理中の例外を上書きしないよう、保存の失敗は表示だけにする
+                    print(f"レース情報の保存エラー: {e}")
         
-        if not races:
+        if not self.race_count:
             print("該当するレースが見つかりませんでした")
             return
         
-        print(f"{len(races)}件のレースが見つかりました")
+        print(f"\n処理完了: {self.race_count}件のレースを処理しました")
+        if self.skipped_count:
+            print(f"  処理済み台帳により {self.skipped_count}件の出走履歴をスキップしました")
+        print(self.notion_client.planner.report(
+            int(self.notion_client.transport.stats["calls"]),
+            self.race_count,
+            self.horse_count
+        ))
+    
+    def _count(self, race: Race) -> None:
+        """処理したレース・出走馬の数を記録（レース結果の保存先があれば保存する）"""
+        self.race_count += 1
+        self.horse_count += len(race.horses)
+        if self.warehouse:
+            try:
+                self.warehouse.add(race, 'retrospective')
+            except Exception as e:
+                # 保存に失敗してもNotionへの書き込みは続ける
+                print(f"レース情報の保存エラー: {e}")
+    
+    def _process_races(self, races: Iterable[Race]) -> None:
+        """
+        レースを1件ずつ順番に処理
         
-        # 各レースについて処理
+        Args:
+            races: レース情報（取得できた順）
+        """
         for race in races:
+            self._count(race)
             print(f"\n処理中: {race.date} {race.venue} {race.name}")
             
+            horses = self._pending_horses(race)
+            if not horses:
+                print(f"  全出走馬が処理済みのためスキップします")
+                continue
+            
             # レースページを作成（既に存在する場合は取得）
             race_page_id = self.notion_client.find_or_create_race_page(race)
             if not race_page_id:
@@ -57,58 +125,164 @@ class RetrospectiveUseCase:
             race.notion_page_id = race_page_id
             
             # 各出走馬について処理
-            for horse in race.horses:
+            for horse in horses:
                 print(f"  馬: {horse.name}")
                 
                 # 馬ページを検索または作成
-                horse_page_id = self.notion_client.find_or_create_horse_page(horse.name)
+                horse_page_id = self.notion_client.find_or_create_horse_page(horse.name, horse.horse_id)
                 if not horse_page_id:
                     print(f"    エラー: 馬ページの作成に失敗しました")
                     continue
                 
                 horse.notion_page_id = horse_page_id
                 
-                # レース結果情報を作成
-                # 文字列から数値への変換を試みる
-                pos = None
-                try:
-                    pos_str = horse.position
-                    if pos_str and pos_str.isdigit():
-                        pos = int(pos_str)
-                except:
-                    pass
-                
-                wgt = None
-                try:
-                    wgt_str = horse.weight
-                    if wgt_str:
-                        wgt = float(wgt_str)
-                except:
-                    pass
-
-                race_result = RaceResult(
-                    race=race,
-                    horse=horse,
-                    position=pos,
-                    jockey=horse.jockey,
-                    weight=wgt,
-                    passing_order=horse.passing_order,
-                    last_3f=horse.last_3f,
-                    finish_time=horse.finish_time,
-                    horse_weight=horse.horse_weight,
-                    waku=horse.waku,
-                    horse_number=horse.horse_number
-                )
-                
                 # 馬ページに出走履歴を追加
                 success = self.notion_client.add_race_history_to_horse_page(
-                    horse_page_id, race_result
+                    horse_page_id, self._build_race_result(race, horse)
                 )
                 
                 if success:
+                    self._record(race, horse)
                     print(f"    出走履歴を追加しました")
                 else:
                     print(f"    エラー: 出走履歴の追加に失敗しました")
+    
+    async def _process_races_concurrently(self, races: RaceStream) -> None:
+        """
+        レースと馬を並行に処理
+        
+        取得できたレースから順に、レースページの用意と出走馬ごとの出走履歴の追記を始める。
+        異なる馬は並行に処理し、同じ馬のページへの追記はレースを受け取った順になる
+        （スクレイパーは開催日順に返すので、複数週をまとめて処理しても日付順に追記される）。
+        
+        Args:
+            races: レース情報のストリーム
+        """
+        async def prepare_race(race: Race) -> None:
+            race.notion_page_id = await self.notion_client.find_or_create_race_page(race)
+            if race.notion_page_id:
+                print(f"レースページを処理しました: {race.date} {race.venue} {race.name}")
+            else:
+                print(f"エラー: レースページの作成に失敗しました: {race.date} {race.venue} {race.name}")
+        
+        async def process_horse(race: Race, horse: Horse, race_ready: asyncio.Task, previous: Optional[asyncio.Task]) -> None:
+            # 同じ馬の前のレースの追記が終わってから追記する（失敗していても順番だけは守る）
+            if previous:
+                await asyncio.wait([previous])
+            await race_ready
+            if not race.notion_page_id:
+                return
+            
+            horse_page_id = await self.notion_client.find_or_create_horse_page(horse.name, horse.horse_id)
+            if not horse_page_id:
+                print(f"  エラー: 馬ページの作成に失敗しました: {horse.name}")
+                return
+            
+            horse.notion_page_id = horse_page_id
+            success = await self.notion_client.add_race_history_to_horse_page(
+                horse_page_id, self._build_race_result(race, horse)
+            )
+            if success:
+                self._record(race, horse)
+                print(f"  出走履歴を追加しました: {horse.name} ({race.date} {race.venue} {race.name})")
+            else:
+                print(f"  エラー: 出走履歴の追加に失敗しました: {horse.name} ({race.date} {race.venue} {race.name})")
         
-        print(f"\n処理完了: {len(races)}件のレースを処理しました")
+        # 処理中のレースが上限に達したら空くまで次を受け取らない（その間はスクレイピング側も待つ）
+        in_flight = asyncio.Semaphore(Config.RACE_QUEUE_SIZE)
+        last_entry: Dict[str, asyncio.Task] = {}
+        tasks = set()
+        
+        def finish(task: asyncio.Task) -> None:
+            tasks.discard(task)
+            in_flight.release()
+        
+        def forget(horse_name: str, task: asyncio.Task) -> None:
+            # 追記が終わった馬は待ち合わせの対象から外す（処理済みのレースを保持し続けない）
+            if last_entry.get(horse_name) is task:
+                del last_entry[horse_name]
+        
+        async for race in races:
+            self._count(race)
+            horses = self._pending_horses(race)
+            if not horses:
+                continue
+            
+            await in_flight.acquire()
+            race_ready = asyncio.create_task(prepare_race(race))
+            horse_tasks = []
+            for horse in horses:
+                task = asyncio.create_task(process_horse(race, horse, race_ready, last_entry.get(horse.name)))
+                last_entry[horse.name] = task
+                task.add_done_callback(lambda done, name=horse.name: forget(name, done))
+                horse_tasks.append(task)
+            
+            task = asyncio.ensure_future(asyncio.gather(race_ready, *horse_tasks))
+            tasks.add(task)
+            task.add_done_callback(finish)
+        
+        await asyncio.gather(*tasks)
+    
+    def _pending_horses(self, race: Race) -> List[Horse]:
+        """
+        出走履歴が未書き込みの出走馬を取得
+        
+        Args:
+            race: レース情報
+            
+        Returns:
+            台帳に記録されていない出走馬のリスト
+        """
+        if not self.ledger:
+            return list(race.horses)
+        
+        horses = [horse for horse in race.horses if not self.ledger.is_recorded(race, horse.name)]
+        self.skipped_count += len(race.horses) - len(horses)
+        return horses
+    
+    def _record(self, race: Race, horse: Horse) -> None:
+        """出走履歴を書き込んだことを台帳に記録"""
+        if self.ledger:
+            self.ledger.record(race, horse.name, horse.notion_page_id)
+    
+    def _build_race_result(self, race: Race, horse: Horse) -> RaceResult:
+        """
+        スクレイピング結果からレース結果情報を作成
+        
+        Args:
+            race: レース情報
+            horse: 出走馬情報
+            
+        Returns:
+            レース結果情報
+        """
+        # 文字列から数値への変換を試みる
+        pos = None
+        try:
+            pos_str = horse.position
+            if pos_str and pos_str.isdigit():
+                pos = int(pos_str)
+        except:
+            pass
+        
+        wgt = None
+        try:
+            wgt_str = horse.weight
+            if wgt_str:
+                wgt = float(wgt_str)
+        except:
+            pass
 
+        return RaceResult(
+            race=race,
+            horse=horse,
+            position=pos,
+            jockey=horse.jockey,
+            weight=wgt,
+            passing_order=horse.passing_order,
+            last_3f=horse.last_3f,
+            finish_time=horse.finish_time,
+            horse_weight=horse.horse_weight,
+            waku=horse.waku,
+            horse_number=horse.horse_number
+        )
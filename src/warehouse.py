@@ -0,0 +1,309 @@
+"""レース結果のローカル列指向ストア（Parquet）
+
+スクレイピングした全項目（タイム・上がり3F・通過順位・馬体重・ラップ・馬場状態など）を
+出走馬1頭につき1行として、開催日・競馬場で分割したParquetファイルに保存する。
+
+    .cache/warehouse/race_date=2024-01-06/venue=中山/data.parquet
+
+パーティションごとにレース単位で上書きする（同じレースを再取得した場合は置き換える）ため、
+何度実行しても行は重複しない。pyarrowは任意の依存で、未インストールの場合は保存しない。
+"""
+
+import os
+import re
+import threading
+import time
+from datetime import date
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+
+from src.models import Race
+from src.pace import race_pace
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - 任意の依存
+    pa = None
+
+
+FINISH_TIME_PATTERN = re.compile(r'^(?:(\d+):)?(\d+(?:\.\d+)?)$')
+HORSE_WEIGHT_PATTERN = re.compile(r'^(\d+)(?:\(([+-]?\d+)\))?')
+NUMBER_PATTERN = re.compile(r'\d+(?:\.\d+)?')
+
+
+def is_available() -> bool:
+    """pyarrowがインストールされているかどうか"""
+    return pa is not None
+
+
+def parse_seconds(text: Optional[str]) -> Optional[float]:
+    """'1:34.5' や '34.5' を秒に変換"""
+    match = FINISH_TIME_PATTERN.match((text or "").strip())
+    if not match:
+        return None
+    return int(match.group(1) or 0) * 60 + float(match.group(2))
+
+
+def parse_number(text: Optional[str]) -> Optional[float]:
+    """'57.0kg' や '1枠' から最初の数値を取り出す"""
+    match = NUMBER_PATTERN.search(text or "")
+    return float(match.group(0)) if match else None
+
+
+def parse_int(text: Optional[str]) -> Optional[int]:
+    """数字だけの文字列を整数に変換（'取消' などはNone）"""
+    text = (text or "").strip()
+    return int(text) if text.isdigit() else None
+
+
+def parse_horse_weight(text: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """'480(+4)' を (480, 4) に変換"""
+    match = HORSE_WEIGHT_PATTERN.match((text or "").strip())
+    if not match:
+        return None, None
+    return int(match.group(1)), int(match.group(2)) if match.group(2) else None
+
+
+def _schema():
+    return pa.schema([
+        ("race_date", pa.date32()),
+        ("venue", pa.string()),
+        ("race_number", pa.int8()),
+        ("race_name", pa.string()),
+        ("distance", pa.int16()),
+        ("track_type", pa.string()),
+        ("track_condition", pa.string()),
+        ("grade", pa.string()),
+        ("condition", pa.string()),
+        ("kaisai_number", pa.int8()),
+        ("kaisai_day", pa.int8()),
+        ("lap_time", pa.string()),
+        ("first_3f", pa.float64()),
+        ("race_last_3f", pa.float64()),
+        ("pace", pa.string()),
+        ("horse_name", pa.string()),
+        ("horse_id", pa.string()),
+        ("gender", pa.string()),
+        ("age", pa.int8()),
+        ("position", pa.int8()),
+        ("position_text", pa.string()),
+        ("waku", pa.int8()),
+        ("horse_number", pa.int8()),
+        ("jockey", pa.string()),
+        ("weight", pa.float64()),
+        ("odds", pa.float64()),
+        ("passing_order", pa.string()),
+        ("last_3f", pa.float64()),
+        ("finish_time", pa.float64()),
+        ("finish_time_text", pa.string()),
+        ("horse_weight", pa.int16()),
+        ("horse_weight_diff", pa.int16()),
+        ("source", pa.string()),
+        ("scraped_at", pa.timestamp("s")),
+    ])
+
+
+def race_rows(race: Race, source: str, scraped_at: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    レース情報を出走馬1頭1行の型付きの行に変換
+
+    Args:
+        race: レース情報
+        source: 取得元のモード（'prediction' / 'retrospective'）
+        scraped_at: 取得時刻（UNIX時間、省略時は現在）
+
+    Returns:
+        行のリスト（出走馬がいない場合は空）
+    """
+    scraped_at = int(scraped_at or time.time())
+    pace = race_pace(race)
+    rows = []
+    for horse in race.horses:
+        horse_weight, horse_weight_diff = parse_horse_weight(horse.horse_weight)
+        waku = parse_number(horse.waku)
+        rows.append({
+            "race_date": race.date,
+            "venue": race.venue,
+            "race_number": race.race_number,
+            "race_name": race.name,
+            "distance": race.distance or None,
+            "track_type": race.track_type,
+            "track_condition": race.track_condition,
+            "grade": race.grade,
+            "condition": race.condition,
+            "kaisai_number": parse_int(race.kaisai_number),
+            "kaisai_day": parse_int(race.kaisai_day),
+            "lap_time": race.lap_time,
+            "first_3f": pace.first_3f if pace else None,
+            "race_last_3f": pace.last_3f if pace else None,
+            "pace": pace.pace if pace else None,
+            "horse_name": horse.name,
+            "horse_id": horse.horse_id,
+            "gender": horse.gender,
+            "age": parse_int(horse.age),
+            "position": parse_int(horse.position),
+            "position_text": horse.position,
+            "waku": int(waku) if waku is not None else None,
+            "horse_number": parse_int(horse.horse_number),
+            "jockey": horse.jockey,
+            "weight": parse_number(horse.weight),
+            "odds": parse_number(horse.odds),
+            "passing_order": horse.passing_order,
+            "last_3f": parse_seconds(horse.last_3f),
+            "finish_time": parse_seconds(horse.finish_time),
+            "finish_time_text": horse.finish_time,
+            "horse_weight": horse_weight,
+            "horse_weight_diff": horse_weight_diff,
+            "source": source,
+            "scraped_at": scraped_at,
+        })
+    return rows
+
+
+def _race_keys(table) -> List[Tuple[Any, ...]]:
+    """行ごとのレースの識別キー（レース番号がない出馬表のレースはレース名で識別する）"""
+    numbers = table.column("race_number").to_pylist()
+    names = table.column("race_name").to_pylist()
+    return [("number", number) if number is not None else ("name", name) for number, name in zip(numbers, names)]
+
+
+class RaceWarehouse:
+    """
+    レース結果をParquetに追記・参照する
+
+    add() で受け取ったレースは開催日・競馬場ごとにまとめておき、別の開催日・競馬場の
+    レースを受け取ったときと flush() で書き出す。
+    """
+
+    # 結果（retrospective）を出馬表（prediction）で上書きしない
+    SOURCE_PRIORITY = {"prediction": 0, "retrospective": 1}
+
+    def __init__(self, directory: str):
+        """
+        初期化
+
+        Args:
+            directory: 保存先ディレクトリ
+        """
+        if pa is None:
+            raise ImportError("レース結果の保存には pyarrow が必要です（pip install pyarrow）")
+        self.directory = directory
+        self.schema = _schema()
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[date, str], List[Dict[str, Any]]] = {}
+        self.written_rows = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _partition_path(self, race_date: date, venue: str) -> str:
+        return os.path.join(self.directory, f"race_date={race_date.isoformat()}", f"venue={venue}", "data.parquet")
+
+    def add(self, race: Race, source: str) -> None:
+        """
+        レースを保存対象に加える
+
+        Args:
+            race: レース情報
+            source: 取得元のモード（'prediction' / 'retrospective'）
+        """
+        rows = race_rows(race, source)
+        if not rows:
+            return
+        key = (race.date, race.venue)
+        with self._lock:
+            stale = [k for k in self._pending if k != key]
+            self._pending.setdefault(key, []).extend(rows)
+        # 前の開催日・競馬場は受け取り終わっているので書き出す
+        for k in stale:
+            self._flush_partition(k)
+
+    def flush(self) -> None:
+        """保存対象のレースを全て書き出す"""
+        with self._lock:
+            keys = list(self._pending)
+        for key in keys:
+            self._flush_partition(key)
+
+    def _flush_partition(self, key: Tuple[date, str]) -> None:
+        with self._lock:
+            rows = self._pending.pop(key, None)
+        if not rows:
+            return
+
+        new_table = pa.Table.from_pylist(rows, schema=self.schema)
+        path = self._partition_path(*key)
+        if os.path.exists(path):
+            # 列を追加する前に書いたファイルは、足りない列をNoneとして読む
+            existing = ds.dataset(path, schema=self.schema, format="parquet").to_table()
+            # 同じレースは新しい方で置き換える（ただし結果を出馬表で上書きしない）
+            new_keys = _race_keys(new_table)
+            existing_keys = _race_keys(existing)
+            priorities: Dict[Tuple[Any, ...], int] = {}
+            for race_key, row in zip(new_keys, rows):
+                priorities[race_key] = max(priorities.get(race_key, 0), self.SOURCE_PRIORITY.get(row["source"], 0))
+            replaced = set(new_keys)
+            kept_races = {
+                race_key for race_key, src in zip(existing_keys, existing.column("source").to_pylist())
+                if race_key in replaced and self.SOURCE_PRIORITY.get(src, 0) > priorities[race_key]
+            }
+            if kept_races:
+                new_table = new_table.filter(pa.array([race_key not in kept_races for race_key in new_keys], pa.bool_()))
+                replaced -= kept_races
+            existing = existing.filter(pa.array([race_key not in replaced for race_key in existing_keys], pa.bool_()))
+            written = len(new_table)
+            new_table = pa.concat_tables([existing, new_table])
+        else:
+            written = len(new_table)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 書き込み途中のファイルを読まないよう、データセットが無視する "." 始まりの名前に書いてから置き換える
+        tmp_path = os.path.join(os.path.dirname(path), ".data.parquet.tmp")
+        new_table = new_table.sort_by([("race_number", "ascending"), ("horse_number", "ascending")])
+        pq.write_table(new_table, tmp_path, compression="zstd")
+        os.replace(tmp_path, path)
+        self.written_rows += written
+
+    def dataset(self):
+        """開催日・競馬場で分割したデータセット（pyarrow.dataset）"""
+        return ds.dataset(
+            self.directory,
+            schema=self.schema,
+            format="parquet",
+            partitioning=ds.partitioning(
+                pa.schema([("race_date", pa.date32()), ("venue", pa.string())]), flavor="hive"
+            ),
+            exclude_invalid_files=False,
+        )
+
+    def read(self, start: Optional[date] = None, end: Optional[date] = None, venue: Optional[str] = None,
+             horse_name: Optional[str] = None, columns: Optional[Iterable[str]] = None):
+        """
+        条件に合う行を読み込む（開催日・競馬場の条件に合わないファイルは読まない）
+
+        Args:
+            start: 開催日の下限
+            end: 開催日の上限（この日を含む）
+            venue: 競馬場
+            horse_name: 馬名
+            columns: 読み込む列（省略時は全列）
+
+        Returns:
+            pyarrow.Table
+        """
+        conditions = []
+        if start:
+            conditions.append(ds.field("race_date") >= pa.scalar(start, pa.date32()))
+        if end:
+            conditions.append(ds.field("race_date") <= pa.scalar(end, pa.date32()))
+        if venue:
+            conditions.append(ds.field("venue") == venue)
+        if horse_name:
+            conditions.append(ds.field("horse_name") == horse_name)
+
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        table = self.dataset().to_table(columns=list(columns) if columns else None, filter=expression)
+        if "race_date" in table.column_names:
+            table = table.sort_by([("race_date", "ascending")])
+        return table
@@ -0,0 +1,201 @@
+"""Notion書き込み計画モジュール"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Optional, Dict, List, Any
+
+
+PAST_RACES_HEADING = "過去レース"
+
+
+@dataclass
+class PageStructure:
+    """馬ページのブロック構造（見出し2の位置と「過去レース」セクションの末尾）"""
+    sections: Dict[str, str] = field(default_factory=dict)  # 見出し2のテキスト → ブロックID
+    past_races_id: Optional[str] = None  # 「過去レース」見出しのブロックID
+    last_block_id: Optional[str] = None  # 「過去レース」セクションの最後のブロックID
+    section_is_last: bool = True  # 「過去レース」がページ最後のセクションかどうか
+
+    @property
+    def insert_after(self) -> Optional[str]:
+        """
+        出走履歴を追記する位置（このブロックの直後）
+
+        「過去レース」が最後のセクションならページ末尾に追記すればよいのでNone
+        """
+        return None if self.section_is_last else self.last_block_id
+
+    @classmethod
+    def from_blocks(cls, blocks: List[Dict[str, Any]]) -> Optional["PageStructure"]:
+        """
+        ページ直下の全ブロックから構造を作成
+
+        Args:
+            blocks: ページ直下のブロック（ページネーションを辿った全件）
+
+        Returns:
+            構造（「過去レース」見出しがない場合はNone）
+        """
+        structure = cls()
+        in_section = False
+        for block in blocks:
+            if block.get("type") == "heading_2":
+                text = "".join(t.get("plain_text", "") for t in block["heading_2"].get("rich_text", []))
+                structure.sections.setdefault(text, block["id"])
+                if structure.past_races_id is None and PAST_RACES_HEADING in text:
+                    structure.past_races_id = block["id"]
+                    in_section = True
+                elif in_section:
+                    # 「過去レース」の後に別のセクションがある
+                    in_section = False
+                    structure.section_is_last = False
+            if in_section:
+                structure.last_block_id = block["id"]
+        return structure if structure.past_races_id else None
+
+
+class WritePlanner:
+    """
+    Notionへの書き込みを計画し、不要なAPI呼び出しを省くための状態を保持する
+
+    - ページ作成時に初期ブロックを作成リクエストに含める
+    - タイトルが変わらない場合はページ更新を省く
+    - 馬ページのブロック構造（PageStructure）を実行中保持し、追記のたびの子ブロックの一覧取得を省く
+
+    省いた呼び出しを種類ごとに数え、計画なしの場合との比較を報告する
+    """
+
+    def __init__(self):
+        """初期化"""
+        self._lock = threading.Lock()
+        self._titles: Dict[str, str] = {}
+        self._structures: Dict[str, PageStructure] = {}
+        self.saved: Dict[str, int] = {
+            "folded_children": 0,   # 作成リクエストに含めた初期ブロック追加
+            "skipped_update": 0,    # タイトルが同じため省いたページ更新
+            "skipped_list": 0       # 見出し確認のための一覧取得
+        }
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.saved[key] += 1
+
+    def record_title(self, page_id: str, title: Optional[str]) -> None:
+        """
+        ページの現在のタイトルを記録
+
+        Args:
+            page_id: ページID
+            title: タイトル（不明な場合はNone）
+        """
+        if page_id and title is not None:
+            with self._lock:
+                self._titles[page_id] = title
+
+    def should_update_title(self, page_id: str, title: str) -> bool:
+        """
+        タイトル更新が必要かどうか
+
+        Args:
+            page_id: ページID
+            title: 設定したいタイトル
+
+        Returns:
+            現在のタイトルが不明、または異なる場合True
+        """
+        with self._lock:
+            current = self._titles.get(page_id)
+        if current is not None and current == title:
+            self._count("skipped_update")
+            return False
+        return True
+
+    def fold_children(self) -> None:
+        """初期ブロックを作成リクエストに含めたことを記録"""
+        self._count("folded_children")
+
+    def mark_past_races_section(self, page_id: str) -> None:
+        """
+        「過去レース」見出しで終わるページとして記録（作成したばかりの馬ページ）
+
+        Args:
+            page_id: ページID
+        """
+        self.record_structure(page_id, PageStructure())
+
+    def record_structure(self, page_id: str, structure: PageStructure) -> None:
+        """
+        ページのブロック構造を記録
+
+        Args:
+            page_id: ページID
+            structure: ブロック構造
+        """
+        with self._lock:
+            self._structures[page_id] = structure
+
+    def structure(self, page_id: str) -> Optional[PageStructure]:
+        """
+        記録済みのページのブロック構造
+
+        Args:
+            page_id: ページID
+
+        Returns:
+            構造（未記録ならNone。記録済みの場合は一覧取得を省いたものとして数える）
+        """
+        with self._lock:
+            structure = self._structures.get(page_id)
+        if structure:
+            self._count("skipped_list")
+        return structure
+
+    def record_append(self, page_id: str, last_block_id: str) -> None:
+        """
+        「過去レース」セクションに追記したことを記録（次の追記はこのブロックの直後）
+
+        Args:
+            page_id: ページID
+            last_block_id: 追記した最後のブロックID
+        """
+        with self._lock:
+            structure = self._structures.get(page_id)
+            if structure:
+                structure.last_block_id = last_block_id
+
+    def forget_structure(self, page_id: str) -> None:
+        """ページのブロック構造を破棄（次の追記で読み直す）"""
+        with self._lock:
+            self._structures.pop(page_id, None)
+
+    def forget_page(self, page_id: str) -> None:
+        """無効になったページの情報を破棄"""
+        with self._lock:
+            self._titles.pop(page_id, None)
+            self._structures.pop(page_id, None)
+
+    def report(self, api_calls: int, race_count: int, horse_count: int) -> str:
+        """
+        計画なしの場合と比較したAPI呼び出し数の報告
+
+        Args:
+            api_calls: 実際のAPI呼び出し数
+            race_count: 処理したレース数
+            horse_count: 処理した出走（馬×レース）数
+
+        Returns:
+            報告文字列
+        """
+        saved = sum(self.saved.values())
+        before = api_calls + saved
+        lines = [
+            f"API呼び出し数: 計画なし {before}回 → 計画あり {api_calls}回 "
+            f"(作成時に初期ブロックを同梱 {self.saved['folded_children']}件, "
+            f"タイトル更新省略 {self.saved['skipped_update']}件, "
+            f"見出し確認省略 {self.saved['skipped_list']}件)"
+        ]
+        if race_count:
+            lines.append(f"  レースあたり: {before / race_count:.1f}回 → {api_calls / race_count:.1f}回")
+        if horse_count:
+            lines.append(f"  出走あたり: {before / horse_count:.1f}回 → {api_calls / horse_count:.1f}回")
+        return "\n".join(lines)
@@ -0,0 +1,56 @@
+"""CrawlJournalのテスト"""
+
+import json
+import sys
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.crawl_journal import CrawlJournal
+
+
+def test_resume_keeps_same_targets(tmp_path):
+    """同じ開催一覧なら記録済みの開催から再開する"""
+    path = str(tmp_path / "journal.jsonl")
+    journal = CrawlJournal(path, mode="retrospective")
+    journal.match_targets(["1回中山1日", "1回京都1日"])
+    journal.record_race("1回中山1日", "race-1", [])
+    journal.record_meeting("1回中山1日")
+
+    resumed = CrawlJournal(path, mode="retrospective", resume=True)
+    resumed.match_targets(["1回中山1日", "1回京都1日"])
+
+    assert resumed.is_meeting_done("1回中山1日")
+    assert resumed.has_race("race-1")
+
+
+def test_resume_discards_other_targets(tmp_path):
+    """開催一覧が異なる記録（先週の巡回など）からは再開しない"""
+    path = str(tmp_path / "journal.jsonl")
+    journal = CrawlJournal(path, mode="retrospective")
+    journal.match_targets(["1回中山1日"])
+    journal.record_race("1回中山1日", "race-1", [])
+    journal.record_meeting("1回中山1日")
+
+    resumed = CrawlJournal(path, mode="retrospective", resume=True)
+    resumed.match_targets(["1回中山3日"])
+
+    assert not resumed.is_meeting_done("1回中山1日")
+    assert not resumed.has_race("race-1")
+
+
+def test_resume_discards_other_week(tmp_path):
+    """対象日のない巡回は、別の週の記録から再開しない"""
+    path = tmp_path / "journal.jsonl"
+    journal = CrawlJournal(str(path), mode="retrospective")
+    journal.record_meeting("1回中山1日")
+    lines = path.read_text(encoding="utf-8").splitlines()
+    header = json.loads(lines[0])
+    header["week"] = "2000-W01"
+    path.write_text("\n".join([json.dumps(header)] + lines[1:]) + "\n", encoding="utf-8")
+
+    resumed = CrawlJournal(str(path), mode="retrospective", resume=True)
+
+    assert not resumed.is_meeting_done("1回中山1日")
@@ -0,0 +1,37 @@
+"""HorseIndexのテスト"""
+
+import sys
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.horse_index import HorseIndex
+
+
+def _page(page_id: str, name: str) -> dict:
+    return {"id": page_id, "properties": {"馬名": {"title": [{"plain_text": name}]}}}
+
+
+def test_load_keeps_first_page_for_duplicate_names():
+    """同名の馬ページが複数あれば最初のページを使い、名前のないページは登録しない"""
+    index = HorseIndex()
+    count = index.load([_page("page-1", "テスト馬A"), _page("page-2", "テスト馬A"), _page("page-3", " ")])
+
+    assert count == 1
+    assert index.loaded
+    assert index.get("テスト馬A") == "page-1"
+    assert index.get("テスト馬B") is None
+
+
+def test_add_and_remove_page():
+    """実行中に作成したページを追加し、無効になったページを取り除ける"""
+    index = HorseIndex()
+    index.load([_page("page-1", "テスト馬A")])
+    index.add("テスト馬B", "page-2")
+    index.remove_page("page-1")
+
+    assert "テスト馬A" not in index
+    assert index.get("テスト馬B") == "page-2"
+    assert len(index) == 1
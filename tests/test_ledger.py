@@ -0,0 +1,57 @@
+"""ResultLedgerのテスト"""
+
+import sys
+from datetime import date
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.ledger import ResultLedger
+from src.models import Race
+from src.page_cache import PageCache
+
+
+def _race(name: str, race_number=None) -> Race:
+    return Race(name=name, date=date(2024, 1, 6), venue="中山", distance=1600, race_number=race_number)
+
+
+def test_rerun_skips_recorded_results(tmp_path):
+    """再実行時は書き込み済みの（レース, 馬）だけを飛ばす"""
+    path = str(tmp_path / "ledger.sqlite3")
+    ledger = ResultLedger(path)
+    race = _race("ニューイヤーS", 11)
+    ledger.record(race, "テスト馬A", "page-a")
+    ledger.close()
+
+    rerun = ResultLedger(path)
+    assert rerun.is_recorded(race, "テスト馬A")
+    assert not rerun.is_recorded(race, "テスト馬B")
+    assert not rerun.is_recorded(_race("ニューイヤーS", 12), "テスト馬A")
+    rerun.close()
+
+
+def test_unnumbered_races_are_kept_apart(tmp_path):
+    """レース番号のない同じ開催のレースは、レース名で区別する"""
+    ledger = ResultLedger(str(tmp_path / "ledger.sqlite3"))
+    first = _race("3歳未勝利")
+    second = _race("ジュニアC")
+    ledger.record(first, "テスト馬A")
+
+    assert ledger.is_recorded(first, "テスト馬A")
+    assert not ledger.is_recorded(second, "テスト馬A")
+    ledger.close()
+
+
+def test_page_cache_keeps_unnumbered_races_apart(tmp_path):
+    """レース番号のないレースのページIDを取り違えない"""
+    cache = PageCache(str(tmp_path / "page_cache.sqlite3"))
+    race_date = date(2024, 1, 6)
+    cache.set_race(race_date, "中山", None, "page-1", "3歳未勝利")
+    cache.set_race(race_date, "中山", None, "page-2", "ジュニアC")
+
+    assert cache.get_race(race_date, "中山", None, "3歳未勝利") == "page-1"
+    assert cache.get_race(race_date, "中山", None, "ジュニアC") == "page-2"
+    assert cache.get_race(race_date, "中山", None, "京成杯") is None
+    cache.close()
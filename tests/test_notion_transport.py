@@ -0,0 +1,123 @@
+"""NotionTransportのリトライのテスト"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+import requests
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src import notion_transport
+from src.notion_transport import NotionAPIError, NotionTransport
+
+
+class FakeClock:
+    """time.monotonic / time.sleep の代わり（sleepで時計を進める）"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+        self.slept += seconds
+
+
+class FakeSession:
+    """用意した応答（または例外）を順に返すrequests.Sessionの代わり"""
+
+    def __init__(self, clock: FakeClock, replies):
+        self.clock = clock
+        self.replies = list(replies)
+        self.sent_at = []
+
+    def request(self, method, url, **kwargs):
+        self.sent_at.append(self.clock.now)
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+def _response(status: int, body=None, headers=None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps(body or {}).encode("utf-8")
+    response.headers.update(headers or {})
+    return response
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(notion_transport, "time", clock)
+    return clock
+
+
+def _transport(clock: FakeClock, replies) -> NotionTransport:
+    transport = NotionTransport("test-key", rate=100.0, burst=100.0, max_retries=3, backoff_base=0.01)
+    transport.limiter._updated_at = clock.now
+    transport.session = FakeSession(clock, replies)
+    return transport
+
+
+def test_retry_after_is_honored(clock):
+    """429のRetry-Afterの秒数だけ待ってから再送する"""
+    transport = _transport(clock, [
+        _response(429, {"code": "rate_limited", "message": "slow down"}, {"Retry-After": "2"}),
+        _response(200, {"object": "page", "id": "page-1"}),
+    ])
+
+    assert transport.retrieve_page("page-1")["id"] == "page-1"
+
+    first, second = transport.session.sent_at
+    assert second - first > 1.99
+    assert transport.stats["throttled"] == 1
+    assert transport.stats["retried"] == 1
+
+
+def test_idempotent_call_retries_after_timeout(clock):
+    """冪等な呼び出しは応答待ちのタイムアウト・5xxでもリトライする"""
+    transport = _transport(clock, [
+        requests.ReadTimeout("read timed out"),
+        _response(502, {"code": "bad_gateway", "message": "bad gateway"}),
+        _response(200, {"results": []}),
+    ])
+
+    assert transport.query_database("db-1") == {"results": []}
+    assert len(transport.session.sent_at) == 3
+
+
+@pytest.mark.parametrize("reply", [
+    requests.ReadTimeout("read timed out"),
+    _response(502, {"code": "bad_gateway", "message": "bad gateway"}),
+])
+def test_non_idempotent_call_does_not_retry_ambiguous_failure(clock, reply):
+    """ページ作成は書き込まれたか分からない失敗ではリトライしない"""
+    transport = _transport(clock, [reply, _response(200, {"object": "page", "id": "page-1"})])
+
+    with pytest.raises(NotionAPIError):
+        transport.create_page(parent={"database_id": "db-1"}, properties={})
+
+    assert len(transport.session.sent_at) == 1
+    assert transport.stats["failed"] == 1
+
+
+def test_non_idempotent_call_retries_rate_limit(clock):
+    """ページ作成でも429（処理されていない）ならリトライする"""
+    transport = _transport(clock, [
+        _response(429, {"code": "rate_limited", "message": "slow down"}, {"Retry-After": "1"}),
+        _response(200, {"object": "list", "results": [{"id": "block-1"}]}),
+    ])
+
+    response = transport.append_block_children("page-1", [{"type": "paragraph", "paragraph": {}}])
+
+    assert response["results"][0]["id"] == "block-1"
+    assert len(transport.session.sent_at) == 2
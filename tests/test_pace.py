@@ -0,0 +1,68 @@
+"""ラップ解析のテスト"""
+
+import sys
+from datetime import date
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.models import Race
+from src.pace import analyze_races, format_pace, race_pace
+
+
+def _race(lap_time) -> Race:
+    return Race(name="テストレース", date=date(2024, 1, 6), venue="中山", distance=1600, lap_time=lap_time)
+
+
+def test_eight_laps():
+    """8ハロンのラップから前半3F・後半3F・増減・ペースを求める"""
+    slow = _race("12.8-11.9-12.4-12.6-12.3-11.5-11.2-11.6")
+    high = _race("12.1-10.5-11.0-11.8-12.0-12.2-12.4-12.6")
+    analyze_races([slow, high])
+
+    assert slow.pace.laps == [12.8, 11.9, 12.4, 12.6, 12.3, 11.5, 11.2, 11.6]
+    assert slow.pace.first_3f == 37.1
+    assert slow.pace.last_3f == 34.3
+    assert slow.pace.deltas == [-0.9, 0.5, 0.2, -0.3, -0.8, -0.3, 0.4]
+    assert slow.pace.pace == "S"
+    assert format_pace(slow.pace) == "12.8-11.9-12.4-12.6-12.3-11.5-11.2-11.6 (37.1-34.3 スロー)"
+
+    assert high.pace.first_3f == 33.6
+    assert high.pace.last_3f == 37.2
+    assert high.pace.pace == "H"
+
+
+def test_fewer_than_three_laps():
+    """ラップが3つ未満なら前半3F・後半3F・ペースを求めない"""
+    one = _race("12.1")
+    two = _race("12.0-11.0")
+    analyze_races([one, two])
+
+    for race in (one, two):
+        assert race.pace.first_3f is None
+        assert race.pace.last_3f is None
+        assert race.pace.pace is None
+        assert format_pace(race.pace) == race.lap_time
+    assert two.pace.deltas == [-1.0]
+
+
+def test_junk_laps():
+    """数値にできないラップは計算から除き、区切りだけのラップは解析しない"""
+    mixed = _race("12.0-x-11.0-11.5-12.0")
+    junk = _race("abc-def")
+    dash = _race("-")
+    empty = _race("")
+    analyze_races([mixed, junk, dash, empty])
+
+    assert mixed.pace.laps == [12.0, 11.0, 11.5, 12.0]
+    assert mixed.pace.first_3f == 34.5
+    assert mixed.pace.last_3f == 34.5
+    assert mixed.pace.pace == "M"
+    assert junk.pace.laps == []
+    assert junk.pace.pace is None
+    assert format_pace(junk.pace) == "abc-def"
+    assert dash.pace is None
+    assert empty.pace is None
+    assert race_pace(dash) is None
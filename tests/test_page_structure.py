@@ -0,0 +1,118 @@
+"""馬ページのブロック構造（PageStructure）と出走履歴の追記位置のテスト"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.config import Config
+from src.fake_notion import FakeNotionServer
+from src.notion_client import NotionClient
+from src.write_planner import PageStructure
+
+
+def _heading(text: str) -> dict:
+    return {"object": "block", "type": "heading_2",
+            "heading_2": {"rich_text": [{"type": "text", "text": {"content": text}}]}}
+
+
+def _paragraph(text: str) -> dict:
+    return {"object": "block", "type": "paragraph",
+            "paragraph": {"rich_text": [{"type": "text", "text": {"content": text}}]}}
+
+
+def _listed(block: dict, block_id: str) -> dict:
+    """一覧取得で返る形（plain_text・ID付き）のブロック"""
+    content = block[block["type"]]
+    rich_text = [{**t, "plain_text": t["text"]["content"]} for t in content["rich_text"]]
+    return {**block, "id": block_id, block["type"]: {"rich_text": rich_text}}
+
+
+def test_insert_after_when_another_section_follows():
+    """「過去レース」の後に別のセクションがあれば、セクションの最後のブロックの直後に追記する"""
+    structure = PageStructure.from_blocks([
+        _listed(_heading("基本情報"), "h-info"),
+        _listed(_heading("過去レース"), "h-past"),
+        _listed(_paragraph("1戦目"), "p-1"),
+        _listed(_paragraph("2戦目"), "p-2"),
+        _listed(_heading("メモ"), "h-memo"),
+        _listed(_paragraph("メモ本文"), "p-memo"),
+    ])
+
+    assert structure.past_races_id == "h-past"
+    assert structure.last_block_id == "p-2"
+    assert not structure.section_is_last
+    assert structure.insert_after == "p-2"
+
+
+def test_append_to_page_end_when_section_is_last():
+    """「過去レース」が最後のセクションならページ末尾に追記する（after指定なし）"""
+    structure = PageStructure.from_blocks([
+        _listed(_heading("過去レース"), "h-past"),
+        _listed(_paragraph("1戦目"), "p-1"),
+    ])
+
+    assert structure.section_is_last
+    assert structure.insert_after is None
+    assert PageStructure.from_blocks([_listed(_paragraph("本文"), "p-1")]) is None
+
+
+@pytest.fixture
+def notion(monkeypatch, tmp_path):
+    server = FakeNotionServer().start()
+    monkeypatch.setattr(Config, "NOTION_BASE_URL", server.base_url)
+    monkeypatch.setattr(Config, "NOTION_API_KEY", "fake-notion-key")
+    monkeypatch.setattr(Config, "NOTION_HORSE_DB_ID", "fake-horse-db")
+    monkeypatch.setattr(Config, "NOTION_RACE_DB_ID", "fake-race-db")
+    monkeypatch.setattr(Config, "PAGE_CACHE_PATH", str(tmp_path / "notion_pages.sqlite3"))
+    monkeypatch.setattr(Config, "NOTION_RATE_LIMIT", 1000.0)
+    try:
+        yield NotionClient(), server.store
+    finally:
+        server.stop()
+
+
+def _texts(store, page_id: str) -> list:
+    texts = []
+    for block_id in store.children[page_id]:
+        block = store.blocks[block_id]
+        texts.append("".join(t["plain_text"] for t in block[block["type"]]["rich_text"]))
+    return texts
+
+
+def test_append_into_past_races_section(notion):
+    """出走履歴は「過去レース」セクションの末尾（次の見出しの前）に入る"""
+    client, store = notion
+    page_id = client.transport.create_page(
+        parent={"database_id": "fake-horse-db"}, properties={},
+        children=[_heading("過去レース"), _paragraph("1戦目"), _heading("メモ"), _paragraph("メモ本文")]
+    )["id"]
+
+    structure = client._ensure_past_races_section(page_id)
+    client._append_race_history(page_id, [_paragraph("2戦目")], structure)
+    client._append_race_history(page_id, [_paragraph("3戦目")], client._ensure_past_races_section(page_id))
+
+    assert _texts(store, page_id) == ["過去レース", "1戦目", "2戦目", "3戦目", "メモ", "メモ本文"]
+
+
+def test_rebuild_structure_when_insert_target_was_deleted(notion):
+    """記録していた追記位置のブロックが削除されていたら、構造を読み直して追記する"""
+    client, store = notion
+    page_id = client.transport.create_page(
+        parent={"database_id": "fake-horse-db"}, properties={},
+        children=[_heading("過去レース"), _paragraph("1戦目"), _paragraph("2戦目"), _heading("メモ")]
+    )["id"]
+    structure = client._ensure_past_races_section(page_id)
+    deleted = structure.insert_after
+
+    # 記録した構造はそのままで、Notion上で最後の出走履歴ブロックが削除された
+    store.children[page_id].remove(deleted)
+    del store.blocks[deleted]
+    client._append_race_history(page_id, [_paragraph("3戦目")], structure)
+
+    assert _texts(store, page_id) == ["過去レース", "1戦目", "3戦目", "メモ"]
+    assert client._ensure_past_races_section(page_id).insert_after == store.children[page_id][2]
@@ -0,0 +1,65 @@
+"""レースページのパース（本文だけを木にする場合と全体をパースする場合）のテスト"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.html_parser import available_backends, make_soup
+from src.models import race_to_dict
+from src.scraper import Scraper
+
+CORPUS_DIR = project_root / "benchmarks" / "corpus"
+RACE_URL = "https://www.jra.go.jp/JRADB/accessD.html?CNAME=pw01sde1006202401040420240104/00"
+
+
+def _full_parse(scraper: Scraper, html: str, backend: str):
+    """本文に絞らずページ全体をパースした結果"""
+    return scraper._parse_race_soup(make_soup(html, backend), RACE_URL)
+
+
+@pytest.fixture
+def scraper():
+    return Scraper()
+
+
+@pytest.mark.parametrize("backend", available_backends())
+@pytest.mark.parametrize("path", sorted(CORPUS_DIR.glob("*.html")), ids=lambda p: p.name)
+def test_strained_parse_matches_full_parse(scraper, path, backend):
+    """本文だけを木にしても、ページ全体をパースした場合と同じレース情報になる"""
+    html = path.read_text(encoding="utf-8")
+    races = scraper._parse_race_html(html, RACE_URL, backend)
+
+    assert races
+    assert [race_to_dict(r) for r in races] == [race_to_dict(r) for r in _full_parse(scraper, html, backend)]
+
+
+def test_page_without_main_falls_back_to_full_parse(scraper):
+    """本文の要素がないページは全体をパースする"""
+    html = (CORPUS_DIR / "result_01.html").read_text(encoding="utf-8").replace('id="main"', 'id="contents"')
+    races = scraper._parse_race_html(html, RACE_URL, "html.parser")
+
+    assert races
+    assert [race_to_dict(r) for r in races] == [race_to_dict(r) for r in _full_parse(scraper, html, "html.parser")]
+
+
+def test_date_outside_main_falls_back_to_full_parse(scraper):
+    """開催日が本文の外にあるページは全体をパースして開催日を取り出す"""
+    html = (
+        '<html><head><title>結果 | JRA</title></head><body>'
+        '<div id="date">2024年1月6日（土曜） 1回中山1日</div>'
+        '<div id="main"><div class="race_header"><div class="race_name">テストステークス</div></div>'
+        '<table class="race_table"><tr><th>着順</th><th>馬名</th></tr>'
+        '<tr><td class="place">1</td><td class="horse"><a href="/horse">テストホース</a></td></tr></table>'
+        '</div></body></html>'
+    )
+    strained = make_soup(html, "html.parser", parse_only=Scraper.CONTENT_STRAINER)
+    assert Scraper.DATE_PATTERN.search(strained.get_text()) is None
+
+    races = scraper._parse_race_html(html, RACE_URL, "html.parser")
+
+    assert [race_to_dict(r) for r in races] == [race_to_dict(r) for r in _full_parse(scraper, html, "html.parser")]
@@ -0,0 +1,50 @@
+"""RaceStreamのテスト"""
+
+import sys
+import threading
+from datetime import date
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.models import Race
+from src.race_stream import RaceStream
+
+
+def _race(number: int) -> Race:
+    return Race(name=f"テストレース{number}", date=date(2024, 1, 6), venue="中山", distance=1600, race_number=number)
+
+
+def test_close_runs_generator_cleanup():
+    """消費を途中で打ち切ると、生産側がレースのジェネレーターを閉じる"""
+    cleaned_up = threading.Event()
+
+    def races():
+        try:
+            for number in range(1, 1000):
+                yield _race(number)
+        finally:
+            cleaned_up.set()
+
+    # 参照を持ち続け、ガベージコレクションではなくRaceStreamが閉じることを確かめる
+    source = races()
+    stream = RaceStream(source, maxsize=2)
+    first = next(iter(stream))
+    stream.close()
+
+    assert first.race_number == 1
+    assert cleaned_up.wait(timeout=5)
+    stream._thread.join(timeout=5)
+    assert not stream._thread.is_alive()
+    assert source.gi_frame is None
+
+
+def test_iterates_all_races():
+    """最後まで読むと全レースを順に受け取れる"""
+    stream = RaceStream((_race(number) for number in range(1, 13)), maxsize=3)
+    try:
+        assert [race.race_number for race in stream] == list(range(1, 13))
+    finally:
+        stream.close()
@@ -0,0 +1,82 @@
+"""RaceWarehouseのテスト"""
+
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src import warehouse as race_warehouse
+from src.models import Race, Horse
+
+pytestmark = pytest.mark.skipif(not race_warehouse.is_available(), reason="pyarrow がインストールされていない")
+
+
+def _race(race_number, horses, name="テストレース", position=None) -> Race:
+    return Race(
+        name=name, date=date(2024, 1, 6), venue="中山", distance=1600, race_number=race_number,
+        lap_time="12.5-11.0-11.8-12.0-12.2-12.1-11.9-12.3",
+        horses=[Horse(name=horse, horse_number=str(i + 1), position=position) for i, horse in enumerate(horses)]
+    )
+
+
+def _rows(warehouse):
+    table = warehouse.read(columns=["race_number", "race_name", "horse_name", "source"])
+    return sorted(
+        (row["race_number"] or 0, row["race_name"], row["horse_name"], row["source"]) for row in table.to_pylist()
+    )
+
+
+def test_same_race_is_replaced(tmp_path):
+    """同じレースを保存し直すと、そのレースの行だけを置き換える"""
+    warehouse = race_warehouse.RaceWarehouse(str(tmp_path))
+    warehouse.add(_race(1, ["馬A", "馬B"]), "retrospective")
+    warehouse.add(_race(2, ["馬C"]), "retrospective")
+    warehouse.flush()
+
+    warehouse.add(_race(1, ["馬A", "馬D"]), "retrospective")
+    warehouse.flush()
+
+    assert _rows(warehouse) == [
+        (1, "テストレース", "馬A", "retrospective"),
+        (1, "テストレース", "馬D", "retrospective"),
+        (2, "テストレース", "馬C", "retrospective"),
+    ]
+
+
+def test_unnumbered_races_are_replaced_by_name(tmp_path):
+    """レース番号のないレースはレース名ごとに置き換える"""
+    warehouse = race_warehouse.RaceWarehouse(str(tmp_path))
+    warehouse.add(_race(None, ["馬A"], name="3歳未勝利"), "prediction")
+    warehouse.add(_race(None, ["馬B"], name="ジュニアC"), "prediction")
+    warehouse.flush()
+    warehouse.add(_race(None, ["馬C"], name="3歳未勝利"), "prediction")
+    warehouse.flush()
+
+    assert _rows(warehouse) == [
+        (0, "3歳未勝利", "馬C", "prediction"),
+        (0, "ジュニアC", "馬B", "prediction"),
+    ]
+
+
+def test_results_are_not_overwritten_by_entries(tmp_path):
+    """結果（retrospective）は出馬表（prediction）で上書きせず、出馬表は結果で置き換える"""
+    warehouse = race_warehouse.RaceWarehouse(str(tmp_path))
+    warehouse.add(_race(1, ["馬A", "馬B"], position="1"), "retrospective")
+    warehouse.add(_race(2, ["馬C"]), "prediction")
+    warehouse.flush()
+
+    warehouse.add(_race(1, ["馬A"]), "prediction")
+    warehouse.add(_race(2, ["馬C", "馬E"], position="2"), "retrospective")
+    warehouse.flush()
+
+    assert _rows(warehouse) == [
+        (1, "テストレース", "馬A", "retrospective"),
+        (1, "テストレース", "馬B", "retrospective"),
+        (2, "テストレース", "馬C", "retrospective"),
+        (2, "テストレース", "馬E", "retrospective"),
+    ]
@@ -0,0 +1,67 @@
+"""WritePlannerとページ作成時のAPI呼び出し数のテスト"""
+
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.config import Config
+from src.fake_notion import FakeNotionServer
+from src.models import Race, Horse
+from src.notion_client import NotionClient
+from src.write_planner import WritePlanner
+
+
+def test_skip_title_update_when_unchanged():
+    """記録したタイトルと同じなら更新を省き、不明・異なる場合は更新する"""
+    planner = WritePlanner()
+    planner.record_title("page-1", "ニューイヤーS")
+
+    assert not planner.should_update_title("page-1", "ニューイヤーS")
+    assert planner.should_update_title("page-1", "ニューイヤーステークス")
+    assert planner.should_update_title("page-2", "ニューイヤーS")
+    assert planner.saved["skipped_update"] == 1
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    server = FakeNotionServer().start()
+    monkeypatch.setattr(Config, "NOTION_BASE_URL", server.base_url)
+    monkeypatch.setattr(Config, "NOTION_API_KEY", "fake-notion-key")
+    monkeypatch.setattr(Config, "NOTION_HORSE_DB_ID", "fake-horse-db")
+    monkeypatch.setattr(Config, "NOTION_RACE_DB_ID", "fake-race-db")
+    monkeypatch.setattr(Config, "PAGE_CACHE_PATH", str(tmp_path / "notion_pages.sqlite3"))
+    monkeypatch.setattr(Config, "NOTION_RATE_LIMIT", 1000.0)
+    try:
+        yield NotionClient()
+    finally:
+        server.stop()
+
+
+def test_race_page_is_created_with_its_blocks_in_one_request(client):
+    """レースページは初期ブロックごと1回の作成リクエストで作り、2回目は検索もしない"""
+    race = Race(
+        name="ニューイヤーS", date=date(2024, 1, 6), venue="中山", distance=1600, race_number=11,
+        lap_time="12.5-11.0-11.8-12.0-12.2-12.1-11.9-12.3",
+        horses=[Horse(name="テスト馬A", horse_number="1"), Horse(name="テスト馬B", horse_number="2")]
+    )
+
+    page_id = client.find_or_create_race_page(race)
+    after_create = client.transport.stats["requests"]
+
+    assert page_id
+    # 検索1回 + 作成1回（初期ブロックの追記リクエストはない）
+    assert after_create == 2
+    assert client.planner.saved["folded_children"] == 1
+    assert client._list_block_children_all(page_id)
+
+    before_second = client.transport.stats["requests"]
+    assert client.find_or_create_race_page(race) == page_id
+    # ページIDはキャッシュから、タイトルは同じなので更新しない（API呼び出しなし）
+    assert client.transport.stats["requests"] == before_second
+    assert client.planner.saved["skipped_update"] == 1